@@ -0,0 +1,753 @@
+"""A local fake of the GitHub REST and GraphQL APIs, serving a synthetic organisation for scale testing.
+
+It implements the endpoints the Data Logger uses, with GitHub's pagination (page numbers and cursors), Link headers,
+ETags, rate limit headers and rate limits. A latency can be added to every response to stand in for the network.
+
+Run it on its own (i.e. to point the Data Logger at by hand) from the data_logger directory:
+
+    python -m benchmarks.fake_github [repository count] [port]
+"""
+
+import base64
+import hashlib
+import json
+import math
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from benchmarks.synthetic_org import generate_org
+
+# The default number of items on a REST page, and the most which can be requested
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+
+# How long a rate limit window lasts
+RATE_LIMIT_WINDOW = 60 * 60
+
+TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\.\.\.|[{}()\[\]:$!=@,]|-?\d+(?:\.\d+)?|\w+')
+
+
+# GraphQL
+
+
+class GraphQLError(Exception):
+    pass
+
+
+def tokenise(query: str) -> list[str]:
+    """Splits a GraphQL document into tokens, dropping comments.
+
+    Args:
+        query (str): The GraphQL document.
+
+    Returns:
+        list[str]: The tokens.
+    """
+    return TOKEN_PATTERN.findall(re.sub(r"#[^\n]*", "", query))
+
+
+class GraphQLParser:
+    def __init__(self, query: str) -> None:
+        """Parses the subset of GraphQL the Data Logger and github_api_toolkit send: a single query, with variables,
+        aliases, arguments, fragments and inline fragments.
+
+        Args:
+            query (str): The GraphQL document.
+        """
+        self.tokens = tokenise(query)
+        self.position = 0
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self, expected: str | None = None) -> str:
+        token = self.peek()
+
+        if token is None or (expected is not None and token != expected):
+            raise GraphQLError(f"Expected {expected or 'a token'} but found {token}.")
+
+        self.position += 1
+
+        return token
+
+    def parse(self) -> tuple[list, dict[str, tuple[str, list]]]:
+        """Parses the document.
+
+        Returns:
+            tuple[list, dict[str, tuple[str, list]]]: The query's selections, and each fragment's type condition and selections.
+        """
+        operation = None
+        fragments = {}
+
+        while self.peek() is not None:
+            if self.peek() == "fragment":
+                self.take()
+                name = self.take()
+                self.take("on")
+                fragments[name] = (self.take(), self.parse_selections())
+                continue
+
+            if self.peek() in ("query", "mutation"):
+                self.take()
+
+                if self.peek() not in ("(", "{"):
+                    self.take()
+
+                # Variable definitions are not needed, as the variables are passed separately
+                if self.peek() == "(":
+                    depth = 0
+
+                    while True:
+                        token = self.take()
+                        depth += token == "("
+                        depth -= token == ")"
+
+                        if depth == 0:
+                            break
+
+            operation = self.parse_selections()
+
+        if operation is None:
+            raise GraphQLError("No query found.")
+
+        return operation, fragments
+
+    def parse_selections(self) -> list:
+        self.take("{")
+
+        selections = []
+
+        while self.peek() != "}":
+            if self.peek() == "...":
+                self.take()
+
+                if self.peek() == "on":
+                    self.take()
+                    selections.append(("inline", self.take(), self.parse_selections()))
+                else:
+                    selections.append(("spread", self.take()))
+
+                continue
+
+            name = self.take()
+            alias = name
+
+            if self.peek() == ":":
+                self.take()
+                name = self.take()
+
+            arguments = {}
+
+            if self.peek() == "(":
+                self.take()
+
+                while self.peek() != ")":
+                    argument = self.take()
+                    self.take(":")
+                    arguments[argument] = self.parse_value()
+
+                    if self.peek() == ",":
+                        self.take()
+
+                self.take(")")
+
+            children = self.parse_selections() if self.peek() == "{" else None
+
+            selections.append(("field", alias, name, arguments, children))
+
+            if self.peek() == ",":
+                self.take()
+
+        self.take("}")
+
+        return selections
+
+    def parse_value(self) -> Any:
+        token = self.take()
+
+        if token == "$":
+            return ("variable", self.take())
+
+        if token.startswith('"'):
+            return json.loads(token)
+
+        if token == "[":
+            values = []
+
+            while self.peek() != "]":
+                values.append(self.parse_value())
+
+                if self.peek() == ",":
+                    self.take()
+
+            self.take("]")
+
+            return values
+
+        if re.fullmatch(r"-?\d+", token):
+            return int(token)
+
+        return {"true": True, "false": False, "null": None}.get(token, token)
+
+
+def execute(query: str, variables: dict, root: dict) -> tuple[dict, int]:
+    """Executes a GraphQL query against a tree of resolvers.
+
+    Each object is a dictionary of field values. A value can be a function, which is called with the field's
+    arguments to resolve it (i.e. connections). Unknown fields resolve to null. Objects with a __typename are only
+    matched by fragments on that type.
+
+    The cost is estimated as GitHub does: the number of connection items requested, divided by 100 (at least 1).
+
+    Args:
+        query (str): The GraphQL query.
+        variables (dict): The query's variables.
+        root (dict): The root Query object.
+
+    Returns:
+        tuple[dict, int]: The data and the cost of the query.
+    """
+
+    selections, fragments = GraphQLParser(query).parse()
+
+    requested = [0]
+
+    def resolve_argument(value: Any) -> Any:
+        if isinstance(value, tuple) and value[0] == "variable":
+            return variables.get(value[1])
+
+        if isinstance(value, list):
+            return [resolve_argument(item) for item in value]
+
+        return value
+
+    def matches(node: dict, type_condition: str) -> bool:
+        return node.get("__typename") in (None, type_condition)
+
+    def resolve(node: dict, selections: list, result: dict) -> dict:
+        for selection in selections:
+            if selection[0] == "spread":
+                type_condition, children = fragments[selection[1]]
+
+                if matches(node, type_condition):
+                    resolve(node, children, result)
+
+            elif selection[0] == "inline":
+                if matches(node, selection[1]):
+                    resolve(node, selection[2], result)
+
+            else:
+                _, alias, name, arguments, children = selection
+
+                value = node.get(name)
+
+                if callable(value):
+                    arguments = {argument: resolve_argument(value) for argument, value in arguments.items()}
+
+                    value = value(arguments)
+
+                    if isinstance(arguments.get("first"), int):
+                        requested[0] += arguments["first"]
+
+                if children is not None and value is not None:
+                    if isinstance(value, list):
+                        value = [resolve(item, children, {}) for item in value]
+                    else:
+                        value = resolve(value, children, {})
+
+                result[alias] = value
+
+        return result
+
+    data = resolve(root, selections, {})
+
+    return data, max(1, math.ceil(requested[0] / 100))
+
+
+def build_connection(items: list, arguments: dict, build_node: Callable[[Any], Any], default_first: int = 100) -> dict:
+    """Builds a cursor paginated GraphQL connection.
+
+    Args:
+        items (list): Every item in the connection.
+        arguments (dict): The connection's arguments (first and after).
+        build_node (Callable[[Any], Any]): Builds the GraphQL object of an item.
+        default_first (int, optional): The page size if first is not given. Defaults to 100.
+
+    Returns:
+        dict: The connection, with its nodes, pageInfo and totalCount.
+    """
+    start = int(base64.b64decode(arguments["after"]).decode()) if arguments.get("after") else 0
+    first = min(arguments.get("first") or default_first, 100)
+
+    page = items[start:start + first]
+    end = start + len(page)
+
+    return {
+        "nodes": [build_node(item) for item in page],
+        "totalCount": len(items),
+        "pageInfo": {
+            "endCursor": base64.b64encode(str(end).encode()).decode() if page else None,
+            "hasNextPage": end < len(items),
+        },
+    }
+
+
+class FakeGitHub:
+    def __init__(self, org: dict[str, Any], latency: float = 0.0, rest_limit: int = 5000, graphql_limit: int = 5000) -> None:
+        """The data and rate limits behind the fake GitHub API.
+
+        Args:
+            org (dict[str, Any]): The synthetic organisation (from generate_org()).
+            latency (float, optional): The time (in seconds) added to every response. Defaults to 0.0.
+            rest_limit (int, optional): The number of REST requests allowed each hour. Defaults to 5000.
+            graphql_limit (int, optional): The number of GraphQL points allowed each hour. Defaults to 5000.
+        """
+        self.org = org
+        self.latency = latency
+
+        self.repositories = {repository["name"]: repository for repository in org["repositories"]}
+        self.active_repositories = [repository for repository in org["repositories"] if not repository["archived"]]
+
+        self.limits = {"core": rest_limit, "graphql": graphql_limit}
+        self.used = {"core": 0, "graphql": 0}
+        self.reset = time.time() + RATE_LIMIT_WINDOW
+
+        self.stats = {"rest": 0, "graphql": 0, "not_modified": 0, "rate_limited": 0}
+
+        self._lock = threading.Lock()
+
+    def use_rate_limit(self, resource: str, cost: int) -> tuple[bool, dict[str, str]]:
+        """Uses up some of a rate limit.
+
+        Args:
+            resource (str): The rate limit resource (core or graphql).
+            cost (int): The number of requests or points to use.
+
+        Returns:
+            tuple[bool, dict[str, str]]: Whether the rate limit has run out, and the rate limit headers.
+        """
+        with self._lock:
+            if time.time() >= self.reset:
+                self.used = {"core": 0, "graphql": 0}
+                self.reset = time.time() + RATE_LIMIT_WINDOW
+
+            exceeded = self.used[resource] + cost > self.limits[resource]
+
+            if exceeded:
+                self.stats["rate_limited"] += 1
+            else:
+                self.used[resource] += cost
+
+            headers = {
+                "X-RateLimit-Limit": str(self.limits[resource]),
+                "X-RateLimit-Remaining": "0" if exceeded else str(self.limits[resource] - self.used[resource]),
+                "X-RateLimit-Used": str(self.used[resource]),
+                "X-RateLimit-Reset": str(int(self.reset)),
+                "X-RateLimit-Resource": resource,
+            }
+
+            return exceeded, headers
+
+    def rate_limit_object(self, cost: int) -> dict:
+        with self._lock:
+            return {"cost": cost, "remaining": max(0, self.limits["graphql"] - self.used["graphql"]), "limit": self.limits["graphql"], "resetAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.reset))}
+
+    # REST
+
+    def get_file(self, repository: dict, path: str) -> str | None:
+        """Gets the text of a file in a repository. Only CODEOWNERS files have contents.
+
+        Args:
+            repository (dict): The repository.
+            path (str): The path of the file.
+
+        Returns:
+            str | None: The text of the file, or None if it does not exist.
+        """
+        if path and path == repository["codeowners_path"]:
+            return repository["codeowners"]
+
+        return None
+
+    def repository_rest(self, repository: dict) -> dict:
+        login = self.org["login"]
+
+        return {
+            "name": repository["name"],
+            "full_name": f"{login}/{repository['name']}",
+            "html_url": f"https://github.com/{login}/{repository['name']}",
+            "visibility": repository["visibility"],
+            "private": repository["visibility"] != "public",
+            "archived": repository["archived"],
+            "created_at": repository["created_at"],
+            "pushed_at": repository["pushed_at"],
+            "security_and_analysis": {
+                "secret_scanning": {"status": "enabled" if repository["secret_scanning"] else "disabled"},
+                "secret_scanning_push_protection": {"status": "enabled" if repository["push_protection"] else "disabled"},
+            },
+        }
+
+    def alert_rest(self, alert: dict, kind: str) -> dict:
+        login = self.org["login"]
+        repository = alert["repository"]
+
+        result = {
+            "number": alert["number"],
+            "state": "open",
+            "created_at": alert["created_at"],
+            "html_url": f"https://github.com/{login}/{repository}/security/{kind}/{alert['number']}",
+            "repository": {"name": repository, "html_url": f"https://github.com/{login}/{repository}"},
+        }
+
+        if kind == "dependabot":
+            result["security_advisory"] = {"severity": alert["severity"]}
+
+        return result
+
+    def get_rest(self, path: str, query: dict[str, str]) -> tuple[int, Any, str | None]:
+        """Resolves a REST request.
+
+        Args:
+            path (str): The path of the request.
+            query (dict[str, str]): The query parameters.
+
+        Returns:
+            tuple[int, Any, str | None]: The status code, the items (or body) and the pagination style (pages, cursor or None).
+        """
+        segments = [segment for segment in path.split("/") if segment]
+        login = self.org["login"]
+
+        if segments[:2] == ["orgs", login] and len(segments) >= 3:
+            endpoint = "/".join(segments[2:])
+
+            if endpoint == "repos":
+                return 200, [self.repository_rest(repository) for repository in self.org["repositories"]], "pages"
+
+            if endpoint == "members":
+                return 200, [{"login": member} for member in self.org["members"]], "pages"
+
+            if endpoint.startswith("teams/") and endpoint.endswith("/members"):
+                members = self.org["teams"].get(segments[3])
+
+                if members is None:
+                    return 404, {"message": "Not Found"}, None
+
+                return 200, [{"login": member} for member in members], "pages"
+
+            if endpoint in ("dependabot/alerts", "secret-scanning/alerts"):
+                kind = "dependabot" if endpoint == "dependabot/alerts" else "secret-scanning"
+                alerts = self.org["dependabot_alerts"] if kind == "dependabot" else self.org["secret_scanning_alerts"]
+
+                if query.get("severity"):
+                    alerts = [alert for alert in alerts if alert["severity"] in query["severity"].split(",")]
+
+                if query.get("direction", "desc") == "desc":
+                    alerts = alerts[::-1]
+
+                # Dependabot alerts are paginated with cursors, secret scanning alerts with page numbers
+                return 200, [self.alert_rest(alert, kind) for alert in alerts], "cursor" if kind == "dependabot" else "pages"
+
+        if segments[:2] == ["repos", login] and len(segments) >= 3:
+            repository = self.repositories.get(segments[2])
+
+            if repository is None:
+                return 404, {"message": "Not Found"}, None
+
+            if len(segments) == 3:
+                return 200, self.repository_rest(repository), None
+
+            if segments[3] == "branches":
+                return 200, [{"name": branch["name"], "protected": branch["protected"]} for branch in repository["branches"]], "pages"
+
+            if segments[3] == "contents":
+                text = self.get_file(repository, "/".join(segments[4:]))
+
+                if text is None:
+                    return 404, {"message": "Not Found"}, None
+
+                return 200, {"type": "file", "encoding": "base64", "content": base64.b64encode(text.encode()).decode()}, None
+
+        return 404, {"message": "Not Found"}, None
+
+    # GraphQL
+
+    def commit_graphql(self, repository: dict) -> dict:
+        signatures = {0: None, 1: {"isValid": True}, 2: {"isValid": False}}
+
+        return {
+            "__typename": "Commit",
+            "oid": repository["head_oid"],
+            "history": lambda arguments: build_connection(repository["commits"], arguments, lambda commit: {"signature": signatures[commit]}),
+        }
+
+    def object_graphql(self, repository: dict, expression: str) -> dict | None:
+        path = expression.split(":", 1)[-1].strip("/")
+
+        text = self.get_file(repository, path)
+
+        if text is not None:
+            return {"__typename": "Blob", "text": text, "byteSize": len(text)}
+
+        if path == "":
+            return {"__typename": "Tree", "entries": [{"name": name, "path": name} for name in repository["contents"]]}
+
+        if path == ".github" and ".github" in repository["contents"]:
+            entries = ["CODEOWNERS"] if repository["codeowners_path"] == ".github/CODEOWNERS" else ["workflows"]
+
+            return {"__typename": "Tree", "entries": [{"name": name, "path": f".github/{name}"} for name in entries]}
+
+        return None
+
+    def repository_graphql(self, repository: dict | None) -> dict | None:
+        if repository is None:
+            return None
+
+        login = self.org["login"]
+
+        def build_ref(branch: dict) -> dict:
+            return {
+                "name": branch["name"],
+                "branchProtectionRule": {"id": f"rule-{repository['name']}-{branch['name']}"} if branch["protected"] else None,
+                "rules": lambda arguments: {"totalCount": int(branch["ruleset"]), "nodes": []},
+            }
+
+        return {
+            "__typename": "Repository",
+            "name": repository["name"],
+            "visibility": repository["visibility"].upper(),
+            "url": f"https://github.com/{login}/{repository['name']}",
+            "createdAt": repository["created_at"],
+            "pushedAt": repository["pushed_at"],
+            "isArchived": repository["archived"],
+            "hasVulnerabilityAlertsEnabled": repository["vulnerability_alerts"],
+            "defaultBranchRef": {"name": "main", "target": self.commit_graphql(repository)},
+            "pullRequests": lambda arguments: build_connection(repository["pull_requests"], arguments, lambda author: {"author": {"login": author} if author else None}),
+            "object": lambda arguments: self.object_graphql(repository, arguments.get("expression", "")),
+            "refs": lambda arguments: build_connection(repository["branches"], arguments, build_ref),
+        }
+
+    def organization_graphql(self, login: str) -> dict | None:
+        if login != self.org["login"]:
+            return None
+
+        def repositories(arguments: dict) -> dict:
+            items = self.org["repositories"] if arguments.get("isArchived") is None else (self.active_repositories if arguments["isArchived"] is False else [repository for repository in self.org["repositories"] if repository["archived"]])
+
+            return build_connection(items, arguments, self.repository_graphql)
+
+        def team(arguments: dict) -> dict | None:
+            members = self.org["teams"].get(arguments.get("slug"))
+
+            if members is None:
+                return None
+
+            return {"slug": arguments["slug"], "members": lambda arguments: build_connection(members, arguments, self.user_graphql)}
+
+        return {
+            "login": login,
+            "repositories": repositories,
+            "team": team,
+            "membersWithRole": lambda arguments: build_connection(self.org["members"], arguments, self.user_graphql),
+        }
+
+    def user_graphql(self, login: str) -> dict:
+        return {
+            "login": login,
+            "organizationVerifiedDomainEmails": lambda arguments: self.org["emails"].get(login, []),
+        }
+
+    def graphql(self, query: str, variables: dict) -> dict:
+        """Resolves a GraphQL query.
+
+        Args:
+            query (str): The GraphQL query.
+            variables (dict): The query's variables.
+
+        Returns:
+            dict: The response body.
+        """
+        root = {
+            "rateLimit": {},
+            "organization": lambda arguments: self.organization_graphql(arguments.get("login")),
+            "repository": lambda arguments: self.repository_graphql(self.repositories.get(arguments.get("name")) if arguments.get("owner") == self.org["login"] else None),
+            "user": lambda arguments: self.user_graphql(arguments["login"]) if arguments.get("login") in self.org["emails"] else None,
+        }
+
+        data, cost = execute(query, variables, root)
+
+        return {"data": data, "cost": cost}
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set on the server's handler class by start_server()
+    github: FakeGitHub = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, status: int, body: Any, headers: dict[str, str]) -> None:
+        contents = json.dumps(body).encode("utf-8")
+
+        etag = f'"{hashlib.md5(contents).hexdigest()}"'
+
+        # Conditional requests for unchanged responses get 304 Not Modified, without a body
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status = 304
+            contents = b""
+
+            with self.github._lock:
+                self.github.stats["not_modified"] += 1
+
+        self.send_response(status)
+
+        for header, value in headers.items():
+            self.send_header(header, value)
+
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(contents)))
+        self.end_headers()
+
+        self.wfile.write(contents)
+
+    def get_base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+
+        return f"http://{host}:{port}"
+
+    def paginate(self, path: str, query: dict[str, str], items: list, style: str) -> tuple[list, dict[str, str]]:
+        """Gets a page of items and its Link header, as GitHub does.
+
+        Args:
+            path (str): The path of the request.
+            query (dict[str, str]): The query parameters.
+            items (list): Every item.
+            style (str): pages (page numbers, with first, prev, next and last links) or cursor (with next and prev links).
+
+        Returns:
+            tuple[list, dict[str, str]]: The page of items and the Link header (if there are other pages).
+        """
+        per_page = min(int(query.get("per_page", DEFAULT_PER_PAGE)), MAX_PER_PAGE)
+
+        def link(relation: str, **parameters: Any) -> str:
+            return f'<{self.get_base_url()}{path}?{urlencode({**query, **parameters})}>; rel="{relation}"'
+
+        links = []
+
+        if style == "cursor":
+            start = int(base64.b64decode(query["after"]).decode()) if query.get("after") else 0
+
+            page = items[start:start + per_page]
+
+            if start + per_page < len(items):
+                links.append(link("next", after=base64.b64encode(str(start + per_page).encode()).decode()))
+        else:
+            page_number = max(1, int(query.get("page", 1)))
+            last_page = max(1, math.ceil(len(items) / per_page))
+
+            page = items[(page_number - 1) * per_page:page_number * per_page]
+
+            if page_number > 1:
+                links.append(link("prev", page=page_number - 1))
+                links.append(link("first", page=1))
+
+            if page_number < last_page:
+                links.append(link("next", page=page_number + 1))
+                links.append(link("last", page=last_page))
+
+        return page, {"Link": ", ".join(links)} if links else {}
+
+    def do_GET(self) -> None:
+        time.sleep(self.github.latency)
+
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        exceeded, headers = self.github.use_rate_limit("core", 1)
+
+        if exceeded:
+            self.send_json(403, {"message": "API rate limit exceeded"}, headers)
+            return
+
+        with self.github._lock:
+            self.github.stats["rest"] += 1
+
+        status, body, style = self.github.get_rest(parts.path, query)
+
+        if style is not None:
+            body, link_header = self.paginate(parts.path, query, body, style)
+            headers.update(link_header)
+
+        self.send_json(status, body, headers)
+
+    def do_POST(self) -> None:
+        time.sleep(self.github.latency)
+
+        contents = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if urlsplit(self.path).path != "/graphql":
+            self.send_json(404, {"message": "Not Found"}, {})
+            return
+
+        try:
+            request = json.loads(contents)
+            response = self.github.graphql(request["query"], request.get("variables") or {})
+        except (GraphQLError, KeyError, ValueError) as e:
+            self.send_json(200, {"errors": [{"message": f"Parse error: {e}"}]}, {})
+            return
+
+        exceeded, headers = self.github.use_rate_limit("graphql", response["cost"])
+
+        if exceeded:
+            self.send_json(200, {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}, headers)
+            return
+
+        with self.github._lock:
+            self.github.stats["graphql"] += 1
+
+        if "rateLimit" in response["data"]:
+            response["data"]["rateLimit"] = self.github.rate_limit_object(response["cost"])
+
+        self.send_json(200, {"data": response["data"]}, headers)
+
+
+def start_server(github: FakeGitHub, port: int = 0) -> ThreadingHTTPServer:
+    """Starts the fake GitHub API on a background thread.
+
+    Args:
+        github (FakeGitHub): The data and rate limits to serve.
+        port (int, optional): The port to listen on. Defaults to 0 (any free port).
+
+    Returns:
+        ThreadingHTTPServer: The server. Its URL is http://127.0.0.1:<server.server_address[1]>.
+    """
+
+    handler = type("Handler", (FakeGitHubHandler,), {"github": github})
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
+
+    server = start_server(FakeGitHub(generate_org(count)), port)
+
+    print(f"Serving a synthetic organisation of {count:,} repositories at http://127.0.0.1:{server.server_address[1]} (Ctrl+C to stop).")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
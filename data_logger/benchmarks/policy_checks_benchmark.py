@@ -0,0 +1,151 @@
+"""A benchmark comparing the per-repository policy checks with the batch policy check engine.
+
+Run from the data_logger directory:
+
+    python -m benchmarks.policy_checks_benchmark [repository counts...]
+"""
+
+import datetime
+import random
+import string
+import sys
+import time
+
+from src import policy_checks
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+FILES = ["README.md", "LICENSE", "PIRR.md", ".gitignore", "CODEOWNERS", ".github", "src", "pyproject.toml", "Makefile", "docs"]
+
+
+def generate_facts(count: int, org_members: list[str], seed: int = 0) -> dict[str, list]:
+    """Generates the facts for a batch of synthetic repositories.
+
+    Args:
+        count (int): The number of repositories to generate.
+        org_members (list[str]): The members of the synthetic organization.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        dict[str, list]: The facts, with a column for each of policy_checks.FACT_COLUMNS.
+    """
+    rng = random.Random(seed)
+
+    facts = {column: [] for column in policy_checks.FACT_COLUMNS}
+
+    start = datetime.datetime(2015, 1, 1)
+
+    for i in range(count):
+        name = "".join(rng.choices(string.ascii_lowercase + "-_", k=rng.randint(5, 30)))
+
+        if rng.random() < 0.1:
+            name = name.capitalize()
+
+        pushed_at = start + datetime.timedelta(seconds=rng.randint(0, 10 * 365 * 24 * 60 * 60))
+
+        commits = [{"signature": None if rng.random() < 0.05 else {"isValid": True}} for _ in range(15)]
+
+        pull_requests = []
+
+        for _ in range(rng.randint(0, 20)):
+            if rng.random() < 0.05:
+                pull_requests.append({"author": None})
+            elif rng.random() < 0.02:
+                pull_requests.append({"author": {"login": f"external-{rng.randint(0, 1000)}"}})
+            else:
+                pull_requests.append({"author": {"login": rng.choice(org_members)}})
+
+        facts["name"].append(f"{name}-{i}")
+        facts["visibility"].append(rng.choice(["PUBLIC", "PRIVATE", "INTERNAL"]))
+        facts["pushed_at"].append(pushed_at.strftime(policy_checks.TIMESTAMP_FORMAT))
+        facts["commits"].append(commits)
+        facts["pull_requests"].append(pull_requests)
+        facts["contents"].append([{"name": file} for file in FILES if rng.random() < 0.8])
+        facts["branch_protection"].append(rng.random() < 0.7)
+        facts["secret_scanning"].append(rng.random() < 0.9)
+        facts["push_protection"].append(rng.random() < 0.9)
+        facts["dependabot_enabled"].append(rng.random() < 0.9)
+        facts["codeowners_missing"].append(rng.random() < 0.3)
+        facts["point_of_contact_missing"].append(rng.random() < 0.2)
+
+    return facts
+
+
+def evaluate_individually(facts: dict[str, list], org_members: list[str], inactivity_threshold: int) -> dict[str, list[bool]]:
+    """Evaluates the policy checks one repository at a time, using the individual check functions.
+
+    Args:
+        facts (dict[str, list]): The facts about each repository.
+        org_members (list[str]): The members of the organization.
+        inactivity_threshold (int): The number of years after which a repository is considered inactive.
+
+    Returns:
+        dict[str, list[bool]]: A column of results for each of policy_checks.CHECKS.
+    """
+    results = {check: [] for check in policy_checks.CHECKS}
+
+    for i in range(len(facts["name"])):
+        contents = facts["contents"][i]
+
+        checklist = {
+            "inactive": policy_checks.is_inactive(facts["pushed_at"][i], inactivity_threshold),
+            "unprotected_branches": not facts["branch_protection"][i],
+            "unsigned_commits": policy_checks.has_unsigned_commits(facts["commits"][i]),
+            "readme_missing": policy_checks.file_missing(contents, "README.md"),
+            "license_missing": policy_checks.file_missing(contents, "LICENSE"),
+            "pirr_missing": policy_checks.file_missing(contents, "PIRR.md"),
+            "gitignore_missing": policy_checks.file_missing(contents, ".gitignore"),
+            "external_pr": policy_checks.has_external_pr(facts["pull_requests"][i], org_members),
+            "breaks_naming_convention": policy_checks.breaks_naming_convention(facts["name"][i]),
+            "secret_scanning_disabled": not facts["secret_scanning"][i],
+            "push_protection_disabled": not facts["push_protection"][i],
+            "dependabot_disabled": not facts["dependabot_enabled"][i],
+            "codeowners_missing": facts["codeowners_missing"][i],
+            "point_of_contact_missing": facts["point_of_contact_missing"][i],
+        }
+
+        if facts["visibility"][i] == "PUBLIC":
+            checklist["pirr_missing"] = False
+        else:
+            checklist["license_missing"] = False
+
+        for check in policy_checks.CHECKS:
+            results[check].append(checklist[check])
+
+    return results
+
+
+def run(count: int, inactivity_threshold: int = 1) -> None:
+    """Times both approaches for a number of repositories and checks that their results match.
+
+    Args:
+        count (int): The number of repositories.
+        inactivity_threshold (int, optional): The inactivity threshold in years. Defaults to 1.
+
+    Raises:
+        Exception: If the two approaches give different results.
+    """
+    org_members = [f"member-{i}" for i in range(2_000)]
+
+    facts = generate_facts(count, org_members)
+
+    start = time.perf_counter()
+    individual_results = evaluate_individually(facts, org_members, inactivity_threshold)
+    individual_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_results = policy_checks.evaluate_batch(facts, org_members, inactivity_threshold)
+    batch_time = time.perf_counter() - start
+
+    if individual_results != batch_results:
+        mismatched = [check for check in policy_checks.CHECKS if individual_results[check] != batch_results[check]]
+        raise Exception(f"Batch results differ from the individual checks for: {', '.join(mismatched)}.")
+
+    print(f"{count:>9,} repositories: individual {individual_time:8.3f}s | batch {batch_time:8.3f}s | speedup {individual_time / batch_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or DEFAULT_SIZES
+
+    for size in sizes:
+        run(size)
@@ -0,0 +1,499 @@
+"""A record/replay harness for timing the Data Logger's handler end to end without GitHub, Secrets Manager or S3.
+
+Record the GitHub API traffic of a real run into a cassette (needs the usual environment variables and AWS credentials):
+
+    python -m benchmarks.replay_harness record cassette.json.gz
+
+Replay the cassette, serving every request from it with the recorded latency, and time the handler:
+
+    python -m benchmarks.replay_harness replay cassette.json.gz [--latency recorded|<ms>] [--latency-scale 1.0] [--runs 3] [--set settings.thread_count=40]
+
+S3 is replaced by an in-memory stub in both modes, so every run starts from the same (empty) bucket and nothing is published.
+Secrets Manager and the GitHub App token exchange are also stubbed when replaying.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import boto3
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+import src.main as main
+from src.transport import PooledTransport
+
+CASSETTE_VERSION = 1
+
+# The features which cannot run offline, and are turned off in both modes
+OFFLINE_FEATURES = {
+    "sharded_collection": False,
+}
+
+# The settings for local state which would change the traffic between runs, pointed at a fresh directory for each run
+STATE_DIRECTORIES = ["response_cache_directory", "codeowners_cache_directory", "checkpoint_directory"]
+
+# The environment variables stored in the cassette, so a replay runs against the same organisation
+ENVIRONMENT_VARIABLES = ["GITHUB_ORG", "GITHUB_APP_CLIENT_ID", "AWS_DEFAULT_REGION", "AWS_SECRET_NAME", "AWS_ACCOUNT_NAME"]
+
+# Headers which describe the recorded response body, rather than the decoded body stored in the cassette
+DROPPED_HEADERS = ["Content-Encoding", "Content-Length", "Transfer-Encoding"]
+
+
+def get_interaction_key(method: str, url: str, params: dict | None, body: Any) -> str:
+    """Gets the key a request is matched on. The host is ignored, so a cassette can be replayed against any server.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The full URL of the request.
+        params (dict | None): The query parameters.
+        body (Any): The JSON body of the request (GraphQL queries and variables).
+
+    Returns:
+        str: The key.
+    """
+
+    parts = urlsplit(url)
+
+    query = parse_qsl(parts.query) + [(str(key), str(value)) for key, value in (params or {}).items() if value is not None]
+
+    return json.dumps([method, parts.path, sorted(query), body], sort_keys=True)
+
+
+class Cassette:
+    def __init__(self) -> None:
+        """The GitHub API requests and responses of a run.
+
+        Identical requests (i.e. retries, or pages requested more than once) are served in the order they were recorded.
+        Once only one response is left for a request, it is served for every later match.
+        """
+        self.environment = {}
+        self.interactions = []
+
+        self.hits = 0
+        self.misses = []
+
+        self._queues = None
+        self._lock = threading.Lock()
+
+    def load(self, path: str) -> None:
+        """Loads a cassette (gzip compressed if the path ends in .gz).
+
+        Args:
+            path (str): The path of the cassette.
+
+        Raises:
+            Exception: If the cassette was written by a different version of the harness.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+
+        with opener(path, "rt") as f:
+            contents = json.load(f)
+
+        if contents.get("version") != CASSETTE_VERSION:
+            raise Exception(f"Unsupported cassette version {contents.get('version')}. Please record the cassette again.")
+
+        self.environment = contents["environment"]
+        self.interactions = contents["interactions"]
+
+    def save(self, path: str) -> None:
+        """Saves the cassette (gzip compressed if the path ends in .gz).
+
+        Args:
+            path (str): The path of the cassette.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+
+        with opener(path, "wt") as f:
+            json.dump({"version": CASSETTE_VERSION, "environment": self.environment, "interactions": self.interactions}, f)
+
+    def record(self, method: str, url: str, params: dict | None, body: Any, response: Response, latency: float) -> None:
+        """Records a request and its response.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+            params (dict | None): The query parameters.
+            body (Any): The JSON body of the request.
+            response (Response): The response.
+            latency (float): The time (in seconds) the request took.
+        """
+        interaction = {
+            "key": get_interaction_key(method, url, params, body),
+            "status": response.status_code,
+            "headers": {header: value for header, value in response.headers.items() if header not in DROPPED_HEADERS},
+            "url": response.url,
+            "content": response.text,
+            "latency": latency,
+        }
+
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def rewind(self) -> None:
+        """Resets the queue of responses for each request, so the cassette can be replayed again."""
+        queues = {}
+
+        for interaction in self.interactions:
+            queues.setdefault(interaction["key"], deque()).append(interaction)
+
+        with self._lock:
+            self._queues = queues
+            self.hits = 0
+            self.misses = []
+
+    def play(self, method: str, url: str, params: dict | None, body: Any) -> dict | None:
+        """Finds the recorded response for a request.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+            params (dict | None): The query parameters.
+            body (Any): The JSON body of the request.
+
+        Returns:
+            dict | None: The recorded interaction, or None if the request was not recorded.
+        """
+        key = get_interaction_key(method, url, params, body)
+
+        with self._lock:
+            queue = self._queues.get(key)
+
+            if not queue:
+                self.misses.append(f"{method} {urlsplit(url).path}")
+                return None
+
+            self.hits += 1
+
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+
+class RecordingSession:
+    def __init__(self, session: Any, cassette: Cassette) -> None:
+        """Wraps a transport's session, recording every request and response in a cassette.
+
+        Args:
+            session (Any): The session to wrap.
+            cassette (Cassette): The cassette to record to.
+        """
+        self.session = session
+        self.cassette = cassette
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        started_at = time.perf_counter()
+
+        response = self.session.request(method, url, **kwargs)
+
+        self.cassette.record(method, url, kwargs.get("params"), kwargs.get("json"), response, time.perf_counter() - started_at)
+
+        return response
+
+
+class ReplaySession:
+    def __init__(self, cassette: Cassette, latency: str, latency_scale: float) -> None:
+        """Serves requests from a cassette in place of a transport's session.
+
+        Args:
+            cassette (Cassette): The cassette to replay.
+            latency (str): The latency to inject: recorded (each response's recorded latency) or a fixed number of milliseconds.
+            latency_scale (float): The multiplier applied to the recorded latency.
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.latency_scale = latency_scale
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        interaction = self.cassette.play(method, url, kwargs.get("params"), kwargs.get("json"))
+
+        if interaction is None:
+            # Unrecorded requests fail as not found, which the retry policy does not retry
+            interaction = {"status": 404, "headers": {"Content-Type": "application/json"}, "url": url, "content": json.dumps({"message": "Not recorded"}), "latency": 0.0}
+
+            if kwargs.get("params"):
+                interaction["url"] = f"{url}?{urlencode(kwargs['params'])}"
+
+        if self.latency == "recorded":
+            delay = interaction["latency"] * self.latency_scale
+        else:
+            delay = float(self.latency) / 1000
+
+        time.sleep(delay)
+
+        response = Response()
+
+        response.status_code = interaction["status"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        response.url = interaction["url"]
+        response.encoding = "utf-8"
+        response.reason = ""
+        response._content = interaction["content"].encode("utf-8")
+
+        return response
+
+
+class FakeS3:
+    def __init__(self) -> None:
+        """An in-memory stand in for the S3 client, holding the objects written during a run."""
+        self.objects = {}
+        self.uploads = {}
+
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: Any, **kwargs: Any) -> dict:
+        data = Body.encode("utf-8") if isinstance(Body, str) else bytes(Body)
+
+        with self._lock:
+            self.objects[Key] = data
+
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs: Any) -> dict:
+        with self._lock:
+            if Key not in self.objects:
+                raise Exception(f"NoSuchKey: {Key}")
+
+            return {"Body": io.BytesIO(self.objects[Key])}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs: Any) -> dict:
+        with self._lock:
+            self.objects.pop(Key, None)
+
+        return {}
+
+    def create_multipart_upload(self, Bucket: str, Key: str, **kwargs: Any) -> dict:
+        with self._lock:
+            upload_id = str(len(self.uploads))
+
+            self.uploads[upload_id] = {}
+
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes, **kwargs: Any) -> dict:
+        with self._lock:
+            self.uploads[UploadId][PartNumber] = bytes(Body)
+
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict, **kwargs: Any) -> dict:
+        with self._lock:
+            parts = self.uploads.pop(UploadId)
+
+        return self.put_object(Bucket, Key, b"".join(parts[number] for number in sorted(parts)))
+
+    def abort_multipart_upload(self, Bucket: str, Key: str, UploadId: str, **kwargs: Any) -> dict:
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+
+        return {}
+
+
+class FakeSecretsManager:
+    def get_secret_value(self, SecretId: str, **kwargs: Any) -> dict:
+        return {"SecretString": "replay"}
+
+
+class FakeSession:
+    def __init__(self, s3: FakeS3, replay: bool) -> None:
+        """A stand in for boto3.session.Session which returns the S3 stub (and the Secrets Manager stub when replaying).
+
+        Args:
+            s3 (FakeS3): The S3 stub.
+            replay (bool): Whether the run is a replay. When recording, other clients are created for real.
+        """
+        self.s3 = s3
+        self.replay = replay
+
+    def client(self, service_name: str, **kwargs: Any) -> Any:
+        if service_name == "s3":
+            return self.s3
+
+        if self.replay and service_name == "secretsmanager":
+            return FakeSecretsManager()
+
+        if self.replay:
+            raise Exception(f"The {service_name} client is not available when replaying.")
+
+        return REAL_SESSION().client(service_name, **kwargs)
+
+
+REAL_SESSION = boto3.session.Session
+
+
+def build_config(overrides: list[str], state_directory: str, engines: tuple[str, ...] = ("threads",)) -> dict:
+    """Loads config.json and applies the harness's changes and the command line overrides.
+
+    Args:
+        overrides (list[str]): Overrides in the form section.key=value, where value is JSON (i.e. settings.thread_count=40).
+        state_directory (str): The directory to keep the caches and checkpoint in for this run.
+        engines (tuple[str, ...], optional): The collection engines which can be used. Defaults to ("threads",), as the
+            asyncio engine's requests do not go through the transport, so cannot be recorded or replayed.
+
+    Raises:
+        Exception: If an override is not in the form section.key=value.
+        Exception: If the configured collection engine is not one of engines.
+
+    Returns:
+        dict: The configuration.
+    """
+
+    config = main.get_config_file("./config/config.json")
+
+    config["features"].update(OFFLINE_FEATURES)
+
+    for setting in STATE_DIRECTORIES:
+        config["settings"][setting] = os.path.join(state_directory, setting)
+
+    for override in overrides:
+        path, separator, value = override.partition("=")
+        section, _, key = path.partition(".")
+
+        if not separator or section not in config or not key:
+            raise Exception(f"Invalid override {override}. Overrides must be in the form section.key=value.")
+
+        try:
+            config[section][key] = json.loads(value)
+        except json.JSONDecodeError:
+            config[section][key] = value
+
+    if config["settings"]["collection_engine"] not in engines:
+        raise Exception(f"The {config['settings']['collection_engine']} collection engine is not supported here. Please use one of: {', '.join(engines)}.")
+
+    return config
+
+
+def run_handler(config: dict, s3: FakeS3, replay: bool) -> tuple[float, Any]:
+    """Runs the handler once with the stubs in place, timing it end to end.
+
+    Args:
+        config (dict): The configuration to run with.
+        s3 (FakeS3): The S3 stub.
+        replay (bool): Whether the run is a replay.
+
+    Returns:
+        tuple[float, Any]: The time (in seconds) the handler took and its result.
+    """
+
+    original_get_config_file = main.get_config_file
+    original_get_access_token = main.get_access_token
+
+    main.get_config_file = lambda path: json.loads(json.dumps(config))
+    boto3.session.Session = lambda *args, **kwargs: FakeSession(s3, replay)
+
+    if replay:
+        main.get_access_token = lambda *args: ("replay", "2099-01-01T00:00:00Z")
+
+    try:
+        started_at = time.perf_counter()
+
+        result = main.handler(None, None)
+
+        return time.perf_counter() - started_at, result
+    finally:
+        main.get_config_file = original_get_config_file
+        main.get_access_token = original_get_access_token
+        boto3.session.Session = REAL_SESSION
+
+
+def record(path: str, overrides: list[str]) -> None:
+    """Runs the handler against GitHub, recording its traffic to a cassette.
+
+    Args:
+        path (str): The path to save the cassette to.
+        overrides (list[str]): The configuration overrides.
+    """
+
+    cassette = Cassette()
+    cassette.environment = {variable: os.getenv(variable) for variable in ENVIRONMENT_VARIABLES}
+
+    original_get_session = PooledTransport.get_session
+
+    PooledTransport.get_session = lambda self: RecordingSession(original_get_session(self), cassette)
+
+    try:
+        with tempfile.TemporaryDirectory() as state_directory:
+            seconds, result = run_handler(build_config(overrides, state_directory), FakeS3(), replay=False)
+    finally:
+        PooledTransport.get_session = original_get_session
+
+    cassette.save(path)
+
+    print(f"Recorded {len(cassette.interactions)} requests to {path} in {seconds:.2f}s ({result}).")
+
+
+def replay(path: str, overrides: list[str], latency: str, latency_scale: float, runs: int) -> None:
+    """Replays a cassette through the handler, timing each run.
+
+    Args:
+        path (str): The path of the cassette.
+        overrides (list[str]): The configuration overrides.
+        latency (str): The latency to inject: recorded or a fixed number of milliseconds.
+        latency_scale (float): The multiplier applied to the recorded latency.
+        runs (int): The number of times to run the handler.
+    """
+
+    cassette = Cassette()
+    cassette.load(path)
+
+    for variable, value in cassette.environment.items():
+        os.environ[variable] = value or "replay"
+
+    session = ReplaySession(cassette, latency, latency_scale)
+
+    original_get_session = PooledTransport.get_session
+
+    PooledTransport.get_session = lambda self: session
+
+    times = []
+
+    try:
+        for run in range(1, runs + 1):
+            cassette.rewind()
+
+            s3 = FakeS3()
+
+            with tempfile.TemporaryDirectory() as state_directory:
+                seconds, result = run_handler(build_config(overrides, state_directory), s3, replay=True)
+
+            times.append(seconds)
+
+            written = sum(len(data) for data in s3.objects.values())
+
+            print(
+                f"Run {run}: {seconds:8.3f}s | {cassette.hits} requests served | {len(cassette.misses)} not recorded | "
+                f"{len(s3.objects)} objects written ({written:,} bytes) | {result}"
+            )
+
+            for miss in sorted(set(cassette.misses))[:10]:
+                print(f"    Not recorded: {miss}")
+    finally:
+        PooledTransport.get_session = original_get_session
+
+    print(f"{runs} runs of {len(cassette.interactions)} recorded requests (latency {latency}, scale {latency_scale}): min {min(times):.3f}s | mean {statistics.mean(times):.3f}s | max {max(times):.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or replay the Data Logger's GitHub API traffic.")
+
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("cassette", help="The path of the cassette (gzip compressed if it ends in .gz).")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], help="Override config.json, i.e. settings.thread_count=40.")
+    parser.add_argument("--latency", default="recorded", help="The latency to inject when replaying: recorded, or a fixed number of milliseconds.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="The multiplier applied to the recorded latency.")
+    parser.add_argument("--runs", type=int, default=1, help="The number of times to replay the cassette.")
+
+    arguments = parser.parse_args()
+
+    if arguments.mode == "record":
+        record(arguments.cassette, arguments.overrides)
+    else:
+        replay(arguments.cassette, arguments.overrides, arguments.latency, arguments.latency_scale, arguments.runs)
@@ -0,0 +1,145 @@
+"""A benchmark which runs the Data Logger's handler against a local fake GitHub API, sweeping organisation size against thread_count.
+
+Each organisation is generated by benchmarks/synthetic_org.py and served by benchmarks/fake_github.py, with a fixed
+latency added to every response. S3, Secrets Manager and the GitHub App token are stubbed as in the replay harness.
+
+Run from the data_logger directory:
+
+    python -m benchmarks.scale_benchmark [repository counts...] [--threads 10 20 40] [--latency 50] [--set settings.collection_engine="asyncio"]
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Any
+
+import src.async_collection as async_collection
+import src.interfaces as interfaces
+from benchmarks.fake_github import FakeGitHub, start_server
+from benchmarks.replay_harness import FakeS3, build_config, run_handler
+from benchmarks.synthetic_org import generate_org
+from src.transport import PooledTransport
+
+DEFAULT_SIZES = [5_000, 20_000, 50_000]
+DEFAULT_THREAD_COUNTS = [10, 20, 40]
+
+# The environment variables the handler needs. Their values do not matter against the fake API
+ENVIRONMENT_VARIABLES = {
+    "GITHUB_APP_CLIENT_ID": "scale-benchmark",
+    "AWS_DEFAULT_REGION": "eu-west-2",
+    "AWS_SECRET_NAME": "scale-benchmark",
+    "AWS_ACCOUNT_NAME": "scale-benchmark",
+}
+
+
+class RedirectingSession:
+    def __init__(self, session: Any, base_url: str) -> None:
+        """Wraps a transport's session, sending requests for the GitHub API to the fake API instead.
+
+        Args:
+            session (Any): The session to wrap.
+            base_url (str): The URL of the fake API.
+        """
+        self.session = session
+        self.base_url = base_url
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        if url.startswith(interfaces.GITHUB_API_URL):
+            url = self.base_url + url[len(interfaces.GITHUB_API_URL):]
+
+        return self.session.request(method, url, **kwargs)
+
+
+def run_size(size: int, thread_counts: list[int], latency: float, overrides: list[str]) -> list[dict]:
+    """Generates an organisation and runs the handler against it once for each thread count.
+
+    Args:
+        size (int): The number of non-archived repositories in the organisation.
+        thread_counts (list[int]): The values of thread_count to run with.
+        latency (float): The time (in seconds) added to every response.
+        overrides (list[str]): The configuration overrides, in the form section.key=value.
+
+    Returns:
+        list[dict]: The results of each run.
+    """
+
+    org = generate_org(size)
+
+    # The rate limits are high enough that they do not end a run, as this benchmark measures throughput
+    github = FakeGitHub(org, latency=latency, rest_limit=10_000_000, graphql_limit=10_000_000)
+
+    server = start_server(github)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["GITHUB_ORG"] = org["login"]
+
+    original_get_session = PooledTransport.get_session
+    original_async_url = async_collection.GITHUB_API_URL
+
+    PooledTransport.get_session = lambda self: RedirectingSession(original_get_session(self), base_url)
+    async_collection.GITHUB_API_URL = base_url
+
+    results = []
+
+    try:
+        for thread_count in thread_counts:
+            github.stats = {key: 0 for key in github.stats}
+
+            with tempfile.TemporaryDirectory() as state_directory:
+                config = build_config(overrides + [f"settings.thread_count={thread_count}"], state_directory, engines=("threads", "asyncio"))
+
+                seconds, result = run_handler(config, FakeS3(), replay=True)
+
+            requests_served = github.stats["rest"] + github.stats["graphql"]
+
+            results.append({
+                "size": size,
+                "thread_count": thread_count,
+                "seconds": seconds,
+                "rest": github.stats["rest"],
+                "graphql": github.stats["graphql"],
+                "rate_limited": github.stats["rate_limited"],
+                "repositories_per_second": size / seconds,
+                "requests_per_second": requests_served / seconds,
+                "result": result,
+            })
+
+            print(
+                f"{size:>7,} repositories | {thread_count:>3} threads | {seconds:8.2f}s | {size / seconds:8.1f} repos/s | "
+                f"{github.stats['rest']:>7,} REST + {github.stats['graphql']:>6,} GraphQL requests ({requests_served / seconds:7.1f}/s) | "
+                f"{github.stats['rate_limited']} rate limited",
+                flush=True,
+            )
+    finally:
+        PooledTransport.get_session = original_get_session
+        async_collection.GITHUB_API_URL = original_async_url
+
+        server.shutdown()
+        server.server_close()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep organisation size against thread_count using a local fake GitHub API.")
+
+    parser.add_argument("sizes", type=int, nargs="*", default=DEFAULT_SIZES, help="The numbers of non-archived repositories to generate.")
+    parser.add_argument("--threads", type=int, nargs="+", default=DEFAULT_THREAD_COUNTS, help="The values of thread_count to run with.")
+    parser.add_argument("--latency", type=float, default=50, help="The latency (in milliseconds) added to every response.")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], help="Override config.json, i.e. settings.collection_engine=asyncio.")
+
+    arguments = parser.parse_args()
+
+    for variable, value in ENVIRONMENT_VARIABLES.items():
+        os.environ.setdefault(variable, value)
+
+    results = []
+
+    for size in arguments.sizes:
+        results += run_size(size, arguments.threads, arguments.latency / 1000, arguments.overrides)
+
+    print()
+    print(f"{'Repositories':>12} | {'Threads':>7} | {'Seconds':>8} | {'Repos/s':>8} | {'Requests/s':>10}")
+
+    for result in results:
+        print(f"{result['size']:>12,} | {result['thread_count']:>7} | {result['seconds']:>8.2f} | {result['repositories_per_second']:>8.1f} | {result['requests_per_second']:>10.1f}")
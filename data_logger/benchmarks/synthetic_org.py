@@ -0,0 +1,270 @@
+"""A generator for synthetic GitHub organisations, with realistic distributions of the data the Data Logger collects.
+
+The organisations are served by benchmarks/fake_github.py for scale testing. Generation is deterministic for a given seed.
+"""
+
+import datetime
+import random
+from typing import Any
+
+from src import policy_checks
+
+# The share of repositories with each visibility
+VISIBILITIES = {"public": 0.3, "private": 0.3, "internal": 0.4}
+
+# The share of Dependabot alerts with each severity
+SEVERITIES = {"critical": 0.05, "high": 0.25, "medium": 0.5, "low": 0.2}
+
+# The number of commits kept for each repository (the Data Logger requests at most signed_commit_number)
+COMMIT_HISTORY = 30
+
+# The most branches a repository can have. Branch counts are long tailed, so a few repositories need several pages
+MAX_BRANCHES = 300
+
+WORDS = ["api", "dashboard", "data", "pipeline", "service", "frontend", "backend", "infra", "tools", "docs", "lambda", "survey", "census", "Legacy", "App"]
+
+
+def format_timestamp(timestamp: datetime.datetime) -> str:
+    """Formats a timestamp in the format used by the GitHub API.
+
+    Args:
+        timestamp (datetime.datetime): The timestamp.
+
+    Returns:
+        str: The timestamp (i.e. 2024-01-01T12:00:00Z).
+    """
+    return timestamp.strftime(policy_checks.TIMESTAMP_FORMAT)
+
+
+def choose(rng: random.Random, weights: dict[str, float]) -> str:
+    """Chooses a key from a dictionary of weights.
+
+    Args:
+        rng (random.Random): The random number generator.
+        weights (dict[str, float]): The weight of each key.
+
+    Returns:
+        str: The chosen key.
+    """
+    return rng.choices(list(weights), list(weights.values()))[0]
+
+
+def geometric(rng: random.Random, mean: float, limit: int) -> int:
+    """Draws a count from a geometric distribution, so most counts are small with a long tail.
+
+    Args:
+        rng (random.Random): The random number generator.
+        mean (float): The mean count.
+        limit (int): The largest count.
+
+    Returns:
+        int: The count.
+    """
+    count = 0
+
+    while count < limit and rng.random() < mean / (mean + 1):
+        count += 1
+
+    return count
+
+
+def generate_codeowners(rng: random.Random, org: str, teams: list[str], members: list[str]) -> str:
+    """Generates the text of a CODEOWNERS file, owned by teams and individual users.
+
+    Args:
+        rng (random.Random): The random number generator.
+        org (str): The name of the organisation.
+        teams (list[str]): The slugs of the organisation's teams.
+        members (list[str]): The logins of the organisation's members.
+
+    Returns:
+        str: The CODEOWNERS file.
+    """
+
+    lines = ["# Code owners"]
+
+    for pattern in ["*", "/docs/", "*.py"][:rng.randint(1, 3)]:
+        owners = [f"@{org}/{team}" for team in rng.sample(teams, rng.randint(0, min(2, len(teams))))]
+        owners += [f"@{member}" for member in rng.sample(members, rng.randint(0 if owners else 1, 2))]
+
+        lines.append(f"{pattern} {' '.join(owners)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_repository(rng: random.Random, index: int, org: str, teams: list[str], members: list[str], now: datetime.datetime, archived: bool) -> dict[str, Any]:
+    """Generates a single repository.
+
+    Args:
+        rng (random.Random): The random number generator.
+        index (int): The index of the repository, used to keep its name unique.
+        org (str): The name of the organisation.
+        teams (list[str]): The slugs of the organisation's teams.
+        members (list[str]): The logins of the organisation's members.
+        now (datetime.datetime): The time the organisation is generated at.
+        archived (bool): Whether the repository is archived.
+
+    Returns:
+        dict[str, Any]: The repository.
+    """
+
+    name = f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{index}"
+    visibility = choose(rng, VISIBILITIES)
+
+    created_at = now - datetime.timedelta(days=rng.uniform(30, 10 * 365))
+
+    # A quarter of repositories have not been pushed to for over a year
+    if rng.random() < 0.25:
+        pushed_at = now - datetime.timedelta(days=rng.uniform(366, max(367, (now - created_at).days)))
+    else:
+        pushed_at = now - datetime.timedelta(days=rng.uniform(0, 365))
+
+    pushed_at = max(pushed_at, created_at)
+
+    branch_count = min(MAX_BRANCHES, int(rng.paretovariate(1.2)) + geometric(rng, 1, 10))
+
+    branches = []
+
+    for branch in range(branch_count):
+        branches.append({
+            "name": "main" if branch == 0 else f"feature-{branch}",
+            # Default branches are usually protected, other branches rarely are
+            "protected": rng.random() < (0.75 if branch == 0 else 0.15),
+            "ruleset": rng.random() < 0.05,
+        })
+
+    signing_rate = rng.choice([0.0, 0.5, 0.9, 1.0])
+
+    # 0 is an unsigned commit, 1 a valid signature and 2 an invalid signature
+    commits = [(1 if rng.random() < 0.97 else 2) if rng.random() < signing_rate else 0 for _ in range(COMMIT_HISTORY)]
+
+    pull_requests = []
+
+    for _ in range(geometric(rng, 2, 50)):
+        roll = rng.random()
+
+        if roll < 0.02:
+            pull_requests.append(None)
+        elif roll < 0.05:
+            pull_requests.append(f"external-{rng.randint(0, 500)}")
+        else:
+            pull_requests.append(rng.choice(members))
+
+    contents = [file for file, rate in [("README.md", 0.9), (".gitignore", 0.85), ("src", 0.7), ("pyproject.toml", 0.4), ("Makefile", 0.3), ("docs", 0.3)] if rng.random() < rate]
+
+    if rng.random() < (0.8 if visibility == "public" else 0.3):
+        contents.append("LICENSE")
+
+    if visibility != "public" and rng.random() < 0.4:
+        contents.append("PIRR.md")
+
+    codeowners = None
+    codeowners_path = None
+
+    # CODEOWNERS can be in the root of the repository or in .github
+    roll = rng.random()
+
+    if roll < 0.3:
+        codeowners_path = "CODEOWNERS"
+    elif roll < 0.55:
+        codeowners_path = ".github/CODEOWNERS"
+
+    if codeowners_path:
+        codeowners = generate_codeowners(rng, org, teams, members)
+
+        contents.append(codeowners_path.split("/")[0])
+    elif rng.random() < 0.3:
+        contents.append(".github")
+
+    secret_scanning = rng.random() < 0.9
+    push_protection = secret_scanning and rng.random() < 0.85
+
+    return {
+        "name": name,
+        "archived": archived,
+        "visibility": visibility,
+        "created_at": format_timestamp(created_at),
+        "pushed_at": format_timestamp(pushed_at),
+        "head_oid": f"{rng.getrandbits(160):040x}",
+        "vulnerability_alerts": rng.random() < 0.85,
+        "secret_scanning": secret_scanning,
+        "push_protection": push_protection,
+        "branches": branches,
+        "commits": commits,
+        "pull_requests": pull_requests,
+        "contents": sorted(set(contents)),
+        "codeowners_path": codeowners_path,
+        "codeowners": codeowners,
+    }
+
+
+def generate_org(repository_count: int, seed: int = 0, org: str = "synthetic-org") -> dict[str, Any]:
+    """Generates a synthetic organisation.
+
+    The organisation has repository_count non-archived repositories (the repositories the Data Logger collects),
+    plus a tenth as many archived repositories, with members and teams scaled to its size.
+
+    Args:
+        repository_count (int): The number of non-archived repositories.
+        seed (int, optional): The random seed. Defaults to 0.
+        org (str, optional): The name of the organisation. Defaults to "synthetic-org".
+
+    Returns:
+        dict[str, Any]: The organisation: its name, members, teams, verified emails, repositories and alerts.
+    """
+
+    rng = random.Random(seed)
+
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+    members = [f"member-{i}" for i in range(max(50, repository_count // 5))]
+
+    teams = {f"team-{i}": rng.sample(members, rng.randint(2, min(15, len(members)))) for i in range(max(5, repository_count // 50))}
+
+    # Most members have one verified email. Some have none, so their CODEOWNERS have no point of contact
+    emails = {member: [f"{member}@example.gov.uk"] * (0 if rng.random() < 0.1 else 1) for member in members}
+
+    archived_count = repository_count // 10
+
+    repositories = [
+        generate_repository(rng, i, org, list(teams), members, now, archived=i >= repository_count)
+        for i in range(repository_count + archived_count)
+    ]
+
+    rng.shuffle(repositories)
+
+    dependabot_alerts = []
+    secret_scanning_alerts = []
+
+    for repository in repositories:
+        if repository["vulnerability_alerts"]:
+            for _ in range(geometric(rng, 3, 100)):
+                dependabot_alerts.append({
+                    "repository": repository["name"],
+                    "severity": choose(rng, SEVERITIES),
+                    "created_at": format_timestamp(now - datetime.timedelta(days=rng.uniform(0, 2 * 365))),
+                })
+
+        if repository["secret_scanning"] and rng.random() < 0.05:
+            for _ in range(rng.randint(1, 3)):
+                secret_scanning_alerts.append({
+                    "repository": repository["name"],
+                    "created_at": format_timestamp(now - datetime.timedelta(days=rng.uniform(0, 2 * 365))),
+                })
+
+    # Alerts are numbered in the order they were created, as on GitHub
+    for alerts in (dependabot_alerts, secret_scanning_alerts):
+        alerts.sort(key=lambda alert: alert["created_at"])
+
+        for number, alert in enumerate(alerts, start=1):
+            alert["number"] = number
+
+    return {
+        "login": org,
+        "members": members,
+        "teams": teams,
+        "emails": emails,
+        "repositories": repositories,
+        "dependabot_alerts": dependabot_alerts,
+        "secret_scanning_alerts": secret_scanning_alerts,
+    }
@@ -0,0 +1,415 @@
+"""An asyncio based engine for collecting repository data, as an alternative to threading."""
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import aiohttp
+import github_api_toolkit
+
+from src.logger import wrapped_logging
+import src.metrics as metrics
+from src.interfaces import GITHUB_API_URL
+from src.rate_limit import RateLimitGovernor
+import src.retry_policy as retry_policy
+from src.token_manager import InstallationTokenManager
+import src.main as main
+
+
+class AsyncGitHubClient:
+    def __init__(self, session: aiohttp.ClientSession, governor: RateLimitGovernor, max_concurrency: int, graphql_concurrency: int, token_manager: InstallationTokenManager = None) -> None:
+        """A non-blocking client for the GitHub REST and GraphQL APIs.
+
+        The number of requests in flight is bounded by a semaphore for each API,
+        and further paced by the shared rate limit governor.
+
+        Args:
+            session (aiohttp.ClientSession): The aiohttp session to make requests with.
+            governor (RateLimitGovernor): The rate limit governor shared by all workers.
+            max_concurrency (int): The maximum number of REST requests in flight at once.
+            graphql_concurrency (int): The maximum number of GraphQL requests in flight at once.
+            token_manager (InstallationTokenManager, optional): Provides a fresh token for each request. Defaults to None (the session's token is used).
+        """
+        self.session = session
+        self.governor = governor
+
+        self.rest_semaphore = asyncio.Semaphore(max_concurrency)
+        self.graphql_semaphore = asyncio.Semaphore(graphql_concurrency)
+
+        self.token_manager = token_manager
+
+    async def _send(self, semaphore: asyncio.Semaphore, resource: str, endpoint: str, method: str, url: str, **kwargs: Any) -> Any:
+        """Makes a single request to the GitHub API, reporting the response to the rate limit governor and the run's metrics.
+
+        Args:
+            semaphore (asyncio.Semaphore): The semaphore bounding requests to this API.
+            resource (str): The API resource (rest or graphql).
+            endpoint (str): The name of the endpoint or GraphQL operation, for the run's metrics.
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+
+        Returns:
+            Any: The response body as JSON.
+        """
+        async with semaphore:
+            await self.governor.acquire_async(resource)
+
+            # The token is read for each request, so requests made after it is replaced use the new token
+            if self.token_manager is not None:
+                kwargs["headers"] = {"Authorization": f"token {self.token_manager.get_token()}"}
+
+            status_code = None
+            headers = None
+            body = ""
+            response_json = None
+            bytes_received = 0
+
+            started_at = time.time()
+
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    status_code = response.status
+                    headers = response.headers
+
+                    # The body is kept on the error, so the retry policy can recognise secondary rate limits
+                    if status_code >= 400:
+                        body = await response.text()
+
+                        bytes_received = len(body.encode("utf-8"))
+
+                        raise aiohttp.ClientResponseError(response.request_info, response.history, status=status_code, message=body, headers=headers)
+
+                    response_json = await response.json()
+
+                    # The body has already been read, so this does not read it again
+                    bytes_received = len(await response.read())
+            finally:
+                rate_limit = None
+
+                if resource == "graphql" and type(response_json) is dict:
+                    rate_limit = (response_json.get("data") or {}).get("rateLimit")
+
+                self.governor.release(resource, status_code, headers, body, rate_limit)
+
+                metrics.recorder.record_request(endpoint, resource, time.time() - started_at, status_code, bytes_received, (rate_limit or {}).get("cost"))
+
+            return response_json
+
+    async def _request(self, semaphore: asyncio.Semaphore, resource: str, endpoint: str, method: str, url: str, **kwargs: Any) -> Any:
+        """Makes a request to the GitHub API, retrying it using the shared retry policy if it fails.
+
+        Args:
+            semaphore (asyncio.Semaphore): The semaphore bounding requests to this API.
+            resource (str): The API resource (rest or graphql).
+            endpoint (str): The name of the endpoint or GraphQL operation, for the run's metrics.
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+
+        Raises:
+            Exception: If the request fails with a fatal error, or fails after the maximum number of attempts or the retry budget is spent.
+
+        Returns:
+            Any: The response body as JSON.
+        """
+        return await retry_policy.policy.call_async(self._send, semaphore, resource, endpoint, method, url, **kwargs)
+
+    async def get(self, path: str, params: dict = None) -> Any:
+        """Makes a GET request to the GitHub REST API.
+
+        Args:
+            path (str): The path of the endpoint (i.e. /repos/{org}/{repo}).
+            params (dict, optional): The query parameters. Defaults to None.
+
+        Returns:
+            Any: The response body as JSON.
+        """
+        return await self._request(self.rest_semaphore, "rest", metrics.get_endpoint_name("GET", path), "GET", GITHUB_API_URL + path, params=params)
+
+    async def _send_graphql(self, query: str, variables: dict) -> dict:
+        """Makes a single request to the GitHub GraphQL API.
+
+        Args:
+            query (str): The GraphQL query.
+            variables (dict): The variables for the query.
+
+        Raises:
+            Exception: If the whole query failed (i.e. it timed out), raised with the GraphQL errors.
+
+        Returns:
+            dict: The response body as JSON.
+        """
+        response_json = await self._send(self.graphql_semaphore, "graphql", metrics.get_operation_name(query), "POST", f"{GITHUB_API_URL}/graphql", json={"query": query, "variables": variables})
+
+        # A query which failed as a whole returns 200 with no data, so its errors are raised for the retry policy
+        if response_json.get("data") is None:
+            raise Exception(response_json.get("errors"))
+
+        return response_json
+
+    async def graphql(self, query: str, variables: dict) -> dict:
+        """Makes a request to the GitHub GraphQL API, retrying it using the shared retry policy if it fails.
+
+        Args:
+            query (str): The GraphQL query.
+            variables (dict): The variables for the query.
+
+        Raises:
+            Exception: If the request fails with a fatal error, or fails after the maximum number of attempts or the retry budget is spent.
+
+        Returns:
+            dict: The response body as JSON.
+        """
+        return await retry_policy.policy.call_async(self._send_graphql, query, variables)
+
+
+async def get_remaining_data_batch(client: AsyncGitHubClient, org: str, repositories: list[str], max_commits: int) -> dict[str, tuple[list[dict], list[dict], list[dict]]]:
+    """Gets the remaining data (signed commits, external PRs, repository contents) for a batch of repositories.
+
+    Args:
+        client (AsyncGitHubClient): The asynchronous GitHub API client.
+        org (str): The name of the GitHub organization.
+        repositories (list[str]): The names of the repositories in the batch.
+        max_commits (int): The maximum number of commits to get.
+
+    Returns:
+        dict[str, tuple[list[dict], list[dict], list[dict]]]: The remaining data for each repository, keyed by repository name.
+    """
+
+    query = main.build_remaining_data_query(len(repositories))
+
+    variables = {
+        "org": org,
+        "max_commits": max_commits,
+    }
+
+    for i, repository in enumerate(repositories):
+        variables[f"repo{i}"] = repository
+
+    response_json = await client.graphql(query, variables)
+
+    response_data = response_json["data"]
+
+    remaining_data = {}
+
+    for i, repository in enumerate(repositories):
+        try:
+            repository_json = response_data[f"repo{i}"]
+        except TypeError:
+            repository_json = None
+
+        remaining_data[repository] = main.parse_remaining_data(repository_json)
+
+    return remaining_data
+
+
+async def get_branch_protection_batch(client: AsyncGitHubClient, org: str, repositories: list[str]) -> dict[str, bool | None]:
+    """Checks whether every branch is protected for a batch of repositories using GraphQL.
+
+    Args:
+        client (AsyncGitHubClient): The asynchronous GitHub API client.
+        org (str): The name of the GitHub organization.
+        repositories (list[str]): The names of the repositories in the batch.
+
+    Returns:
+        dict[str, bool | None]: Whether all branches are protected for each repository (None if the repository could not be checked).
+    """
+
+    results = {}
+
+    pending = {repository: None for repository in repositories}
+
+    while pending:
+        query = main.build_branch_protection_query(len(pending))
+        variables = main.build_branch_protection_variables(org, pending)
+
+        response_json = await client.graphql(query, variables)
+
+        pending = main.parse_branch_protection_response(response_json, pending, results)
+
+    return results
+
+
+async def get_rest_data(client: AsyncGitHubClient, org: str, repository: str, branch_protection: bool | None = None, security: dict | None = None) -> dict:
+    """Gets the REST data for a repository (branch protection, secret scanning and push protection).
+
+    Args:
+        client (AsyncGitHubClient): The asynchronous GitHub API client.
+        org (str): The name of the GitHub organization.
+        repository (str): The name of the repository.
+        branch_protection (bool | None, optional): The branch protection result, if already collected using GraphQL.
+            Defaults to None (collected using the REST API).
+        security (dict | None, optional): The repository's visibility and security_and_analysis, if already collected
+            from the organization's repository list. Defaults to None (collected using the REST API).
+
+    Returns:
+        dict: The REST data for the repository.
+    """
+
+    requests = {}
+
+    if branch_protection is None:
+        requests["branches"] = client.get(f"/repos/{org}/{repository}/branches")
+
+    if security is None:
+        requests["repository"] = client.get(f"/repos/{org}/{repository}")
+
+    responses = dict(zip(requests.keys(), await asyncio.gather(*requests.values())))
+
+    if branch_protection is None:
+        branch_protection = main.is_branch_protection_enabled(responses["branches"])
+
+    if security is None:
+        security = responses["repository"]
+
+    checks = {}
+
+    checks["branch_protection"] = branch_protection
+    checks["secret_scanning"], checks["push_protection"] = main.get_security_and_analysis_checks(security)
+
+    return checks
+
+
+async def process_repository(client: AsyncGitHubClient, ql: github_api_toolkit.github_graphql_interface, org: str, repository: dict, remaining_data: tuple[list[dict], list[dict], list[dict]], codeowners_executor: ThreadPoolExecutor, branch_protection: bool | None = None, security: dict | None = None) -> dict:
+    """Collects the facts needed for the policy checks of a single repository.
+
+    Args:
+        client (AsyncGitHubClient): The asynchronous GitHub API client.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface, used for the CODEOWNERS checks.
+        org (str): The name of the GitHub organization.
+        repository (dict): The repository from the organization listing.
+        remaining_data (tuple[list[dict], list[dict], list[dict]]): The signed commits, external PRs and repository contents for the repository.
+        codeowners_executor (ThreadPoolExecutor): The worker threads which run the CODEOWNERS checks.
+        branch_protection (bool | None, optional): The branch protection result, if already collected using GraphQL. Defaults to None.
+        security (dict | None, optional): The repository's entry from the security index, if available. Defaults to None.
+
+    Returns:
+        dict: The repository's facts, from main.build_repository_facts().
+    """
+
+    rest_data = await get_rest_data(client, org, repository["name"], branch_protection, security)
+
+    # The CODEOWNERS checks rely on github_api_toolkit, which is synchronous
+    # These are ran in a worker thread so they do not block the event loop
+    # The context is copied so their requests are attributed to the current stage, as with asyncio.to_thread()
+    context = contextvars.copy_context()
+
+    codeowners_missing, point_of_contact_missing = await asyncio.get_running_loop().run_in_executor(
+        codeowners_executor, context.run, main.get_codeowners_checks, ql, org, repository["name"], remaining_data[2]
+    )
+
+    return main.build_repository_facts(repository, remaining_data, rest_data, codeowners_missing, point_of_contact_missing)
+
+
+async def process_batch(logger: wrapped_logging, client: AsyncGitHubClient, ql: github_api_toolkit.github_graphql_interface, org: str, batch: list[dict], security_index: dict[str, dict], max_commits: int, graphql_branch_protection: bool, codeowners_executor: ThreadPoolExecutor) -> list[dict]:
+    """Processes a batch of repositories, collecting their remaining data in a single GraphQL request.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        client (AsyncGitHubClient): The asynchronous GitHub API client.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface, used for the CODEOWNERS checks.
+        org (str): The name of the GitHub organization.
+        batch (list[dict]): The repositories in the batch.
+        security_index (dict[str, dict]): The visibility and security settings of each repository.
+        max_commits (int): The maximum number of commits to get for the signed commits check.
+        graphql_branch_protection (bool): Whether to check branch protection in bulk using GraphQL.
+        codeowners_executor (ThreadPoolExecutor): The worker threads which run the CODEOWNERS checks.
+
+    Returns:
+        list[dict]: The facts about each repository in the batch.
+    """
+
+    # Repositories collected using single-pass collection already have their remaining data
+    outstanding = [repository["name"] for repository in batch if "remaining_data" not in repository]
+
+    batch_remaining_data = {}
+
+    if outstanding:
+        batch_remaining_data = await get_remaining_data_batch(client, org, outstanding, max_commits)
+
+    batch_branch_protection = {}
+
+    if graphql_branch_protection:
+        batch_branch_protection = await get_branch_protection_batch(client, org, [repository["name"] for repository in batch])
+
+    tasks = []
+
+    for repository in batch:
+        remaining_data = repository.get("remaining_data") or batch_remaining_data[repository["name"]]
+        branch_protection = batch_branch_protection.get(repository["name"])
+        security = security_index.get(repository["name"])
+
+        tasks.append(process_repository(client, ql, org, repository, remaining_data, codeowners_executor, branch_protection, security))
+
+    output = await asyncio.gather(*tasks)
+
+    logger.log_info(f"Processed {len(output)} repositories ({batch[0]['name']} to {batch[-1]['name']}).")
+
+    return output
+
+
+async def get_output_data(logger: wrapped_logging, token_manager: InstallationTokenManager, governor: RateLimitGovernor, ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[dict], security_index: dict[str, dict], org_members: list[str], inactivity_threshold: int, signed_commit_number: int, remaining_data_batch_size: int, graphql_branch_protection: bool, max_concurrency: int, graphql_concurrency: int, thread_count: int) -> list[dict]:
+    """Gets the output data for all the repositories using asyncio.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        token_manager (InstallationTokenManager): Provides the GitHub installation access token.
+        governor (RateLimitGovernor): The rate limit governor shared by all workers.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface, used for the CODEOWNERS checks.
+        org (str): The name of the GitHub organization.
+        repositories (list[dict]): The list of repositories.
+        security_index (dict[str, dict]): The visibility and security settings of each repository.
+        org_members (list[str]): The members of the GitHub organization.
+        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
+        signed_commit_number (int): The maximum number of commits to get for the signed commits check.
+        remaining_data_batch_size (int): The number of repositories to request in each remaining data GraphQL query.
+        graphql_branch_protection (bool): Whether to check branch protection in bulk using GraphQL.
+        max_concurrency (int): The maximum number of REST requests in flight at once.
+        graphql_concurrency (int): The maximum number of GraphQL requests in flight at once.
+        thread_count (int): The number of worker threads to run the CODEOWNERS checks on.
+
+    Returns:
+        list[dict]: The output data for all the repositories, in the same order as the repositories.
+    """
+
+    headers = {
+        "Authorization": f"token {token_manager.get_token()}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    connector = aiohttp.TCPConnector(limit=max_concurrency + graphql_concurrency)
+
+    # The CODEOWNERS checks get their own worker threads, as the default executor only has min(32, CPUs + 4) threads
+    # (5 on a single vCPU Lambda), which would limit them to far fewer than thread_count at once
+    codeowners_executor = ThreadPoolExecutor(max_workers=thread_count, thread_name_prefix="codeowners")
+
+    try:
+        async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+
+            client = AsyncGitHubClient(session, governor, max_concurrency, graphql_concurrency, token_manager)
+
+            batches = [
+                repositories[start:start + remaining_data_batch_size]
+                for start in range(0, len(repositories), remaining_data_batch_size)
+            ]
+
+            logger.log_info(f"Processing {len(repositories)} repositories as {len(batches)} batches using asyncio.")
+
+            results = await asyncio.gather(
+                *(process_batch(logger, client, ql, org, batch, security_index, signed_commit_number, graphql_branch_protection, codeowners_executor) for batch in batches)
+            )
+    finally:
+        codeowners_executor.shutdown()
+
+    facts = []
+
+    for result in results:
+        facts.extend(result)
+
+    # The policy checks for every repository are evaluated together once all the facts are collected
+    output = main.build_repository_records(facts, org_members, inactivity_threshold)
+
+    logger.log_info(f"Processed {len(output)} repositories.")
+
+    return output
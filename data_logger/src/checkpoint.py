@@ -0,0 +1,278 @@
+"""A python module to checkpoint repository collection, so a run which approaches the Lambda timeout can be resumed."""
+
+import json
+import os
+import threading
+import time
+from typing import Any
+
+import boto3
+
+from src.logger import wrapped_logging
+
+CHECKPOINT_FILENAME = "collection_checkpoint.json"
+
+# The share of the remaining time used as the margin when the configured margin is at least the time remaining
+FALLBACK_MARGIN_FRACTION = 0.25
+
+
+class CollectionCheckpoint:
+    def __init__(self, logger: wrapped_logging, org: str, directory: str, interval: int, max_age: int, s3: boto3.client = None, bucket_name: str = None, s3_key: str = None) -> None:
+        """A checkpoint of a repository collection run.
+
+        The checkpoint holds the repository listing (and the cursor of the next page, if the listing is incomplete)
+        and the records of every repository collected so far. It is saved every interval seconds as repositories are
+        collected, and again if the run stops early, so a later run can carry on from where it left off.
+
+        The checkpoint is stored as a single JSON file in a local directory (i.e. Lambda's /tmp).
+        It can optionally be backed by S3, so that it survives between Lambda environments.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            org (str): The name of the GitHub organization being collected.
+            directory (str): The local directory to store the checkpoint in.
+            interval (int): The minimum number of seconds between saves while collecting.
+            max_age (int): The number of seconds after which a checkpoint is too old to resume from.
+            s3 (boto3.client, optional): The S3 Client. Defaults to None.
+            bucket_name (str, optional): The name of the S3 bucket to back the checkpoint with. Defaults to None.
+            s3_key (str, optional): The S3 key to back the checkpoint with. Defaults to None (no S3 backing).
+        """
+        self.logger = logger
+        self.org = org
+        self.path = os.path.join(directory, CHECKPOINT_FILENAME)
+        self.interval = interval
+        self.max_age = max_age
+
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+
+        self.state = self._new_state()
+
+        # The time (from time.time()) after which no more work should be started. None if there is no deadline.
+        self.deadline = None
+
+        self.resumed = False
+
+        self._last_saved = time.time()
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def _new_state(self) -> dict[str, Any]:
+        """Builds the state of a checkpoint for a new run.
+
+        Returns:
+            dict[str, Any]: The empty checkpoint state.
+        """
+        return {
+            "org": self.org,
+            "created_at": time.time(),
+            "saved_at": None,
+            "listing": {
+                "repositories": [],
+                "cursor": None,
+                "pages": 0,
+                "complete": False,
+            },
+            "records": {},
+        }
+
+    def load(self) -> None:
+        """Loads the checkpoint from the local directory or, if not available locally, from S3.
+
+        A checkpoint for a different organization, or one which has not been saved for max_age seconds, is discarded.
+        The age is measured from the last save rather than from the first run, so a collection which takes several
+        runs to converge keeps its progress as long as each run saves within max_age of the last.
+        """
+        state = None
+
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if state is None and self.s3 and self.bucket_name and self.s3_key:
+            try:
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=self.s3_key)
+
+                state = json.loads(response["Body"].read().decode("utf-8"))
+
+            except Exception as e:
+                self.logger.log_info(f"No checkpoint loaded from S3 ({e}). Starting a new run.")
+
+        if state is None:
+            return
+
+        if state.get("org") != self.org:
+            self.logger.log_warning(f"Discarding checkpoint for a different organization ({state.get('org')}).")
+            return
+
+        # Checkpoints saved before saved_at was recorded fall back to their creation time
+        saved_at = state.get("saved_at") or state.get("created_at", 0)
+
+        if time.time() - saved_at > self.max_age:
+            self.logger.log_warning("Discarding checkpoint older than the maximum checkpoint age.")
+            return
+
+        self.state = state
+        self.resumed = True
+
+        self.logger.log_info(f"Resuming from checkpoint with {len(self.state['listing']['repositories'])} listed repositories and {len(self.state['records'])} collected repositories.")
+
+    def save(self) -> None:
+        """Saves the checkpoint to the local directory and, if configured, to S3."""
+        with self._save_lock:
+            with self._lock:
+                self._last_saved = time.time()
+                self.state["saved_at"] = self._last_saved
+
+                contents = json.dumps(self.state)
+                record_count = len(self.state["records"])
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+            # Write to a temporary file first, so a run stopped mid-save does not leave a corrupt checkpoint
+            with open(f"{self.path}.tmp", "w") as f:
+                f.write(contents)
+
+            os.replace(f"{self.path}.tmp", self.path)
+
+            if self.s3 and self.bucket_name and self.s3_key:
+                self.s3.put_object(Bucket=self.bucket_name, Key=self.s3_key, Body=contents)
+
+        self.logger.log_info(f"Saved checkpoint with {record_count} collected repositories.")
+
+    def clear(self) -> None:
+        """Removes the checkpoint once its run has been published, so the next run starts from the beginning."""
+        with self._save_lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+            if self.s3 and self.bucket_name and self.s3_key:
+                self.s3.delete_object(Bucket=self.bucket_name, Key=self.s3_key)
+
+        with self._lock:
+            self.state = self._new_state()
+
+        self.logger.log_info("Checkpoint cleared.")
+
+    def get_listing(self) -> dict[str, Any]:
+        """Gets the repository listing saved in the checkpoint.
+
+        Returns:
+            dict[str, Any]: The repositories listed so far, the cursor of the next page, the number of pages and whether the listing is complete.
+        """
+        with self._lock:
+            return dict(self.state["listing"])
+
+    def update_listing(self, repositories: list[dict], cursor: str | None, pages: int, complete: bool) -> None:
+        """Records the progress of the repository listing and saves the checkpoint if the interval has passed.
+
+        Args:
+            repositories (list[dict]): The repositories listed so far.
+            cursor (str | None): The cursor of the next page.
+            pages (int): The number of pages listed so far.
+            complete (bool): Whether every page has been listed.
+        """
+        with self._lock:
+            self.state["listing"] = {
+                "repositories": list(repositories),
+                "cursor": cursor,
+                "pages": pages,
+                "complete": complete,
+            }
+
+        self.save_if_due()
+
+    def add_records(self, records: list[dict]) -> None:
+        """Records the collected repositories and saves the checkpoint if the interval has passed.
+
+        Args:
+            records (list[dict]): The repository records for repositories.json.
+        """
+        with self._lock:
+            for record in records:
+                self.state["records"][record["name"]] = record
+
+        self.save_if_due()
+
+    def save_if_due(self) -> None:
+        """Saves the checkpoint if it has not been saved for at least interval seconds."""
+        with self._lock:
+            due = time.time() - self._last_saved >= self.interval
+
+        if due:
+            self.save()
+
+    def get_pending(self, repositories: list[dict]) -> list[dict]:
+        """Gets the repositories which have not been collected yet.
+
+        Args:
+            repositories (list[dict]): The repositories to collect.
+
+        Returns:
+            list[dict]: The repositories without a record in the checkpoint.
+        """
+        with self._lock:
+            return [repository for repository in repositories if repository["name"] not in self.state["records"]]
+
+    def get_records(self, repositories: list[dict]) -> list[dict]:
+        """Gets the collected records for a list of repositories, in the same order.
+
+        Args:
+            repositories (list[dict]): The repositories.
+
+        Returns:
+            list[dict]: The records of the repositories which have been collected.
+        """
+        with self._lock:
+            records = self.state["records"]
+
+            return [records[repository["name"]] for repository in repositories if repository["name"] in records]
+
+    def set_deadline(self, remaining: float, margin: float) -> None:
+        """Sets the deadline, leaving a margin before the Lambda timeout to finish the work in progress and save.
+
+        If the margin is at least the time remaining (i.e. a 120 second margin with a 60 second timeout), the deadline
+        would already have passed and the run would stop before collecting anything. In that case, the margin is
+        reduced to FALLBACK_MARGIN_FRACTION of the time remaining instead.
+
+        Args:
+            remaining (float): The number of seconds before the Lambda timeout.
+            margin (float): The number of seconds before the timeout at which to stop starting new work.
+        """
+        if margin >= remaining:
+            reduced_margin = remaining * FALLBACK_MARGIN_FRACTION
+
+            self.logger.log_warning(f"The checkpoint time margin ({margin}s) is not less than the time remaining ({remaining:.0f}s). Using a margin of {reduced_margin:.0f}s instead.")
+
+            margin = reduced_margin
+
+        self.deadline = time.time() + remaining - margin
+
+    def is_out_of_time(self) -> bool:
+        """Checks whether the run has passed its deadline, so no more work should be started.
+
+        Returns:
+            bool: True if the deadline has passed, False otherwise.
+        """
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the checkpoint's progress.
+
+        Returns:
+            dict[str, Any]: Whether the run resumed from a checkpoint, and the number of listed and collected repositories.
+        """
+        with self._lock:
+            return {
+                "resumed": self.resumed,
+                "listed": len(self.state["listing"]["repositories"]),
+                "listing_complete": self.state["listing"]["complete"],
+                "collected": len(self.state["records"]),
+            }
@@ -0,0 +1,195 @@
+"""A python module to memoise CODEOWNERS team member and user email lookups across repositories and runs."""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+import boto3
+
+from src.logger import wrapped_logging
+
+CACHE_FILENAME = "codeowners_cache.json"
+
+# The types of lookup which are cached
+NAMESPACES = ["members", "emails"]
+
+
+class CodeownersCache:
+    def __init__(self, logger: wrapped_logging, ttl: int, directory: str, s3: boto3.client = None, bucket_name: str = None, s3_key: str = None) -> None:
+        """A thread-safe cache of CODEOWNERS lookups (team to members and user to emails).
+
+        The same teams and users appear in the CODEOWNERS files of many repositories.
+        Each is resolved once and the result is shared between all threads until it expires.
+        Empty results are not cached, as they are also what a failed lookup returns.
+        If several threads need the same lookup at once, only one resolves it and the others wait for the result.
+
+        The cache is stored as a single JSON file in a local directory (i.e. Lambda's /tmp).
+        It can optionally be backed by S3, so that it survives between Lambda environments.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            ttl (int): The number of seconds a lookup is cached for.
+            directory (str): The local directory to store the cache in.
+            s3 (boto3.client, optional): The S3 Client. Defaults to None.
+            bucket_name (str, optional): The name of the S3 bucket to back the cache with. Defaults to None.
+            s3_key (str, optional): The S3 key to back the cache with. Defaults to None (no S3 backing).
+        """
+        self.logger = logger
+        self.ttl = ttl
+        self.path = os.path.join(directory, CACHE_FILENAME)
+
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+
+        self.entries = {}
+
+        self.stats = {namespace: {"hits": 0, "misses": 0, "expired": 0, "empty": 0} for namespace in NAMESPACES}
+
+        self._lock = threading.Lock()
+
+        # Lookups currently being resolved, so that other threads can wait for them
+        self._pending = {}
+
+    @staticmethod
+    def get_key(namespace: str, org: str, identifier: Any) -> str:
+        """Gets the cache key for a lookup.
+
+        Args:
+            namespace (str): The type of lookup (members or emails).
+            org (str): The name of the GitHub organization.
+            identifier (Any): The team or user being looked up.
+
+        Returns:
+            str: The cache key.
+        """
+        return f"{namespace}:{org}:{json.dumps(identifier, sort_keys=True, default=str)}"
+
+    def load(self) -> None:
+        """Loads the cache from the local directory or, if not available locally, from S3. Expired entries are ignored."""
+        entries = None
+
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if entries is None and self.s3 and self.bucket_name and self.s3_key:
+            try:
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=self.s3_key)
+
+                entries = json.loads(response["Body"].read().decode("utf-8"))
+
+            except Exception as e:
+                self.logger.log_warning(f"Unable to load the CODEOWNERS cache from S3 ({e}). Starting with an empty cache.")
+
+        if entries is None:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self.entries = {key: entry for key, entry in entries.items() if entry["expires"] > now}
+
+        self.logger.log_info(f"Loaded {len(self.entries)} cached CODEOWNERS lookups.")
+
+    def save(self) -> None:
+        """Saves the cache to the local directory and, if configured, to S3. Expired entries are removed."""
+        now = time.time()
+
+        with self._lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if entry["expires"] > now}
+
+            contents = json.dumps(self.entries)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with open(self.path, "w") as f:
+            f.write(contents)
+
+        if self.s3 and self.bucket_name and self.s3_key:
+            self.s3.put_object(Bucket=self.bucket_name, Key=self.s3_key, Body=contents)
+
+        self.logger.log_info(f"Saved {len(self.entries)} cached CODEOWNERS lookups.")
+
+    def get(self, namespace: str, org: str, identifier: Any, resolve: Callable[[], Any]) -> Any:
+        """Gets the result of a lookup, resolving and caching it if it is not cached or has expired.
+
+        Args:
+            namespace (str): The type of lookup (members or emails).
+            org (str): The name of the GitHub organization.
+            identifier (Any): The team or user being looked up.
+            resolve (Callable[[], Any]): A function which resolves the lookup using the GitHub API.
+
+        Returns:
+            Any: The result of the lookup.
+        """
+        key = self.get_key(namespace, org, identifier)
+
+        while True:
+            with self._lock:
+                entry = self.entries.get(key)
+
+                if entry is not None and entry["expires"] > time.time():
+                    self.stats[namespace]["hits"] += 1
+                    return entry["value"]
+
+                pending = self._pending.get(key)
+
+                if pending is None:
+                    if entry is not None:
+                        del self.entries[key]
+                        self.stats[namespace]["expired"] += 1
+
+                    self.stats[namespace]["misses"] += 1
+
+                    pending = threading.Event()
+                    self._pending[key] = pending
+
+                    break
+
+            # Another thread is resolving this lookup, so wait for its result
+            # If it fails, this thread will try to resolve it instead
+            pending.wait()
+
+        try:
+            value = resolve()
+
+            # github_api_toolkit returns an empty result when a lookup fails, which cannot be told apart from a team
+            # without members. Empty results are not cached, so one failed lookup is not reused for every repository
+            with self._lock:
+                if value:
+                    self.entries[key] = {"value": value, "expires": time.time() + self.ttl}
+                else:
+                    self.stats[namespace]["empty"] += 1
+
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+            pending.set()
+
+        return value
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the cache's statistics, including the hit ratio of each type of lookup.
+
+        Returns:
+            dict[str, Any]: The cache statistics.
+        """
+        with self._lock:
+            summary = {"entries": len(self.entries)}
+
+            for namespace, stats in self.stats.items():
+                lookups = stats["hits"] + stats["misses"]
+
+                summary[namespace] = {
+                    **stats,
+                    "hit_ratio": stats["hits"] / lookups if lookups else 0.0,
+                }
+
+            return summary
@@ -0,0 +1,164 @@
+"""A python module to write the output datasets as compressed, columnar Parquet files for the dashboard."""
+
+import datetime
+import io
+import os
+from typing import Any
+
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import src.policy_checks as policy_checks
+from src.logger import wrapped_logging
+
+TIMESTAMP = pa.timestamp("s", tz="UTC")
+
+# The columns of each dataset. Nested fields are flattened using "." (i.e. checklist.inactive), matching pd.json_normalize
+REPOSITORY_SCHEMA = pa.schema(
+    [
+        ("name", pa.string()),
+        ("type", pa.string()),
+        ("url", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("pushed_at", TIMESTAMP),
+        ("head_commit", pa.string()),
+        ("collected_at", TIMESTAMP),
+    ]
+    + [(f"checklist.{check}", pa.bool_()) for check in policy_checks.CHECKS]
+)
+
+DEPENDABOT_SCHEMA = pa.schema(
+    [
+        ("repository", pa.string()),
+        ("repository_url", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("severity", pa.string()),
+        ("alert_url", pa.string()),
+    ]
+)
+
+SECRET_SCANNING_SCHEMA = pa.schema(
+    [
+        ("repository", pa.string()),
+        ("repository_url", pa.string()),
+        ("creation_date", TIMESTAMP),
+        ("alert_url", pa.string()),
+    ]
+)
+
+COMPRESSION = "zstd"
+
+LOCAL_OUTPUT_DIRECTORY = "./output"
+
+
+def get_field(record: dict, name: str) -> Any:
+    """Gets a (possibly nested) field from a record.
+
+    Args:
+        record (dict): The record.
+        name (str): The name of the field, with nested fields separated by "." (i.e. checklist.inactive).
+
+    Returns:
+        Any: The value of the field, or None if it is missing.
+    """
+
+    value = record
+
+    for key in name.split("."):
+        if not isinstance(value, dict):
+            return None
+
+        value = value.get(key)
+
+    return value
+
+
+def parse_timestamp(value: str | None) -> datetime.datetime | None:
+    """Parses a GitHub timestamp.
+
+    Args:
+        value (str | None): The timestamp (i.e. 2024-01-01T00:00:00Z).
+
+    Returns:
+        datetime.datetime | None: The timestamp in UTC, or None if there is no timestamp.
+    """
+
+    if not value:
+        return None
+
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc)
+
+
+def build_table(records: list[dict], schema: pa.Schema) -> pa.Table:
+    """Builds a typed, columnar table from a list of records.
+
+    Args:
+        records (list[dict]): The records.
+        schema (pa.Schema): The columns of the table.
+
+    Returns:
+        pa.Table: The table.
+    """
+
+    columns = {}
+
+    for field in schema:
+        values = [get_field(record, field.name) for record in records]
+
+        if field.type == TIMESTAMP:
+            values = [parse_timestamp(value) for value in values]
+
+        columns[field.name] = values
+
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def save_columnar(logger: wrapped_logging, write_to_s3: bool, filename: str, records: list[dict], schema: pa.Schema, s3: boto3.client = None, bucket_name: str = None) -> dict:
+    """Saves a dataset as a compressed Parquet file.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the file to S3 or locally.
+        filename (str): The name of the file to write (i.e. repositories.parquet).
+        records (list[dict]): The records in the dataset.
+        schema (pa.Schema): The columns of the dataset.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+    Raises:
+        Exception: If the S3 client and bucket name are not provided when writing to S3.
+
+    Returns:
+        dict: The key, ETag (S3 only) and number of records of the file written.
+    """
+
+    table = build_table(records, schema)
+
+    etag = None
+
+    if write_to_s3:
+
+        if not s3 or not bucket_name:
+            raise Exception("S3 client and bucket name required to write to S3.")
+
+        buffer = io.BytesIO()
+
+        pq.write_table(table, buffer, compression=COMPRESSION)
+
+        response = s3.put_object(Bucket=bucket_name, Key=filename, Body=buffer.getvalue())
+
+        etag = response["ETag"]
+
+        logger.log_info(f"{filename} uploaded to S3 ({table.num_rows} rows, {buffer.tell()} bytes).")
+
+    else:
+        path = os.path.join(LOCAL_OUTPUT_DIRECTORY, filename)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        pq.write_table(table, path, compression=COMPRESSION)
+
+        logger.log_info(f"{path} written locally ({table.num_rows} rows).")
+
+    return {"key": filename, "etag": etag, "records": table.num_rows}
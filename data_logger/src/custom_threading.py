@@ -1,7 +1,10 @@
 """A python module that extends the threading module to allow for the return of values from a thread"""
 
-from threading import Thread
-from typing import Any
+import contextvars
+import queue
+import time
+from threading import Lock, Thread
+from typing import Any, Callable
 
 class CustomThread(Thread):
     def __init__(self, group=None, target=None, name=None, args=(), kwargs=None, Verbose=None):
@@ -9,6 +12,9 @@ class CustomThread(Thread):
 
         self.return_value = None
 
+        # The thread runs in a copy of its creator's context, so context variables (i.e. the metrics stage) carry over
+        self.context = contextvars.copy_context()
+
     def add_arg(self, arg: Any):
         """Adds an argument to the thread after definition.
 
@@ -19,6 +25,125 @@ class CustomThread(Thread):
 
     def run(self):
         if self._target:
-            self.return_value = self._target(*self._args, **self._kwargs)
+            self.return_value = self.context.run(self._target, *self._args, **self._kwargs)
+
+
+class WorkQueue:
+    def __init__(self, target: Callable, number_of_threads: int) -> None:
+        """Runs a function over a list of tasks using threads which pull from a shared queue.
+
+        Unlike splitting the tasks into fixed groups, a thread takes the next task as soon as it is free,
+        so a run of slow tasks does not hold up the rest of the work.
+
+        Args:
+            target (Callable): The function to run for each task. The thread name is passed as the last argument.
+            number_of_threads (int): The number of threads to use.
+        """
+        self.target = target
+        self.number_of_threads = number_of_threads
+
+        self.worker_stats = {}
+
+        # Whether the last run stopped before every task was taken from the queue
+        self.stopped = False
+
+        self._should_stop = None
+
+        self._lock = Lock()
+
+    def run(self, tasks: list[tuple], should_stop: Callable[[], bool] | None = None) -> list:
+        """Runs the target function for each task.
+
+        Args:
+            tasks (list[tuple]): The arguments for each call of the target function.
+            should_stop (Callable[[], bool] | None, optional): Checked before each task is taken from the queue.
+                Once it returns True, threads finish their current task and stop, leaving the rest unprocessed. Defaults to None.
+
+        Raises:
+            Exception: If any task raises an exception, the first exception is raised once all threads have stopped.
+
+        Returns:
+            list: The return value of each task, in the same order as the tasks (None for tasks which were not processed).
+        """
+        task_queue = queue.SimpleQueue()
+
+        for index, args in enumerate(tasks):
+            task_queue.put((index, args))
+
+        results = [None] * len(tasks)
+        errors = []
+
+        self.worker_stats = {}
+        self.stopped = False
+
+        self._should_stop = should_stop
+
+        start_time = time.perf_counter()
+
+        threads = []
+
+        for _ in range(max(1, min(self.number_of_threads, len(tasks)))):
+
+            thread = CustomThread(target=self._work, args=(task_queue, results, errors))
+
+            thread.add_arg(thread.name)
+
+            threads.append(thread)
+
+            thread.start()
+
+        # Wait for all threads to finish
+        for thread in threads:
+            thread.join()
+
+        run_time = time.perf_counter() - start_time
+
+        for stats in self.worker_stats.values():
+            stats["utilisation"] = stats["busy_time"] / run_time if run_time else 0.0
+
+        if errors:
+            raise errors[0]
+
+        return results
+
+    def _work(self, task_queue: queue.SimpleQueue, results: list, errors: list, thread_name: str) -> None:
+        """Takes tasks from the queue until it is empty or another thread has failed.
+
+        Args:
+            task_queue (queue.SimpleQueue): The queue of (index, args) tasks.
+            results (list): The list to store each task's return value in.
+            errors (list): The list of exceptions raised by tasks.
+            thread_name (str): The name of the thread.
+        """
+        busy_time = 0.0
+        tasks_processed = 0
+
+        while not errors:
+            if self._should_stop is not None and self._should_stop():
+                if not task_queue.empty():
+                    self.stopped = True
+                break
+
+            try:
+                index, args = task_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            task_start_time = time.perf_counter()
+
+            try:
+                results[index] = self.target(*args, thread_name)
+            except Exception as e:
+                with self._lock:
+                    errors.append(e)
+                break
+            finally:
+                busy_time += time.perf_counter() - task_start_time
+
+            tasks_processed += 1
 
-    
\ No newline at end of file
+        with self._lock:
+            self.worker_stats[thread_name] = {
+                "tasks": tasks_processed,
+                "busy_time": busy_time,
+            }
@@ -0,0 +1,377 @@
+"""A python module which extends the github_api_toolkit interfaces so that every request goes through the data logger's shared controls."""
+
+import time
+from typing import Any
+
+import github_api_toolkit
+import requests
+from requests import Response
+
+import src.metrics as metrics
+from src.codeowners_cache import CodeownersCache
+from src.rate_limit import RateLimitGovernor
+from src.response_cache import ResponseCache
+from src.token_manager import InstallationTokenManager
+from src.transport import REQUEST_TIMEOUT, PooledTransport
+
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+def get_response(result: Any) -> Response | None:
+    """Gets the Response from the result of a github_api_toolkit request.
+
+    github_api_toolkit returns either a Response or the exception raised by the request.
+    HTTP errors still carry the Response that caused them.
+
+    Args:
+        result (Any): The result of the request.
+
+    Returns:
+        Response | None: The Response, or None if the request did not get a response.
+    """
+    if isinstance(result, Response):
+        return result
+
+    return getattr(result, "response", None)
+
+
+def get_graphql_rate_limit(response: Response) -> dict | None:
+    """Gets the rateLimit object from a GraphQL response, if the query requested it.
+
+    Args:
+        response (Response): The GraphQL response.
+
+    Returns:
+        dict | None: The rateLimit object (cost and remaining), or None if not present.
+    """
+    try:
+        return response.json()["data"]["rateLimit"]
+    except Exception:
+        return None
+
+
+def get_graphql_json(response: Any) -> dict:
+    """Gets the body of a GraphQL response, raising an error the retry policy can classify if the query failed.
+
+    GitHub returns 200 with "data": null when a whole query fails (i.e. it times out or is invalid), with the reasons in "errors".
+
+    Args:
+        response (Any): The result of make_ql_request().
+
+    Raises:
+        Exception: If the request did not get a response.
+        requests.exceptions.HTTPError: If the response has an error status code (i.e. a secondary rate limit).
+        Exception: If the whole query failed, raised with the GraphQL errors.
+
+    Returns:
+        dict: The response body as JSON.
+    """
+    if type(response) is not Response:
+        raise Exception(response)
+
+    response.raise_for_status()
+
+    response_json = response.json()
+
+    if response_json.get("data") is None:
+        raise Exception(response_json.get("errors"))
+
+    return response_json
+
+
+def handle_response(response: Response) -> Response | Exception:
+    """Returns a response, or the HTTPError it raises, in the same way as github_api_toolkit.
+
+    Args:
+        response (Response): The response.
+
+    Returns:
+        Response | Exception: The response, or the HTTPError if the request failed.
+    """
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        return e
+
+    return response
+
+
+def release_request(governor: RateLimitGovernor, resource: str, response: Response | None) -> None:
+    """Releases a governor request slot using the details of a response.
+
+    Args:
+        governor (RateLimitGovernor): The rate limit governor.
+        resource (str): The API resource (rest or graphql).
+        response (Response | None): The response, or None if the request did not get a response.
+    """
+    if response is None:
+        governor.release(resource, None, None)
+        return
+
+    body = response.text if response.status_code >= 400 else ""
+
+    rate_limit = None
+
+    if resource == "graphql" and response.status_code < 400:
+        rate_limit = get_graphql_rate_limit(response)
+
+    governor.release(resource, response.status_code, response.headers, body, rate_limit)
+
+
+def record_request(resource: str, endpoint: str, started_at: float, response: Response | None) -> None:
+    """Records a request's latency, size and rate limit cost in the run's metrics.
+
+    Args:
+        resource (str): The API resource (rest or graphql).
+        endpoint (str): The name of the endpoint or GraphQL operation.
+        started_at (float): The time (from time.time()) the request was sent.
+        response (Response | None): The response, or None if the request did not get a response.
+    """
+    latency = time.time() - started_at
+
+    if response is None:
+        metrics.recorder.record_request(endpoint, resource, latency, None, 0)
+        return
+
+    cost = None
+
+    if resource == "graphql" and response.status_code < 400:
+        cost = (get_graphql_rate_limit(response) or {}).get("cost")
+
+    metrics.recorder.record_request(endpoint, resource, latency, response.status_code, len(response.content), cost)
+
+
+class rest_interface(github_api_toolkit.github_interface):
+    def __init__(self, token: str, governor: RateLimitGovernor, cache: ResponseCache = None, token_manager: InstallationTokenManager = None, transport: PooledTransport = None) -> None:
+        """A github_api_toolkit REST interface whose requests are paced by a rate limit governor.
+
+        Args:
+            token (str): The GitHub access token.
+            governor (RateLimitGovernor): The rate limit governor shared by all workers.
+            cache (ResponseCache, optional): The ETag response cache. Defaults to None (no caching).
+            token_manager (InstallationTokenManager, optional): Replaces the token before it expires. Defaults to None (the token is never replaced).
+            transport (PooledTransport, optional): Sends requests over pooled keep-alive connections. Defaults to None (a new connection for each request).
+        """
+        super().__init__(token)
+
+        self.governor = governor
+        self.cache = cache
+        self.token_manager = token_manager
+        self.transport = transport
+
+        if token_manager is not None:
+            token_manager.register(self)
+
+    def get(self, url: str, params: dict = {}, add_prefix: bool = True) -> Response | Exception:
+        """Makes a GET request to the GitHub REST API.
+
+        Args:
+            url (str): The endpoint to request.
+            params (dict, optional): The query parameters. Defaults to {}.
+            add_prefix (bool, optional): Whether to add the API URL to the endpoint. Defaults to True.
+
+        Returns:
+            Response | Exception: The response, or the exception raised by the request.
+        """
+        if self.token_manager is not None:
+            self.token_manager.ensure_fresh()
+
+        self.governor.acquire("rest")
+
+        started_at = time.time()
+
+        result = None
+        response = None
+
+        try:
+            if self.cache is not None and add_prefix and self.cache.is_cacheable(url):
+                result, response = self._get_conditional(url, params)
+            else:
+                if self.cache is not None:
+                    self.cache.record_uncacheable()
+
+                result = self._get(url, params, add_prefix)
+                response = get_response(result)
+        finally:
+            release_request(self.governor, "rest", response)
+
+            record_request("rest", metrics.get_endpoint_name("GET", url), started_at, response)
+
+        return result
+
+    def _get(self, url: str, params: dict, add_prefix: bool) -> Response | Exception:
+        """Makes a GET request, using the pooled transport if there is one.
+
+        Every request is sent with a timeout (REQUEST_TIMEOUT, unless the transport sets its own), so a stalled
+        connection cannot hold a worker until the Lambda timeout.
+
+        Args:
+            url (str): The endpoint to request.
+            params (dict): The query parameters.
+            add_prefix (bool): Whether to add the API URL to the endpoint.
+
+        Returns:
+            Response | Exception: The response, or the exception raised by the request.
+        """
+        if add_prefix:
+            url = GITHUB_API_URL + url
+
+        # Without a transport, the request is sent as github_api_toolkit would, but with a timeout
+        if self.transport is None:
+            return handle_response(requests.get(url=url, headers=self.headers, params=params, timeout=REQUEST_TIMEOUT))
+
+        return handle_response(self.transport.request("GET", url, headers=self.headers, params=params))
+
+    def _get_conditional(self, url: str, params: dict) -> tuple[Response | Exception, Response]:
+        """Makes a conditional GET request using the ETag of the cached response.
+
+        GitHub does not count 304 Not Modified responses against the rate limit.
+
+        Args:
+            url (str): The endpoint to request.
+            params (dict): The query parameters.
+
+        Returns:
+            tuple[Response | Exception, Response]: The response (from the cache if not modified), or the exception
+                raised by the request, and the raw response from GitHub.
+        """
+        key = self.cache.get_key(url, params)
+        etag = self.cache.get_etag(key)
+
+        headers = dict(self.headers)
+
+        if etag:
+            headers["If-None-Match"] = etag
+
+        if self.transport is not None:
+            response = self.transport.request("GET", GITHUB_API_URL + url, headers=headers, params=params)
+        else:
+            response = requests.get(url=GITHUB_API_URL + url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 304 and etag:
+            return self.cache.get_response(key, response.url), response
+
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            return e, response
+
+        self.cache.store(key, response)
+
+        return response, response
+
+
+class graphql_interface(github_api_toolkit.github_graphql_interface):
+    def __init__(self, token: str, governor: RateLimitGovernor, codeowners_cache: CodeownersCache = None, token_manager: InstallationTokenManager = None, transport: PooledTransport = None) -> None:
+        """A github_api_toolkit GraphQL interface whose requests are paced by a rate limit governor.
+
+        Args:
+            token (str): The GitHub access token.
+            governor (RateLimitGovernor): The rate limit governor shared by all workers.
+            codeowners_cache (CodeownersCache, optional): The CODEOWNERS lookup cache. Defaults to None (no caching).
+            token_manager (InstallationTokenManager, optional): Replaces the token before it expires. Defaults to None (the token is never replaced).
+            transport (PooledTransport, optional): Sends requests over pooled keep-alive connections. Defaults to None (a new connection for each request).
+        """
+        super().__init__(token)
+
+        self.governor = governor
+        self.codeowners_cache = codeowners_cache
+        self.token_manager = token_manager
+        self.transport = transport
+
+        if token_manager is not None:
+            token_manager.register(self)
+
+    def make_ql_request(self, query: str, params: dict) -> Any:
+        """Makes a request to the GitHub GraphQL API.
+
+        The request is sent with a timeout, whether or not there is a pooled transport.
+
+        Args:
+            query (str): The GraphQL query.
+            params (dict): The variables for the query.
+
+        Returns:
+            Any: The response, or the exception raised by the request.
+        """
+        if self.token_manager is not None:
+            self.token_manager.ensure_fresh()
+
+        self.governor.acquire("graphql")
+
+        started_at = time.time()
+
+        result = None
+
+        try:
+            if self.transport is None:
+                result = requests.post(url=f"{GITHUB_API_URL}/graphql", json={"query": query, "variables": params}, headers=self.headers, timeout=REQUEST_TIMEOUT)
+            else:
+                result = self.transport.request("POST", f"{GITHUB_API_URL}/graphql", json={"query": query, "variables": params}, headers=self.headers)
+        finally:
+            release_request(self.governor, "graphql", get_response(result))
+
+            record_request("graphql", metrics.get_operation_name(query), started_at, get_response(result))
+
+        return result
+
+    def get_codeowner_users(self, org: str, codeowners: list) -> list:
+        """Gets the users from a list of CODEOWNERS, expanding teams into their members.
+
+        When a CODEOWNERS cache is available, each team or user is resolved separately so its result can be reused
+        for every repository it appears in.
+
+        Args:
+            org (str): The name of the GitHub organization.
+            codeowners (list): The teams and users from identify_teams_and_users().
+
+        Returns:
+            list: The users.
+        """
+        resolve = super().get_codeowner_users
+
+        if self.codeowners_cache is None:
+            return resolve(org, codeowners)
+
+        users = []
+        seen = set()
+
+        for codeowner in codeowners:
+            members = self.codeowners_cache.get("members", org, codeowner, lambda codeowner=codeowner: resolve(org, [codeowner]))
+
+            for member in members:
+                if member not in seen:
+                    seen.add(member)
+                    users.append(member)
+
+        return users
+
+    def get_codeowner_emails(self, codeowners: list, org: str) -> list:
+        """Gets the organization verified emails of a list of users.
+
+        When a CODEOWNERS cache is available, each user is resolved separately so their emails can be reused
+        for every repository they appear in.
+
+        Args:
+            codeowners (list): The users from get_codeowner_users().
+            org (str): The name of the GitHub organization.
+
+        Returns:
+            list: The emails.
+        """
+        resolve = super().get_codeowner_emails
+
+        if self.codeowners_cache is None:
+            return resolve(codeowners, org)
+
+        emails = []
+        seen = set()
+
+        for user in codeowners:
+            for email in self.codeowners_cache.get("emails", org, user, lambda user=user: resolve([user], org)):
+                if email not in seen:
+                    seen.add(email)
+                    emails.append(email)
+
+        return emails
@@ -1,21 +1,38 @@
-from typing import Any, Tuple, Callable, TypeVar, ParamSpec
+from typing import Any, Iterable, Tuple, Callable
 import os
 import json
 import time
-from functools import wraps
+import tempfile
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from botocore.config import Config
 from requests import Response
 import datetime
 
 import github_api_toolkit
 
 import src.custom_threading as custom_threading
+import src.metrics as metrics
+import src.pagination as pagination
+import src.retry_policy as retry_policy
+import src.sharding as sharding
+import src.snapshots as snapshots
 from src.logger import wrapped_logging
 import src.policy_checks as policy_checks
+import src.interfaces as interfaces
+from src.rate_limit import RateLimitGovernor
+from src.checkpoint import CollectionCheckpoint
+from src.codeowners_cache import CodeownersCache
+from src.response_cache import ResponseCache
+from src.token_manager import InstallationTokenManager
+from src.transport import PooledTransport
+from src.output_writer import OutputWriter, read_records
 
+# The most Secret Scanning alert pages requested at once
+# Pagination stops once the remaining alerts are within the threshold, so pages requested further ahead would be wasted
+SECRET_SCANNING_PAGE_WINDOW = 2
 
-T = TypeVar("T")
-P = ParamSpec("P")
 
 def get_config_file(path: str) -> Any:
     """Loads a configuration file as a dictionary.
@@ -122,53 +139,45 @@ def get_access_token(secret_manager: Any, secret_name: str, org: str, app_client
     return token
 
 
-def retry_on_error(max_retries: int = 3, delay: int = 2) -> Any:
-    """A decorator that retries a function if an exception is raised.
-    Args:
-        max_retries (int, optional): The number of times the function should be retried before failing. Defaults to 3.
-        delay (int, optional): The time delay in seconds between retry attempts. Defaults to 2.
-    Raises:
-        Exception: If the function fails after the maximum number of retries.
-    Returns:
-        Any: The result of the function.
-    """
-
-    def decorator(func: Callable[P, T]) -> Any:
-        @wraps(func)
-        def wrapper(*args: P.args, **kwargs: P.kwargs) -> Any | None:
-            retries = 0
-
-            logger = wrapped_logging(False)
-
-            while retries < max_retries:
-                try:
-                    result = func(*args, **kwargs)
-                    if result is not None:  # Check if request was successful
-                        return result
-                    raise Exception("Request failed with None result")
-                except Exception as e:
-                    retries += 1
-                    if retries == max_retries:
-                        raise Exception(e) from e
-                    logger.log_warning(f"Attempt {retries} failed. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-            return None
-
-        return wrapper
-
-    return decorator
-
-@retry_on_error()
-def get_repository_page(
+def request_repository_page(
         logger: wrapped_logging,
         ql: github_api_toolkit.github_graphql_interface,
         org: str,
         max_repos: int,
         cursor: str = None,
+        max_commits: int = None,
 ) -> Any:
+    """Requests a single page of non-archived repositories from a GitHub organization.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        max_repos (int): The number of repositories to request.
+        cursor (str, optional): The cursor to start the page from. Defaults to None.
+        max_commits (int, optional): When given, the signed commits, open pull requests and repository contents
+            are requested for each repository within the same query (single-pass collection). Defaults to None.
+
+    Raises:
+        Exception: If the request failed, or the whole query failed (raised with the GraphQL errors).
+
+    Returns:
+        Any: The response from the GitHub API as a dictionary.
+    """
+
+    remaining_data_selection = ""
+    remaining_data_variable = ""
+
+    if max_commits is not None:
+        remaining_data_selection = "...remainingData"
+        remaining_data_variable = ", $max_commits: Int!"
     
     query = """
-    query($org: String!, $max_repos: Int!, $cursor: String) {
+    query RepositoryPage($org: String!, $max_repos: Int!, $cursor: String%s) {
+        rateLimit {
+            cost
+            remaining
+        }
         organization(login: $org) {
             repositories(first: $max_repos, after: $cursor, isArchived: false) {
                 pageInfo {
@@ -182,11 +191,20 @@ def get_repository_page(
                     createdAt
                     pushedAt
 
+                    # Used by incremental collection to detect changes since the last run
+                    headCommit: defaultBranchRef {
+                        target {
+                            oid
+                        }
+                    }
+
                     # Checks if dependabot is enabled
                     hasVulnerabilityAlertsEnabled
 
-                    # Checks for Signed Commits, External Pull Requests and Repository Contents have been moved to separate functions
+                    # Checks for Signed Commits, External Pull Requests and Repository Contents are in separate functions
                     # This is to reduce the complexity of the query, allow for threading and reduce GitHub API Errors.
+                    # When using single-pass collection, they are included here using the remainingData fragment.
+                    %s
 
                     # Currently, GraphQL does not support:
                     # - Checking if Secret Scanning is enabled
@@ -198,7 +216,7 @@ def get_repository_page(
             }
         }
     }
-    """
+    """ % (remaining_data_variable, remaining_data_selection)
 
     variables = {
         "org": org,
@@ -206,13 +224,40 @@ def get_repository_page(
         "cursor": cursor,
     }
 
+    if max_commits is not None:
+        query += REMAINING_DATA_FRAGMENT
+        variables["max_commits"] = max_commits
+
     response = ql.make_ql_request(query, variables)
 
-    response.raise_for_status()
+    response_json = interfaces.get_graphql_json(response)
 
     logger.log_info(f"Request successful. Response Status Code: {response.status_code}")
 
-    return response.json()
+    return response_json
+
+
+@retry_policy.retry
+def get_repository_page(
+        logger: wrapped_logging,
+        ql: github_api_toolkit.github_graphql_interface,
+        org: str,
+        max_repos: int,
+        cursor: str = None,
+) -> Any:
+    """Gets a single page of non-archived repositories from a GitHub organization, retrying on failure.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        max_repos (int): The number of repositories to request.
+        cursor (str, optional): The cursor to start the page from. Defaults to None.
+
+    Returns:
+        Any: The response from the GitHub API as a dictionary.
+    """
+    return request_repository_page(logger, ql, org, max_repos, cursor)
 
 
 def clean_repositories(repositories: list[dict]) -> list[dict]:
@@ -260,7 +305,7 @@ def filter_response(logger: wrapped_logging, response_json: dict) -> Any:
 
 
 def get_repositories(
-    logger: wrapped_logging, ql: github_api_toolkit.github_graphql_interface, org: str,
+    logger: wrapped_logging, ql: github_api_toolkit.github_graphql_interface, org: str, checkpoint: CollectionCheckpoint | None = None,
 ) -> tuple[list[dict], int]:
     """Gets all the repositories from a GitHub organization.
 
@@ -268,23 +313,28 @@ def get_repositories(
         logger (wrapped_logging): The logger object.
         ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
         org (str): The name of the GitHub organization.
+        checkpoint (CollectionCheckpoint | None, optional): When given, the listing resumes from the checkpoint's cursor
+            and its progress is recorded after each page. Defaults to None.
 
     Returns:
         tuple[list[dict], int]: A tuple containing the list of repositories and the number of pages of repositories.
     """
     repositories = []
-    number_of_pages = 1
-
-    response_json = get_repository_page(logger, ql, org, 100)
-
-    response_repositories = filter_response(logger, response_json)
+    number_of_pages = 0
+    cursor = None
+    has_next_page = True
 
-    repositories.extend(response_repositories)
+    if checkpoint is not None:
+        listing = checkpoint.get_listing()
 
-    while response_json["data"]["organization"]["repositories"]["pageInfo"]["hasNextPage"]:
-        cursor = response_json["data"]["organization"]["repositories"]["pageInfo"]["endCursor"]
+        repositories = listing["repositories"]
+        number_of_pages = listing["pages"]
+        cursor = listing["cursor"]
+        has_next_page = not listing["complete"]
 
-        logger.log_info(f"Getting page {number_of_pages + 1} with cursor {cursor}.")
+    while has_next_page:
+        if cursor is not None:
+            logger.log_info(f"Getting page {number_of_pages + 1} with cursor {cursor}.")
 
         response_json = get_repository_page(logger, ql, org, 100, cursor)
 
@@ -294,443 +344,1358 @@ def get_repositories(
 
         number_of_pages += 1
 
+        page_info = response_json["data"]["organization"]["repositories"]["pageInfo"]
+
+        has_next_page = page_info["hasNextPage"]
+        cursor = page_info["endCursor"]
+
+        if checkpoint is not None:
+            checkpoint.update_listing(repositories, cursor, number_of_pages, not has_next_page)
+
     return repositories, number_of_pages
 
 
-def get_rest_data(rest: github_api_toolkit.github_interface, org: str, repository: str) -> dict:
-    """Gets the REST data for a repository (branch protection secret scanning and push protection).
+def get_error_node_indexes(response_json: dict) -> set[int]:
+    """Gets the indexes of the repository nodes which have errors in a GraphQL response.
 
     Args:
-        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
-        org (str): The name of the GitHub organization.
-        repository (str): The name of the repository.
-
-    Raises:
-        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        response_json (dict): The response from the GitHub API.
 
     Returns:
-        dict: The REST data for the repository.
+        set[int]: The indexes of the repository nodes with errors.
     """
+    error_node_indexes = set()
 
-    checks = {}
+    for error in response_json.get("errors") or []:
+        path = error.get("path") or []
 
-    # Get Branch Protection
+        # Errors within a repository are reported with a path of
+        # ["organization", "repositories", "nodes", <index>, ...]
+        if len(path) > 3 and path[:3] == ["organization", "repositories", "nodes"] and type(path[3]) is int:
+            error_node_indexes.add(path[3])
 
-    response = rest.get(f"/repos/{org}/{repository}/branches")
+    return error_node_indexes
 
-    if type(response) is not Response:
-        raise Exception(response)
-    
-    response_json = response.json()
-    
-    branch_protection = True
 
-    for branch in response_json:
-        protected = branch.get("protected", False)
+def filter_single_pass_response(logger: wrapped_logging, response_json: dict) -> list[dict]:
+    """Filters a single-pass response from the GitHub API to get the repositories and their remaining data.
 
-        if not protected:
-            branch_protection = False
-            break
-        
-    checks["branch_protection"] = branch_protection
+    Each repository which was returned without errors has its signed commits, open pull requests and
+    repository contents stored under the "remaining_data" key so they do not need to be requested again.
+    Repositories with errors are left without the key and are collected separately by get_repository_batch.
 
-    # Get Secret Scanning
+    Args:
+        logger (wrapped_logging): The logger object.
+        response_json (dict): The response from the GitHub API.
 
-    response = rest.get(f"/repos/{org}/{repository}")
+    Returns:
+        list[dict]: The list of repositories.
+    """
+    response_repositories = response_json["data"]["organization"]["repositories"]["nodes"]
 
-    if type(response) is not Response:
-        raise Exception(response)
-    
-    response_json = response.json()
+    error_node_indexes = get_error_node_indexes(response_json)
 
-    secret_scanning = True
+    for i, repository in enumerate(response_repositories):
+        if repository is None:
+            continue
 
-    if response_json["visibility"] == "public":
-        if response_json["security_and_analysis"]["secret_scanning"]["status"] == "disabled":
-            secret_scanning = False
+        remaining_data = parse_remaining_data(repository)
 
-    checks["secret_scanning"] = secret_scanning
+        for key in ["defaultBranchRef", "pullRequests", "object"]:
+            repository.pop(key, None)
 
-    # Get Push Protection
+        if i not in error_node_indexes:
+            repository["remaining_data"] = remaining_data
 
-    push_protection = True
+    response_repositories = clean_repositories(response_repositories)
 
-    if response_json["visibility"] == "public":
-        if response_json["security_and_analysis"]["secret_scanning_push_protection"]["status"] == "disabled":
-            push_protection = False
+    log_error_repositories(logger, response_json)
 
-    checks["push_protection"] = push_protection
+    return response_repositories
 
-    return checks
 
+def get_repositories_single_pass(
+    logger: wrapped_logging, ql: github_api_toolkit.github_graphql_interface, org: str, max_commits: int, max_page_size: int, checkpoint: CollectionCheckpoint | None = None,
+) -> tuple[list[dict], int]:
+    """Gets all the repositories from a GitHub organization, along with the data for the signed commits, external PR and repository contents checks.
 
-def get_org_members(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str) -> list[str]:
-    """Gets the members of a GitHub organization.
+    The page size adapts to the API. If a page fails (usually due to the query timing out), it is requested again
+    at half the size. Once pages succeed again, the page size grows back towards max_page_size. If a page still fails
+    at the minimum page size, it is requested without the remaining data, which is then collected separately.
 
     Args:
         logger (wrapped_logging): The logger object.
-        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
         org (str): The name of the GitHub organization.
-
-    Raises:
-        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        max_commits (int): The maximum number of commits to get for the signed commits check.
+        max_page_size (int): The largest number of repositories to request in a single page (maximum of 100).
+        checkpoint (CollectionCheckpoint | None, optional): When given, the listing resumes from the checkpoint's cursor
+            and its progress is recorded after each page. Defaults to None.
 
     Returns:
-        list[str]: The members of the GitHub organization.
+        tuple[list[dict], int]: A tuple containing the list of repositories and the number of pages of repositories.
     """
+    min_page_size = 5
 
-    members = []
-
-    logger.log_info("Getting organization members.")
-
-    response = rest.get(f"/orgs/{org}/members", params={"per_page": 100})
-
-    if type(response) is not Response:
-        raise Exception(response)
+    repositories = []
+    number_of_pages = 0
 
-    try:
-        last_page = int(response.links["last"]["url"].split("=")[-1])
-    except KeyError:
-        last_page = 1
+    max_page_size = max(1, min(max_page_size, 100))
+    page_size = max_page_size
+    cursor = None
+    has_next_page = True
 
-    logger.log_info(f"{last_page} pages of members to retrieve.")
+    if checkpoint is not None:
+        listing = checkpoint.get_listing()
 
-    for page in range(1, last_page + 1):
+        repositories = listing["repositories"]
+        number_of_pages = listing["pages"]
+        cursor = listing["cursor"]
+        has_next_page = not listing["complete"]
 
-        response = rest.get(f"/orgs/{org}/members", params={"per_page": 100, "page": page})
+    while has_next_page:
 
-        if type(response) is not Response:
-            raise Exception(response)
+        logger.log_info(f"Getting page {number_of_pages + 1} with cursor {cursor} (page size: {page_size}).")
 
-        response_json = response.json()
+        try:
+            response_json = request_repository_page(logger, ql, org, page_size, cursor, max_commits)
 
-        for member in response_json:
-            members.append(member["login"])
+            response_repositories = filter_single_pass_response(logger, response_json)
 
-    logger.log_info(f"{len(members)} organization members retrieved.")
+        except Exception as e:
+            if page_size > min_page_size:
+                page_size = max(min_page_size, page_size // 2)
+                logger.log_warning(f"Single-pass page failed ({e}). Retrying with page size {page_size}.")
+                continue
 
-    return members
+            # The page cannot be collected in a single pass, so only list the repositories
+            # Their remaining data will be collected by get_repository_batch
+            logger.log_warning(f"Single-pass page failed at minimum page size ({e}). Falling back to listing only.")
 
+            response_json = get_repository_page(logger, ql, org, page_size, cursor)
 
-def calculate_threading_groups(total_repos: int, number_of_threads: int) -> list[tuple[int, int]]:
-    """Calculates the threading groups for processing repositories.
+            response_repositories = filter_response(logger, response_json)
 
-    Args:
-        total_repos (int): The total number of repositories.
-        number_of_threads (int): The number of threads to use.
+        else:
+            # Grow the page size back towards the maximum after a successful page
+            page_size = min(max_page_size, page_size * 2)
 
-    Returns:
-        list[tuple[int, int]]: The threading groups for processing repositories (start, end).
-    """
+        repositories.extend(response_repositories)
 
-    batch_size = total_repos // number_of_threads
-    remainder = total_repos % number_of_threads
+        number_of_pages += 1
 
-    threading_groups = []
+        page_info = response_json["data"]["organization"]["repositories"]["pageInfo"]
 
-    start = 0
+        has_next_page = page_info["hasNextPage"]
+        cursor = page_info["endCursor"]
 
-    for i in range(number_of_threads):
-        
-        end = start + batch_size
+        if checkpoint is not None:
+            checkpoint.update_listing(repositories, cursor, number_of_pages, not has_next_page)
 
-        if i == number_of_threads - 1:
-            end += remainder
+    collected = len([repository for repository in repositories if "remaining_data" in repository])
 
-        threading_groups.append((start, end))
+    logger.log_info(f"Single-pass collection gathered the remaining data for {collected} / {len(repositories)} repositories.")
 
-        start = end
+    return repositories, number_of_pages
 
-    return threading_groups
 
+def is_branch_protection_enabled(branches: list[dict]) -> bool:
+    """Checks whether every branch in a list of branches from the REST API is protected.
 
-@retry_on_error()
-def get_remaining_data(ql: github_api_toolkit.github_graphql_interface, org: str, repository: str, max_commits: int) -> tuple[list[dict], list[dict], list[dict]]:
-    """Gets the remaining data for a repository (signed commits, external PRs, repository contents).
-    
     Args:
-        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
-        org (str): The name of the GitHub organization.
-        repository (str): The name of the repository.
-        max_commits (int): The maximum number of commits to get.
-
-    Raises:
-        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        branches (list[dict]): The branches from the GitHub API.
 
     Returns:
-        tuple[list[dict], list[dict], list[dict]]: The remaining data for the repository (signed commits, external PRs, repository contents).
+        bool: True if all the branches are protected, False otherwise.
     """
 
-    query = """
-    query($org: String!, $repo: String!, $max_commits: Int!) {
-        repository(owner: $org, name: $repo) {
-            
-            # Signed Commits
-            
-            defaultBranchRef {
-                target {
-                    ... on Commit {
-                        history(first: $max_commits) {
-                            nodes {
-                                signature {
-                                    isValid
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-
-            # External PR
+    for branch in branches:
+        protected = branch.get("protected", False)
 
-            pullRequests(first: 50, states: OPEN) {
-                nodes {
-                    author {
-                        login
-                    }
-                }
-            }
+        if not protected:
+            return False
 
-            # Contents
+    return True
 
-            object(expression: "HEAD:") {
-                ... on Tree {
-                    entries {
-                        name
-                    }
-                }
-            }
-        }
-    }
-    """
 
-    variables = {
-        "org": org,
-        "repo": repository,
-        "max_commits": max_commits
-    }
+def get_security_and_analysis_checks(repository_json: dict) -> tuple[bool, bool]:
+    """Checks whether secret scanning and push protection are enabled for a repository from the REST API.
 
-    response = ql.make_ql_request(query, variables)
+    These checks only apply to public repositories.
 
-    if type(response) is not Response:
-        raise Exception(response)
+    Args:
+        repository_json (dict): The repository from the GitHub API.
 
-    response_json = response.json()
+    Returns:
+        tuple[bool, bool]: Whether secret scanning and push protection are enabled.
+    """
 
-    # Turn the respective data into a list of commits, pull requests and contents
-    # If an error occurs, return an empty list
-    try:
-        commits = response_json["data"]["repository"]["defaultBranchRef"]["target"]["history"]["nodes"]
-    except TypeError:
-        commits = []
+    secret_scanning = True
+    push_protection = True
 
-    try:
-        pull_requests = response_json["data"]["repository"]["pullRequests"]["nodes"]
-    except Exception:
-        pull_requests = []
+    if repository_json["visibility"] == "public":
+        if repository_json["security_and_analysis"]["secret_scanning"]["status"] == "disabled":
+            secret_scanning = False
 
-    try:
-        contents = response_json["data"]["repository"]["object"]["entries"]
-    except TypeError:
-        contents = []
+        if repository_json["security_and_analysis"]["secret_scanning_push_protection"]["status"] == "disabled":
+            push_protection = False
 
-    return commits, pull_requests, contents
+    return secret_scanning, push_protection
 
 
-def get_repository_batch(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[dict], org_members: list[str], inactivity_threshold: int, max_commits: int, start: int, end: int, thread_name: str) -> list[dict]:
-    """Processes a batch of repositories.
+def get_rest_data(rest: github_api_toolkit.github_interface, org: str, repository: str, branch_protection: bool | None = None, security: dict | None = None) -> dict:
+    """Gets the REST data for a repository (branch protection secret scanning and push protection).
 
     Args:
-        logger (wrapped_logging): The logger object.
         rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
-        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
         org (str): The name of the GitHub organization.
-        repositories (list[dict]): The list of repositories.
-        org_members (list[str]): The members of the GitHub organization.
-        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
-        max_commits (int): The maximum number of commits to get for the signed commits check.
-        start (int): The start index of the batch.
-        end (int): The end index of the batch.
+        repository (str): The name of the repository.
+        branch_protection (bool | None, optional): The branch protection result, if already collected using GraphQL.
+            Defaults to None (collected using the REST API).
+        security (dict | None, optional): The repository's visibility and security_and_analysis, if already collected
+            from the organization's repository list. Defaults to None (collected using the REST API).
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
 
     Returns:
-        list[dict]: The processed repositories in the batch.
+        dict: The REST data for the repository.
     """
 
-    output = []
+    checks = {}
 
-    logger.log_info(f"Processing repositories {start} to {end}.")
+    # Get Branch Protection
 
-    for i in range(start, end):
-        repository = repositories[i]
+    if branch_protection is None:
+        response = rest.get(f"/repos/{org}/{repository}/branches")
 
-        logger.log_info(f"Processing repository {repository['name']} (index: {i}) using {thread_name}.")
+        if type(response) is not Response:
+            raise Exception(response)
 
-        # Get outstanding QL Data (Signed Commits, External PRs and Repository Contents)
-        commits, pull_requests, repository_contents = get_remaining_data(ql, org, repository["name"], max_commits)
+        branch_protection = is_branch_protection_enabled(response.json())
 
-        # Get REST Data (Branch Protection, Secret Scanning)
+    checks["branch_protection"] = branch_protection
+
+    # Get Secret Scanning and Push Protection
 
-        rest_data = get_rest_data(rest, org, repository["name"])
+    if security is None:
+        response = rest.get(f"/repos/{org}/{repository}")
 
-        # Get Codeowners and Point of Contact
+        if type(response) is not Response:
+            raise Exception(response)
 
-        codeowners_path = ""
-        codeowners_missing = policy_checks.file_missing(repository_contents, "CODEOWNERS")
-        point_of_contact_missing = True
+        security = response.json()
 
-        if not codeowners_missing:
-            codeowners_path = "CODEOWNERS"
+    checks["secret_scanning"], checks["push_protection"] = get_security_and_analysis_checks(security)
 
-        # If a CODEOWNERS is not found in the root directory, check the .github directory
-        if codeowners_missing and not policy_checks.file_missing(repository_contents, ".github"):
+    return checks
 
-            if ql.get_file_contents_from_repo(org, repository["name"], ".github/CODEOWNERS") != "File not Found.":
-                codeowners_missing = False
-                codeowners_path = ".github/CODEOWNERS"
 
+def build_security_index(repositories: list[dict]) -> dict[str, dict]:
+    """Builds an index of each repository's visibility and security_and_analysis settings.
 
-        # If a CODEOWNERS file is found, check if there is a point of contact
-        if not codeowners_missing:
-            
-            contents = ql.get_file_contents_from_repo(org, repository["name"], codeowners_path)
-            codeowners = ql.get_codeowners_from_text(contents)
-            codeowners = ql.identify_teams_and_users(codeowners)
-            codeowners = ql.get_codeowner_users(org, codeowners)
-            emails = ql.get_codeowner_emails(codeowners, org)
+    Args:
+        repositories (list[dict]): The repositories from the organization's repository list.
 
-            if emails:
-                point_of_contact_missing = False
+    Returns:
+        dict[str, dict]: The visibility and security_and_analysis of each repository, keyed by repository name.
+    """
 
-        else:
-            # If a codeowners file is not found, the check should pass as this check won't apply.
-            # A CODEOWNERS file would be required and the codeowners check would fail instead.
-            point_of_contact_missing = False
+    security_index = {}
 
+    for repository in repositories:
+        # Repositories without security_and_analysis are left out, so they fall back to the REST API
+        if repository["visibility"] == "public" and not repository.get("security_and_analysis"):
+            continue
 
-        repository_data = {
-            "name": repository["name"],
-            "type": repository["visibility"],
-            "url": repository["url"],
-            "created_at": repository["createdAt"],
-            "checklist": {
-                "inactive": policy_checks.is_inactive(repository["pushedAt"], inactivity_threshold),
-                "unprotected_branches": not rest_data["branch_protection"],
-                "unsigned_commits": policy_checks.has_unsigned_commits(commits),
-                "readme_missing": policy_checks.file_missing(repository_contents, "README.md"),
-                "license_missing": policy_checks.file_missing(repository_contents, "LICENSE"),
-                "pirr_missing": policy_checks.file_missing(repository_contents, "PIRR.md"),
-                "gitignore_missing": policy_checks.file_missing(repository_contents, ".gitignore"),
-                "external_pr": policy_checks.has_external_pr(pull_requests, org_members),
-                "breaks_naming_convention": policy_checks.breaks_naming_convention(repository["name"]),
-                "secret_scanning_disabled": not rest_data["secret_scanning"],
-                "push_protection_disabled": not rest_data["push_protection"],
-                "dependabot_disabled": not repository["hasVulnerabilityAlertsEnabled"],
-                "codeowners_missing": codeowners_missing,
-                "point_of_contact_missing": point_of_contact_missing
-            }
+        security_index[repository["name"]] = {
+            "visibility": repository["visibility"],
+            "security_and_analysis": repository.get("security_and_analysis"),
         }
 
-        # If the repository is public, the PIRR.md file is not required
-        # If the repository is private, the LICENSE file is not required
-        if repository["visibility"] == "PUBLIC":
-            repository_data["checklist"]["pirr_missing"] = False
-        else:
-            repository_data["checklist"]["license_missing"] = False
-
-        output.append(repository_data)
+    return security_index
 
-    return output
 
+def get_security_index(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str, thread_count: int) -> dict[str, dict]:
+    """Gets the visibility and security_and_analysis settings of every repository from the organization's repository list.
 
-def get_output_data(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[dict], inactivity_threshold: int, signed_commit_number: int, thread_count: int) -> list[dict]:
-    """Gets the output data for all the repositories.
+    GET /orgs/{org}/repos returns the same fields as GET /repos/{org}/{repo}, 100 repositories at a time.
+    After the first page, the remaining pages are requested concurrently.
 
     Args:
         logger (wrapped_logging): The logger object.
         rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
-        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
         org (str): The name of the GitHub organization.
-        repositories (list[dict]): The list of repositories.
-        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
-        signed_commit_number (int): The maximum number of commits to get for the signed commits check.
-        thread_count (int): The number of threads to use.
+        thread_count (int): The number of threads to request pages with.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
 
     Returns:
-        list[dict]: The output data for all the repositories.
+        dict[str, dict]: The visibility and security_and_analysis of each repository, keyed by repository name.
     """
 
-    output = []
+    logger.log_info("Getting the organization repository list for secret scanning and push protection.")
 
-    org_members = get_org_members(logger, rest, org)
+    repositories = []
 
-    threading_groups = calculate_threading_groups(len(repositories), thread_count)
+    for page in pagination.get_pages(rest, f"/orgs/{org}/repos", {"per_page": 100}, thread_count):
+        repositories.extend(page)
 
-    logger.log_info(f"Threading groups: {threading_groups}")
+    security_index = build_security_index(repositories)
 
-    threads = []
+    logger.log_info(f"Security settings retrieved for {len(security_index)} repositories.")
 
-    for group in threading_groups:
-        
-        start, end = group
+    return security_index
 
-        thread = custom_threading.CustomThread(target=get_repository_batch, args=(logger, rest, ql, org, repositories, org_members, inactivity_threshold, signed_commit_number, start, end))
 
-        thread.add_arg(thread.name)
+def get_org_members(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str, thread_count: int) -> list[str]:
+    """Gets the members of a GitHub organization.
 
-        threads.append(thread)
+    Args:
+        logger (wrapped_logging): The logger object.
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        thread_count (int): The maximum number of pages to request at once.
 
-        thread.start()
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
 
-    # Wait for all threads to finish
-    for thread in threads:
-        thread.join()
+    Returns:
+        list[str]: The members of the GitHub organization.
+    """
 
-        logger.log_info(f"{thread.name} processed {len(thread.return_value)} repositories.")
+    members = []
 
-        output.extend(thread.return_value)
+    logger.log_info("Getting organization members.")
 
-    logger.log_info(f"Processed {len(output)} repositories.")
+    for page in pagination.get_pages(rest, f"/orgs/{org}/members", {"per_page": 100}, thread_count):
+        for member in page:
+            members.append(member["login"])
 
-    return output
+    logger.log_info(f"{len(members)} organization members retrieved.")
 
+    return members
+
+
+REMAINING_DATA_FRAGMENT = """
+fragment remainingData on Repository {
+
+    # Signed Commits
+
+    defaultBranchRef {
+        target {
+            ... on Commit {
+                history(first: $max_commits) {
+                    nodes {
+                        signature {
+                            isValid
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    # External PR
+
+    pullRequests(first: 50, states: OPEN) {
+        nodes {
+            author {
+                login
+            }
+        }
+    }
+
+    # Contents
+
+    object(expression: "HEAD:") {
+        ... on Tree {
+            entries {
+                name
+            }
+        }
+    }
+}
+"""
+
+
+def parse_remaining_data(repository_json: dict | None) -> tuple[list[dict], list[dict], list[dict]]:
+    """Splits the GraphQL data for a single repository into commits, pull requests and contents.
+
+    Args:
+        repository_json (dict | None): The repository object from a GraphQL response (using the remainingData fragment).
+
+    Returns:
+        tuple[list[dict], list[dict], list[dict]]: The remaining data for the repository (signed commits, external PRs, repository contents).
+    """
+
+    # Turn the respective data into a list of commits, pull requests and contents
+    # If an error occurs, return an empty list
+    try:
+        commits = repository_json["defaultBranchRef"]["target"]["history"]["nodes"]
+    except TypeError:
+        commits = []
+
+    try:
+        pull_requests = repository_json["pullRequests"]["nodes"]
+    except Exception:
+        pull_requests = []
+
+    try:
+        contents = repository_json["object"]["entries"]
+    except TypeError:
+        contents = []
+
+    return commits, pull_requests, contents
+
+
+@retry_policy.retry
+def get_remaining_data(ql: github_api_toolkit.github_graphql_interface, org: str, repository: str, max_commits: int) -> tuple[list[dict], list[dict], list[dict]]:
+    """Gets the remaining data for a repository (signed commits, external PRs, repository contents).
+    
+    Args:
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repository (str): The name of the repository.
+        max_commits (int): The maximum number of commits to get.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        Exception: If the whole query failed, raised with the GraphQL errors.
+
+    Returns:
+        tuple[list[dict], list[dict], list[dict]]: The remaining data for the repository (signed commits, external PRs, repository contents).
+    """
+
+    query = """
+    query RemainingData($org: String!, $repo: String!, $max_commits: Int!) {
+        rateLimit {
+            cost
+            remaining
+        }
+        repository(owner: $org, name: $repo) {
+            ...remainingData
+        }
+    }
+    """ + REMAINING_DATA_FRAGMENT
+
+    variables = {
+        "org": org,
+        "repo": repository,
+        "max_commits": max_commits
+    }
+
+    response = ql.make_ql_request(query, variables)
+
+    response_json = interfaces.get_graphql_json(response)
+
+    return parse_remaining_data(response_json["data"]["repository"])
+
+
+def build_remaining_data_query(batch_size: int) -> str:
+    """Builds a GraphQL query which gets the remaining data for several repositories at once.
+
+    Each repository is requested as an aliased block (repo0, repo1, ...) with its name passed as a variable.
+
+    Args:
+        batch_size (int): The number of repositories in the query.
+
+    Returns:
+        str: The GraphQL query.
+    """
+
+    variable_definitions = ", ".join(f"$repo{i}: String!" for i in range(batch_size))
+
+    repository_blocks = "\n".join(
+        f"repo{i}: repository(owner: $org, name: $repo{i}) {{ ...remainingData }}" for i in range(batch_size)
+    )
+
+    query = f"""
+    query RemainingDataBatch($org: String!, $max_commits: Int!, {variable_definitions}) {{
+        rateLimit {{
+            cost
+            remaining
+        }}
+        {repository_blocks}
+    }}
+    """
+
+    return query + REMAINING_DATA_FRAGMENT
+
+
+@retry_policy.retry
+def get_remaining_data_batch(ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[str], max_commits: int) -> dict[str, tuple[list[dict], list[dict], list[dict]]]:
+    """Gets the remaining data for a batch of repositories in a single GraphQL request.
+
+    Args:
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repositories (list[str]): The names of the repositories in the batch.
+        max_commits (int): The maximum number of commits to get.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        Exception: If the whole batch failed, raised with the GraphQL errors.
+
+    Returns:
+        dict[str, tuple[list[dict], list[dict], list[dict]]]: The remaining data for each repository, keyed by repository name.
+    """
+
+    query = build_remaining_data_query(len(repositories))
+
+    variables = {
+        "org": org,
+        "max_commits": max_commits,
+    }
+
+    for i, repository in enumerate(repositories):
+        variables[f"repo{i}"] = repository
+
+    response = ql.make_ql_request(query, variables)
+
+    # A batch which failed as a whole (i.e. it timed out) raises its errors to be retried
+    # Otherwise, every repository in the batch would be published with no commits, pull requests or files
+    response_json = interfaces.get_graphql_json(response)
+
+    response_data = response_json["data"]
+
+    # Split the aliased blocks back out per repository
+    # A repository which errored comes back as None and is treated the same as in get_remaining_data
+    remaining_data = {}
+
+    for i, repository in enumerate(repositories):
+        try:
+            repository_json = response_data[f"repo{i}"]
+        except TypeError:
+            repository_json = None
+
+        remaining_data[repository] = parse_remaining_data(repository_json)
+
+    return remaining_data
+
+
+BRANCH_PROTECTION_FRAGMENT = """
+fragment branchProtection on RefConnection {
+    pageInfo {
+        endCursor
+        hasNextPage
+    }
+    nodes {
+        # Classic branch protection rules
+        branchProtectionRule {
+            id
+        }
+
+        # Repository rulesets
+        rules(first: 1) {
+            totalCount
+        }
+    }
+}
+"""
 
-def save_information(logger: wrapped_logging, write_to_s3: bool, filename: str, data: Any, s3: boto3.client = None, bucket_name: str = None):
+
+@retry_policy.retry
+def make_graphql_request(ql: github_api_toolkit.github_graphql_interface, query: str, variables: dict) -> dict:
+    """Makes a request to the GitHub GraphQL API, retrying on failure.
+
+    Args:
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        query (str): The GraphQL query.
+        variables (dict): The variables for the query.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
+        Exception: If the whole query failed, raised with the GraphQL errors.
+
+    Returns:
+        dict: The response from the GitHub API as a dictionary.
+    """
+
+    response = ql.make_ql_request(query, variables)
+
+    return interfaces.get_graphql_json(response)
+
+
+def build_branch_protection_query(batch_size: int) -> str:
+    """Builds a GraphQL query which gets a page of branches for several repositories at once.
+
+    Each repository is requested as an aliased block (repo0, repo1, ...) with its name and branch cursor passed as variables.
+
+    Args:
+        batch_size (int): The number of repositories in the query.
+
+    Returns:
+        str: The GraphQL query.
+    """
+
+    variable_definitions = ", ".join(f"$repo{i}: String!, $cursor{i}: String" for i in range(batch_size))
+
+    repository_blocks = "\n".join(
+        f"repo{i}: repository(owner: $org, name: $repo{i}) {{ "
+        f"refs(refPrefix: \"refs/heads/\", first: 100, after: $cursor{i}) {{ ...branchProtection }} }}"
+        for i in range(batch_size)
+    )
+
+    query = f"""
+    query BranchProtectionBatch($org: String!, {variable_definitions}) {{
+        rateLimit {{
+            cost
+            remaining
+        }}
+        {repository_blocks}
+    }}
+    """
+
+    return query + BRANCH_PROTECTION_FRAGMENT
+
+
+def parse_branch_protection_page(refs_json: dict) -> tuple[bool | None, str | None]:
+    """Checks a page of branches for any unprotected branches.
+
+    A branch is protected if it has a branch protection rule or a repository ruleset applies to it.
+
+    Args:
+        refs_json (dict): The refs connection from a GraphQL response (using the branchProtection fragment).
+
+    Returns:
+        tuple[bool | None, str | None]: The branch protection result (None if more pages need checking) and the cursor of the next page.
+    """
+
+    for branch in refs_json["nodes"]:
+        rules = branch.get("rules") or {}
+
+        if branch["branchProtectionRule"] is None and not rules.get("totalCount"):
+            return False, None
+
+    if refs_json["pageInfo"]["hasNextPage"]:
+        return None, refs_json["pageInfo"]["endCursor"]
+
+    return True, None
+
+
+def build_branch_protection_variables(org: str, pending: dict[str, str | None]) -> dict:
+    """Builds the variables for a branch protection query.
+
+    Args:
+        org (str): The name of the GitHub organization.
+        pending (dict[str, str | None]): The repositories in the query and the cursor of their next page of branches.
+
+    Returns:
+        dict: The variables for the query.
+    """
+
+    variables = {"org": org}
+
+    for i, (repository, cursor) in enumerate(pending.items()):
+        variables[f"repo{i}"] = repository
+        variables[f"cursor{i}"] = cursor
+
+    return variables
+
+
+def parse_branch_protection_response(response_json: dict, pending: dict[str, str | None], results: dict[str, bool | None]) -> dict[str, str | None]:
+    """Records the branch protection results from a batched response.
+
+    Args:
+        response_json (dict): The response from the GitHub API.
+        pending (dict[str, str | None]): The repositories in the query and the cursor of their page of branches.
+        results (dict[str, bool | None]): The branch protection results, updated with any repositories which are finished.
+
+    Returns:
+        dict[str, str | None]: The repositories which have more branches to check and the cursor of their next page.
+    """
+
+    response_data = response_json.get("data") or {}
+
+    next_pending = {}
+
+    for i, repository in enumerate(pending):
+        repository_json = response_data.get(f"repo{i}")
+
+        # If the repository errored, leave the result as None so it is checked using the REST API
+        if repository_json is None or repository_json.get("refs") is None:
+            results[repository] = None
+            continue
+
+        branch_protection, cursor = parse_branch_protection_page(repository_json["refs"])
+
+        if branch_protection is None:
+            next_pending[repository] = cursor
+        else:
+            results[repository] = branch_protection
+
+    return next_pending
+
+
+def get_branch_protection_batch(ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[str]) -> dict[str, bool | None]:
+    """Checks whether every branch is protected for a batch of repositories using GraphQL.
+
+    Each request checks a page of branches for every repository which is still pending.
+    A repository stops being requested as soon as an unprotected branch is found or it has no more branches.
+
+    Args:
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repositories (list[str]): The names of the repositories in the batch.
+
+    Returns:
+        dict[str, bool | None]: Whether all branches are protected for each repository (None if the repository could not be checked).
+    """
+
+    results = {}
+
+    pending = {repository: None for repository in repositories}
+
+    while pending:
+        query = build_branch_protection_query(len(pending))
+        variables = build_branch_protection_variables(org, pending)
+
+        response_json = make_graphql_request(ql, query, variables)
+
+        pending = parse_branch_protection_response(response_json, pending, results)
+
+    return results
+
+
+def get_head_commit(repository: dict) -> str | None:
+    """Gets the commit id at the head of a repository's default branch.
+
+    Args:
+        repository (dict): The repository from the organization listing.
+
+    Returns:
+        str | None: The commit id, or None if the repository has no default branch (i.e. it is empty).
+    """
+    try:
+        return repository["headCommit"]["target"]["oid"]
+    except (KeyError, TypeError):
+        return None
+
+
+def get_codeowners_checks(ql: github_api_toolkit.github_graphql_interface, org: str, repository: str, repository_contents: list[dict]) -> tuple[bool, bool]:
+    """Checks whether a repository has a CODEOWNERS file and whether it contains a point of contact.
+
+    Args:
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repository (str): The name of the repository.
+        repository_contents (list[dict]): The contents of the repository's root directory.
+
+    Returns:
+        tuple[bool, bool]: Whether the CODEOWNERS file is missing and whether the point of contact is missing.
+    """
+
+    codeowners_path = ""
+    codeowners_missing = policy_checks.file_missing(repository_contents, "CODEOWNERS")
+    point_of_contact_missing = True
+
+    if not codeowners_missing:
+        codeowners_path = "CODEOWNERS"
+
+    # If a CODEOWNERS is not found in the root directory, check the .github directory
+    if codeowners_missing and not policy_checks.file_missing(repository_contents, ".github"):
+
+        if ql.get_file_contents_from_repo(org, repository, ".github/CODEOWNERS") != "File not Found.":
+            codeowners_missing = False
+            codeowners_path = ".github/CODEOWNERS"
+
+
+    # If a CODEOWNERS file is found, check if there is a point of contact
+    if not codeowners_missing:
+        
+        contents = ql.get_file_contents_from_repo(org, repository, codeowners_path)
+        codeowners = ql.get_codeowners_from_text(contents)
+        codeowners = ql.identify_teams_and_users(codeowners)
+        codeowners = ql.get_codeowner_users(org, codeowners)
+        emails = ql.get_codeowner_emails(codeowners, org)
+
+        if emails:
+            point_of_contact_missing = False
+
+    else:
+        # If a codeowners file is not found, the check should pass as this check won't apply.
+        # A CODEOWNERS file would be required and the codeowners check would fail instead.
+        point_of_contact_missing = False
+
+    return codeowners_missing, point_of_contact_missing
+
+
+def build_repository_facts(repository: dict, remaining_data: tuple[list[dict], list[dict], list[dict]], rest_data: dict, codeowners_missing: bool, point_of_contact_missing: bool) -> dict:
+    """Builds the facts about a repository which its policy checks are evaluated from.
+
+    Args:
+        repository (dict): The repository from the organization listing.
+        remaining_data (tuple[list[dict], list[dict], list[dict]]): The signed commits, external PRs and repository contents for the repository.
+        rest_data (dict): The branch protection, secret scanning and push protection data for the repository.
+        codeowners_missing (bool): Whether the CODEOWNERS file is missing.
+        point_of_contact_missing (bool): Whether the CODEOWNERS file is missing a point of contact.
+
+    Returns:
+        dict: The repository's facts (see policy_checks.FACT_COLUMNS), along with its details for repositories.json.
+    """
+
+    commits, pull_requests, repository_contents = remaining_data
+
+    return {
+        "name": repository["name"],
+        "visibility": repository["visibility"],
+        "url": repository["url"],
+        "created_at": repository["createdAt"],
+        "pushed_at": repository["pushedAt"],
+        "head_commit": get_head_commit(repository),
+        "commits": commits,
+        "pull_requests": pull_requests,
+        "contents": repository_contents,
+        "branch_protection": rest_data["branch_protection"],
+        "secret_scanning": rest_data["secret_scanning"],
+        "push_protection": rest_data["push_protection"],
+        "dependabot_enabled": repository["hasVulnerabilityAlertsEnabled"],
+        "codeowners_missing": codeowners_missing,
+        "point_of_contact_missing": point_of_contact_missing,
+    }
+
+
+def build_repository_records(facts: list[dict], org_members: list[str], inactivity_threshold: int) -> list[dict]:
+    """Evaluates the policy checks for every repository in one batch and builds their repositories.json records.
+
+    Args:
+        facts (list[dict]): The facts about each repository, from build_repository_facts().
+        org_members (list[str]): The members of the GitHub organization.
+        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
+
+    Returns:
+        list[dict]: The repository records for repositories.json.
+    """
+
+    columns = {column: [repository[column] for repository in facts] for column in policy_checks.FACT_COLUMNS}
+
+    results = policy_checks.evaluate_batch(columns, org_members, inactivity_threshold)
+
+    # Incremental collection uses this to re-collect records which have been carried forward for too long
+    collected_at = datetime.datetime.now(datetime.timezone.utc).strftime(policy_checks.TIMESTAMP_FORMAT)
+
+    records = []
+
+    for i, repository in enumerate(facts):
+        records.append({
+            "name": repository["name"],
+            "type": repository["visibility"],
+            "url": repository["url"],
+            "created_at": repository["created_at"],
+            "pushed_at": repository["pushed_at"],
+            "head_commit": repository["head_commit"],
+            "collected_at": collected_at,
+            "checklist": {check: results[check][i] for check in policy_checks.CHECKS},
+        })
+
+    return records
+
+
+def process_repository(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, repository: dict, remaining_data: tuple[list[dict], list[dict], list[dict]], branch_protection: bool | None = None, security: dict | None = None) -> dict:
+    """Collects the facts needed for the policy checks of a single repository.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repository (dict): The repository from the organization listing.
+        remaining_data (tuple[list[dict], list[dict], list[dict]]): The signed commits, external PRs and repository contents for the repository.
+        branch_protection (bool | None, optional): The branch protection result, if already collected using GraphQL. Defaults to None.
+        security (dict | None, optional): The repository's entry from the security index, if available. Defaults to None.
+
+    Returns:
+        dict: The repository's facts, from build_repository_facts().
+    """
+
+    # Get REST Data (Branch Protection, Secret Scanning)
+
+    rest_data = get_rest_data(rest, org, repository["name"], branch_protection, security)
+
+    # Get Codeowners and Point of Contact
+
+    codeowners_missing, point_of_contact_missing = get_codeowners_checks(ql, org, repository["name"], remaining_data[2])
+
+    return build_repository_facts(repository, remaining_data, rest_data, codeowners_missing, point_of_contact_missing)
+
+
+def get_repository_batch(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[dict], security_index: dict[str, dict], max_commits: int, remaining_data_batch_size: int, graphql_branch_protection: bool, start: int, end: int, thread_name: str) -> list[dict]:
+    """Collects the policy check facts for a batch of repositories.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repositories (list[dict]): The list of repositories.
+        security_index (dict[str, dict]): The visibility and security settings of each repository (empty to use the REST API per repository).
+        max_commits (int): The maximum number of commits to get for the signed commits check.
+        remaining_data_batch_size (int): The number of repositories to request in each remaining data GraphQL query (1 requests each repository separately).
+        graphql_branch_protection (bool): Whether to check branch protection in bulk using GraphQL rather than per repository using the REST API.
+        start (int): The start index of the batch.
+        end (int): The end index of the batch.
+
+    Returns:
+        list[dict]: The facts about each repository in the batch.
+    """
+
+    output = []
+
+    logger.log_info(f"Processing repositories {start} to {end}.")
+
+    for batch_start in range(start, end, remaining_data_batch_size):
+        batch_end = min(batch_start + remaining_data_batch_size, end)
+
+        batch = repositories[batch_start:batch_end]
+
+        # Get outstanding QL Data (Signed Commits, External PRs and Repository Contents)
+        # Repositories collected using single-pass collection already have this data
+        # When batching, this is collected for the rest of the batch in a single request
+        outstanding = [repository["name"] for repository in batch if "remaining_data" not in repository]
+
+        if remaining_data_batch_size > 1 and outstanding:
+            logger.log_info(f"Getting remaining data for {len(outstanding)} repositories between {batch_start} and {batch_end} using {thread_name}.")
+
+            batch_remaining_data = get_remaining_data_batch(ql, org, outstanding, max_commits)
+
+        # Get Branch Protection for the whole batch using GraphQL
+        batch_branch_protection = {}
+
+        if graphql_branch_protection:
+            batch_branch_protection = get_branch_protection_batch(ql, org, [repository["name"] for repository in batch])
+
+        for i, repository in enumerate(batch, start=batch_start):
+
+            logger.log_info(f"Processing repository {repository['name']} (index: {i}) using {thread_name}.")
+
+            if "remaining_data" in repository:
+                remaining_data = repository["remaining_data"]
+            elif remaining_data_batch_size > 1:
+                remaining_data = batch_remaining_data[repository["name"]]
+            else:
+                remaining_data = get_remaining_data(ql, org, repository["name"], max_commits)
+
+            branch_protection = batch_branch_protection.get(repository["name"])
+
+            security = security_index.get(repository["name"])
+
+            repository_facts = process_repository(logger, rest, ql, org, repository, remaining_data, branch_protection, security)
+
+            output.append(repository_facts)
+
+    return output
+
+
+def get_output_data(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, repositories: list[dict], security_index: dict[str, dict], inactivity_threshold: int, signed_commit_number: int, thread_count: int, remaining_data_batch_size: int, graphql_branch_protection: bool, checkpoint: CollectionCheckpoint | None = None) -> list[dict] | None:
+    """Gets the output data for all the repositories.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        repositories (list[dict]): The list of repositories.
+        security_index (dict[str, dict]): The visibility and security settings of each repository (empty to use the REST API per repository).
+        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
+        signed_commit_number (int): The maximum number of commits to get for the signed commits check.
+        thread_count (int): The number of threads to use.
+        remaining_data_batch_size (int): The number of repositories to request in each remaining data GraphQL query.
+        graphql_branch_protection (bool): Whether to check branch protection in bulk using GraphQL.
+        checkpoint (CollectionCheckpoint | None, optional): When given, repositories already in the checkpoint are skipped,
+            each task's records are added to the checkpoint as it completes, and no new tasks are started once the
+            checkpoint's deadline has passed. Defaults to None.
+
+    Returns:
+        list[dict] | None: The output data for all the repositories, or None if the checkpoint's deadline passed before every repository was collected.
+    """
+
+    org_members = get_org_members(logger, rest, org, thread_count)
+
+    pending = repositories
+
+    if checkpoint is not None:
+        pending = checkpoint.get_pending(repositories)
+
+        logger.log_info(f"{len(repositories) - len(pending)} repositories already collected in the checkpoint.")
+
+    # Split the repositories into tasks of remaining_data_batch_size repositories
+    # Threads pull the next task from a shared queue as soon as they are free
+    tasks = []
+
+    for start in range(0, len(pending), remaining_data_batch_size):
+        end = min(start + remaining_data_batch_size, len(pending))
+
+        tasks.append((logger, rest, ql, org, pending, security_index, signed_commit_number, remaining_data_batch_size, graphql_branch_protection, start, end))
+
+    def get_checkpointed_repository_batch(*args) -> list[dict]:
+        # When checkpointing, each task's policy checks are evaluated as one batch so its records can be saved straight away
+        records = build_repository_records(get_repository_batch(*args), org_members, inactivity_threshold)
+
+        checkpoint.add_records(records)
+
+        return records
+
+    logger.log_info(f"Processing {len(pending)} repositories as {len(tasks)} tasks using {thread_count} threads.")
+
+    if checkpoint is None:
+        work_queue = custom_threading.WorkQueue(get_repository_batch, thread_count)
+
+        results = work_queue.run(tasks)
+    else:
+        work_queue = custom_threading.WorkQueue(get_checkpointed_repository_batch, thread_count)
+
+        results = work_queue.run(tasks, checkpoint.is_out_of_time)
+
+    for thread_name, stats in work_queue.worker_stats.items():
+        logger.log_info(f"{thread_name} processed {stats['tasks']} tasks in {stats['busy_time']:.2f} seconds ({stats['utilisation']:.0%} utilisation).")
+
+    if checkpoint is not None:
+        if work_queue.stopped:
+            logger.log_warning(f"Deadline reached with {len([result for result in results if result is None])} of {len(tasks)} tasks unprocessed.")
+            return None
+
+        output = checkpoint.get_records(repositories)
+
+        logger.log_info(f"Processed {len(output)} repositories.")
+
+        return output
+
+    facts = []
+
+    for result in results:
+        facts.extend(result)
+
+    # The policy checks for every repository are evaluated together once all the facts are collected
+    output = build_repository_records(facts, org_members, inactivity_threshold)
+
+    logger.log_info(f"Processed {len(output)} repositories.")
+
+    return output
+
+
+def load_previous_repositories(logger: wrapped_logging, write_to_s3: bool, filename: str, s3: boto3.client = None, bucket_name: str = None) -> dict[str, dict]:
+    """Loads the previously published repository data, keyed by repository name.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to read the data from S3 or locally.
+        filename (str): The name of the file to read.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to read from. Defaults to None.
+
+    Returns:
+        dict[str, dict]: The previous repository records, or an empty dictionary if they could not be loaded.
+    """
+
+    try:
+        if write_to_s3:
+            response = s3.get_object(Bucket=bucket_name, Key=filename)
+
+            previous_data = read_records(response["Body"].read().decode("utf-8"))
+
+        else:
+            with open(f"./output/{filename}") as f:
+                previous_data = read_records(f.read())
+
+    except Exception as e:
+        logger.log_warning(f"Unable to load previous {filename} ({e}). All repositories will be collected.")
+        return {}
+
+    return {record["name"]: record for record in previous_data}
+
+
+def is_repository_unchanged(repository: dict, previous_record: dict) -> bool:
+    """Checks whether a repository has changed since its previous record was collected.
+
+    A repository is unchanged if it has not been pushed to, its default branch points at the same commit
+    and its visibility is the same (visibility decides which files are required).
+
+    Args:
+        repository (dict): The repository from the organization listing.
+        previous_record (dict): The repository's record from the previous run.
+
+    Returns:
+        bool: True if the repository is unchanged, False otherwise.
+    """
+
+    # Records from before incremental collection do not have the fields to compare
+    if "pushed_at" not in previous_record or "head_commit" not in previous_record:
+        return False
+
+    return (
+        previous_record["pushed_at"] == repository["pushedAt"]
+        and previous_record["head_commit"] == get_head_commit(repository)
+        and previous_record["type"] == repository["visibility"]
+    )
+
+
+def is_carry_forward_expired(previous_record: dict, max_age: int, now: datetime.datetime = None) -> bool:
+    """Checks whether a previous record has gone too long without being collected again.
+
+    Some checks (i.e. branch protection, external pull requests and CODEOWNERS points of contact) can change without
+    a push, so carried forward records are collected again once they are max_age seconds old.
+
+    Args:
+        previous_record (dict): The repository's record from the previous run.
+        max_age (int): The number of seconds after which a record is collected again.
+        now (datetime.datetime, optional): The current time in UTC. Defaults to None (datetime.datetime.now()).
+
+    Returns:
+        bool: True if the record must be collected again, False otherwise.
+    """
+
+    # Records from before collected_at was added have no age, so are collected again
+    if not previous_record.get("collected_at"):
+        return True
+
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+    collected_at = datetime.datetime.strptime(previous_record["collected_at"], policy_checks.TIMESTAMP_FORMAT).replace(tzinfo=datetime.timezone.utc)
+
+    return (now - collected_at).total_seconds() >= max_age
+
+
+def carry_forward_repository(repository: dict, previous_record: dict, inactivity_threshold: int, security: dict | None = None) -> dict:
+    """Carries a previous repository record forward, re-evaluating the checks which only need the organization listing.
+
+    Args:
+        repository (dict): The repository from the organization listing.
+        previous_record (dict): The repository's record from the previous run.
+        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
+        security (dict | None, optional): The repository's entry from the security index, if available. Defaults to None
+            (the secret scanning and push protection checks are carried forward).
+
+    Returns:
+        dict: The repository record for repositories.json.
+    """
+
+    repository_data = {
+        "name": repository["name"],
+        "type": repository["visibility"],
+        "url": repository["url"],
+        "created_at": repository["createdAt"],
+        "pushed_at": repository["pushedAt"],
+        "head_commit": get_head_commit(repository),
+        "collected_at": previous_record.get("collected_at"),
+        "checklist": dict(previous_record["checklist"]),
+    }
+
+    # Time based and listing based checks can change without a push
+    repository_data["checklist"]["inactive"] = policy_checks.is_inactive(repository["pushedAt"], inactivity_threshold)
+    repository_data["checklist"]["dependabot_disabled"] = not repository["hasVulnerabilityAlertsEnabled"]
+    repository_data["checklist"]["breaks_naming_convention"] = policy_checks.breaks_naming_convention(repository["name"])
+
+    # So can the security settings, which are already in the security index
+    if security is not None:
+        secret_scanning, push_protection = get_security_and_analysis_checks(security)
+
+        repository_data["checklist"]["secret_scanning_disabled"] = not secret_scanning
+        repository_data["checklist"]["push_protection_disabled"] = not push_protection
+
+    return repository_data
+
+
+def split_changed_repositories(logger: wrapped_logging, repositories: list[dict], previous_repositories: dict[str, dict], inactivity_threshold: int, max_age: int, security_index: dict[str, dict] | None = None) -> tuple[list[dict], dict[str, dict]]:
+    """Splits the repositories into those which need collecting and those which can be carried forward.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        repositories (list[dict]): The list of repositories.
+        previous_repositories (dict[str, dict]): The previous repository records, keyed by repository name.
+        inactivity_threshold (int): The inactivity threshold for a repository to be considered inactive.
+        max_age (int): The number of seconds after which a record is collected again, even if the repository is unchanged.
+        security_index (dict[str, dict] | None, optional): The visibility and security settings of each repository,
+            used to re-evaluate the security checks of carried forward records. Defaults to None.
+
+    Returns:
+        tuple[list[dict], dict[str, dict]]: The repositories to collect and the carried forward records (keyed by repository name).
+    """
+
+    changed_repositories = []
+    carried_forward = {}
+    expired = 0
+
+    security_index = security_index or {}
+
+    for repository in repositories:
+        previous_record = previous_repositories.get(repository["name"])
+
+        if previous_record and is_repository_unchanged(repository, previous_record):
+            if is_carry_forward_expired(previous_record, max_age):
+                changed_repositories.append(repository)
+                expired += 1
+                continue
+
+            carried_forward[repository["name"]] = carry_forward_repository(repository, previous_record, inactivity_threshold, security_index.get(repository["name"]))
+        else:
+            changed_repositories.append(repository)
+
+    logger.log_info(f"{len(changed_repositories) - expired} repositories have changed since the last run and {expired} unchanged repositories are due to be collected again. {len(carried_forward)} repositories carried forward.")
+
+    return changed_repositories, carried_forward
+
+
+def merge_repository_data(repositories: list[dict], collected: list[dict], carried_forward: dict[str, dict]) -> list[dict]:
+    """Merges collected and carried forward repository records, in the order of the repository list.
+
+    Args:
+        repositories (list[dict]): The list of repositories.
+        collected (list[dict]): The records collected during this run.
+        carried_forward (dict[str, dict]): The carried forward records, keyed by repository name.
+
+    Returns:
+        list[dict]: The repository records for repositories.json.
+    """
+
+    records = {record["name"]: record for record in collected}
+    records.update(carried_forward)
+
+    return [records[repository["name"]] for repository in repositories if repository["name"] in records]
+
+
+def save_information(logger: wrapped_logging, write_to_s3: bool, filename: str, data: Iterable[Any], s3: boto3.client = None, bucket_name: str = None, output_format: str = "json") -> dict:
     """Saves information to a file.
 
+    The records are streamed to the file (or S3) one at a time, rather than serialising the whole file at once.
+    Locally, records are indented to make them easier to read. In S3, they are written without indentation.
+
     Args:
         logger (wrapped_logging): The logger object.
         write_to_s3 (bool): Whether to write the information to S3 or locally.
         filename (str): The name of the file to save the information to.
-        data (Any): The data to save (JSON ONLY).
+        data (Iterable[Any]): The records to save (JSON ONLY).
         s3 (boto3.client, optional): The S3 Client. Defaults to None.
         bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+        output_format (str, optional): The format to write (json or ndjson). Defaults to "json".
 
     Raises:
         Exception: If the S3 client and bucket name are not provided when writing to S3.
+
+    Returns:
+        dict: The key, ETag (S3 only), number of records and size of the file written.
     """
 
-    if write_to_s3:
+    indent = None if write_to_s3 else 4
 
-        if not s3 or not bucket_name:
-            raise Exception("S3 client and bucket name required to write to S3.")
-        
-        s3.put_object(Bucket=bucket_name, Key=filename, Body=json.dumps(data, indent=4))
+    with OutputWriter(logger, write_to_s3, filename, output_format, indent, s3, bucket_name) as writer:
+        writer.write_many(data)
 
-        logger.log_info(f"{filename} uploaded to S3.")
+    return {"key": filename, "etag": writer.etag, "records": writer.record_count, "bytes": writer.bytes_written}
 
-    else:
 
-        # Check if ./output directory exists
-        if not os.path.exists("./output"):
-            os.makedirs("./output")
+def save_columnar_information(logger: wrapped_logging, write_to_s3: bool, dataset: str, filename: str, data: list[dict], s3: boto3.client = None, bucket_name: str = None) -> dict:
+    """Saves a dataset as a compressed, columnar Parquet file (i.e. repositories.parquet) alongside its JSON file.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the file to S3 or locally.
+        dataset (str): The name of the dataset (repositories, dependabot or secret_scanning).
+        filename (str): The name of the file to write.
+        data (list[dict]): The records in the dataset.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+    Returns:
+        dict: The key, ETag (S3 only) and number of records of the file written.
+    """
+
+    # Imported here so pyarrow is only required when columnar output is enabled
+    import src.columnar_output as columnar_output
+
+    schemas = {
+        "repositories": columnar_output.REPOSITORY_SCHEMA,
+        "dependabot": columnar_output.DEPENDABOT_SCHEMA,
+        "secret_scanning": columnar_output.SECRET_SCANNING_SCHEMA,
+    }
+
+    return columnar_output.save_columnar(logger, write_to_s3, filename, data, schemas[dataset], s3, bucket_name)
+
+
+def remove_columnar_information(logger: wrapped_logging, dataset: str, s3: boto3.client, bucket_name: str):
+    """Removes a dataset's Parquet file from S3, so the dashboard does not read an out of date copy instead of the JSON file.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        dataset (str): The name of the dataset (repositories, dependabot or secret_scanning).
+        s3 (boto3.client): The S3 Client.
+        bucket_name (str): The name of the S3 bucket.
+    """
+
+    # Deleting a key which does not exist succeeds, so this is safe to run when columnar output has never been enabled
+    s3.delete_object(Bucket=bucket_name, Key=f"{dataset}.parquet")
+
+    logger.log_info(f"Columnar output disabled. Removed any previous {dataset}.parquet from S3.")
 
-        # Write the data to a file locally
-        filename = f"./output/{filename}"
 
-        with open(filename, "w") as f:
-            f.write(json.dumps(data, indent=4))
+def publish_dataset(logger: wrapped_logging, write_to_s3: bool, dataset: str, data: list[dict], output_format: str, columnar_output: bool, run_id: str | None, s3: boto3.client = None, bucket_name: str = None) -> dict:
+    """Saves a dataset's outputs and describes them for the run's manifest.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the outputs to S3 or locally.
+        dataset (str): The name of the dataset (repositories, dependabot or secret_scanning).
+        data (list[dict]): The records in the dataset.
+        output_format (str): The format to write the JSON output in (json or ndjson).
+        columnar_output (bool): Whether to also write the dataset as a Parquet file.
+        run_id (str | None): The ID of the run to write the outputs under, or None to overwrite the unversioned outputs.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+    Returns:
+        dict: The dataset's entry in the manifest.
+    """
+
+    def get_key(filename: str) -> str:
+        return snapshots.get_run_key(run_id, filename) if run_id else filename
+
+    entry = save_information(logger, write_to_s3, get_key(f"{dataset}.json"), data, s3, bucket_name, output_format)
+
+    entry["run_id"] = run_id
+    entry["format"] = output_format
+
+    if columnar_output:
+        entry["parquet"] = save_columnar_information(logger, write_to_s3, dataset, get_key(f"{dataset}.parquet"), data, s3, bucket_name)
+
+    # Versioned runs only include a Parquet file in the manifest when one is written, so there is nothing to remove
+    elif write_to_s3 and not run_id:
+        remove_columnar_information(logger, dataset, s3, bucket_name)
+
+    return entry
+
+
+def get_days_open(created_at: str) -> int:
+    """Gets the number of days an alert has been open for.
+
+    Args:
+        created_at (str): When the alert was created.
+
+    Returns:
+        int: The number of whole days since the alert was created.
+    """
+
+    days_open = datetime.datetime.now() - datetime.datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
+
+    return days_open.days
+
+
+def is_past_threshold(alerts: list[dict], threshold: int) -> bool:
+    """Checks whether the last page of alerts (sorted oldest first) reached alerts within the threshold.
+
+    When alerts are requested in order of creation (oldest first), every alert after one within the threshold
+    is also within the threshold. These alerts would be discarded, so there is no need to request them.
+
+    Args:
+        alerts (list[dict]): The page of alerts, sorted by creation date (oldest first).
+        threshold (int): The number of days an alert has been open for before it is considered a problem.
+
+    Returns:
+        bool: True if the remaining alerts are all within the threshold, False otherwise.
+    """
 
-        logger.log_info(f"{filename} written locally.")
+    return not alerts or get_days_open(alerts[-1]["created_at"]) <= threshold
 
 
 def process_dependabot_alerts(response_json: dict, threshold: int) -> list[dict]:
@@ -748,9 +1713,7 @@ def process_dependabot_alerts(response_json: dict, threshold: int) -> list[dict]
 
     for alert in response_json:
 
-        days_open = datetime.datetime.now() - datetime.datetime.strptime(alert["created_at"], "%Y-%m-%dT%H:%M:%SZ")
-
-        days_open = days_open.days
+        days_open = get_days_open(alert["created_at"])
 
         if (days_open > threshold):
 
@@ -769,6 +1732,8 @@ def process_dependabot_alerts(response_json: dict, threshold: int) -> list[dict]
 def get_dependabot_data_for_severity(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str, severity: str, threshold: int, thread_name: str) -> list[dict]:
     """Gets the Dependabot data for all the repositories in an organization.
 
+    Alerts are requested oldest first, so pagination stops as soon as the remaining alerts are all within the threshold.
+
     Args:
         logger (wrapped_logging): The logger object.
         rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
@@ -785,45 +1750,45 @@ def get_dependabot_data_for_severity(logger: wrapped_logging, rest: github_api_t
 
     # Get the threshold for the given severity
 
-    response = rest.get(f"/orgs/{org}/dependabot/alerts", {"state": "open", "severity": severity, "per_page": 100})
+    response = rest.get(f"/orgs/{org}/dependabot/alerts", {"state": "open", "severity": severity, "sort": "created", "direction": "asc", "per_page": 100})
 
     if type(response) is not Response:
         raise Exception(response)
 
     page_no = 1
-    has_next_page = True
-    next_page = response.links.get("next", None)
 
-    if not next_page:
-        logger.log_info(f"Only one page of Dependabot alerts for {severity} severity. Using {thread_name}.")
-        has_next_page = False
+    # The number of pages which were not requested, as they are within the threshold
+    skipped = 0
 
-    # Process and store the first page
-    response_json = response.json()
-    response_json = process_dependabot_alerts(response_json, threshold)
-    dependabot_data.extend(response_json)
+    while True:
+        response_json = response.json()
+
+        # Process and store the page
+        dependabot_data.extend(process_dependabot_alerts(response_json, threshold))
+
+        next_page = response.links.get("next", None)
+
+        if not next_page:
+            break
+
+        if is_past_threshold(response_json, threshold):
+            # The alerts on the remaining pages were all opened within the threshold.
+            # Dependabot alerts are paginated with cursors, so the number of remaining pages is only known if GitHub sends a last page link.
+            skipped = pagination.get_last_page(response) - page_no if "last" in response.links else None
+            break
 
-    # After the first page, recursively get the next pages
-    # process each page and store the data
-    while has_next_page:
         page_no += 1
-        next_page_url = next_page["url"]
 
         logger.log_info(f"Processing page {page_no} of Dependabot alerts for {severity} severity. Using {thread_name}.")
 
-        response = rest.get(next_page_url, add_prefix=False)
+        response = rest.get(next_page["url"], add_prefix=False)
 
         if type(response) is not Response:
             raise Exception(response)
 
-        next_page = response.links.get("next", None)
-
-        if not next_page:
-            has_next_page = False
+    skipped_message = f"{skipped} skipped" if skipped is not None else "the remaining pages (at least 1) skipped"
 
-        response_json = response.json()
-        response_json = process_dependabot_alerts(response_json, threshold)
-        dependabot_data.extend(response_json)
+    logger.log_info(f"Processed {page_no} pages of Dependabot alerts for {severity} severity. {page_no} pages fetched and {skipped_message} as they are within the threshold. Using {thread_name}.")
 
     return dependabot_data
 
@@ -869,14 +1834,17 @@ def get_dependabot_data(logger: wrapped_logging, rest: github_api_toolkit.github
 
     return dependabot_data
 
-def get_secret_scanning_data(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str, threshold: int) -> dict:
+def get_secret_scanning_data(logger: wrapped_logging, rest: github_api_toolkit.github_interface, org: str, threshold: int, thread_count: int) -> dict:
     """Gets the Secret Scanning alerts for an organization.
 
+    Alerts are requested oldest first, so pagination stops as soon as the remaining alerts are all within the threshold.
+
     Args:
         logger (wrapped_logging): The logger object.
         rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
         org (str): The name of the GitHub organization.
         threshold (int): The number of days an alert has been open for before it is considered a problem.
+        thread_count (int): The maximum number of pages to request at once (at most SECRET_SCANNING_PAGE_WINDOW).
 
     Returns:
         dict: The Secret Scanning data the organization.
@@ -884,30 +1852,16 @@ def get_secret_scanning_data(logger: wrapped_logging, rest: github_api_toolkit.g
 
     secret_scanning_data = []
 
-    response = rest.get(f"/orgs/{org}/secret-scanning/alerts", {"state": "open","per_page": 100})
-
-    if type(response) is not Response:
-        raise Exception(response)
-    
-    try:
-        last_page = int(response.links["last"]["url"].split("=")[-1])
-    except KeyError:
-        last_page = 1
-
-    for page in range(1, last_page + 1):
-        logger.log_info(f"Processing page {page} / {last_page} of Secret Scanning alerts.")
+    page_stats = {}
 
-        response = rest.get(f"/orgs/{org}/secret-scanning/alerts", {"state": "open", "per_page": 100, "page": page})
+    pages = pagination.get_pages(rest, f"/orgs/{org}/secret-scanning/alerts", {"state": "open", "sort": "created", "direction": "asc", "per_page": 100}, min(thread_count, SECRET_SCANNING_PAGE_WINDOW), page_stats)
 
-        if type(response) is not Response:
-            raise Exception(response)
-        
-        response_json = response.json()
+    for page, response_json in enumerate(pages, start=1):
+        logger.log_info(f"Processing page {page} / {page_stats['pages']} of Secret Scanning alerts.")
 
         for alert in response_json:
 
-            days_open = datetime.datetime.now() - datetime.datetime.strptime(alert["created_at"], "%Y-%m-%dT%H:%M:%SZ")
-            days_open = days_open.days
+            days_open = get_days_open(alert["created_at"])
 
             # If the alert has been open for less than the threshold, skip it
             if days_open <= threshold:
@@ -922,10 +1876,293 @@ def get_secret_scanning_data(logger: wrapped_logging, rest: github_api_toolkit.g
 
             secret_scanning_data.append(formatted_alert)
 
+        # The alerts on the remaining pages were all opened within the threshold
+        if is_past_threshold(response_json, threshold):
+            pages.close()
+            break
+
+    logger.log_info(f"Processed {page_stats['yielded']} / {page_stats['pages']} pages of Secret Scanning alerts. {page_stats['requested']} pages fetched and {page_stats['pages'] - page_stats['requested']} skipped as they are within the threshold.")
+
     return secret_scanning_data
 
 
-def handler(event, context) -> str: # type: ignore[no-untyped-def]
+def load_shard_records(write_to_s3: bool, key: str, s3: boto3.client = None, bucket_name: str = None) -> list[dict]:
+    """Loads the records of a shard's input or output (the repository records a worker collected for it).
+
+    Args:
+        write_to_s3 (bool): Whether the shard's records were written to S3 or locally.
+        key (str): The key of the shard's input or output.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket. Defaults to None.
+
+    Returns:
+        list[dict]: The shard's records.
+    """
+
+    if write_to_s3:
+        response = s3.get_object(Bucket=bucket_name, Key=key)
+
+        return read_records(response["Body"].read().decode("utf-8"))
+
+    with open(f"./output/{key}") as f:
+        return read_records(f.read())
+
+
+def collect_shard(logger: wrapped_logging, rest: github_api_toolkit.github_interface, ql: github_api_toolkit.github_graphql_interface, org: str, settings: dict, features: dict, event: dict, write_to_s3: bool, s3: boto3.client = None, bucket_name: str = None) -> dict:
+    """Collects the repository records for a single shard, as a worker for a coordinator.
+
+    The records are written to the shard's output for the coordinator to merge. Workers always use the threads collection engine.
+    When the event has a deadline, the worker starts no more work once it passes and writes the records collected so far.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        ql (github_api_toolkit.github_graphql_interface): The GraphQL interface for the GitHub API.
+        org (str): The name of the GitHub organization.
+        settings (dict): The settings from config.json.
+        features (dict): The features from config.json.
+        event (dict): The worker's event payload, from sharding.build_worker_event().
+        write_to_s3 (bool): Whether to write the shard output to S3 or locally.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+    Returns:
+        dict: The index of the shard, the key of its output, the number of records collected and whether every repository in the shard was collected.
+    """
+
+    logger.log_info(f"Collecting shard {event['shard']} of run {event['run_id']} ({len(event['repositories'])} repositories).")
+
+    repositories, security_index = sharding.read_shard_input(load_shard_records(write_to_s3, event["input_key"], s3, bucket_name), event["repositories"])
+
+    args = (
+        logger,
+        rest,
+        ql,
+        org,
+        repositories,
+        security_index,
+        get_dict_value(settings, "inactivity_threshold"),
+        get_dict_value(settings, "signed_commit_number"),
+        get_dict_value(settings, "thread_count"),
+        get_dict_value(settings, "remaining_data_batch_size"),
+        get_dict_value(features, "graphql_branch_protection"),
+    )
+
+    if event.get("deadline") is None:
+        records = get_output_data(*args)
+    else:
+        # The coordinator's deadline is shared through a checkpoint which only lives for this invocation
+        # The coordinator checkpoints the records the worker returns, so the next run collects the rest
+        with tempfile.TemporaryDirectory() as directory:
+            shard_checkpoint = CollectionCheckpoint(logger, org, directory, get_dict_value(settings, "checkpoint_interval"), get_dict_value(settings, "checkpoint_max_age"))
+
+            shard_checkpoint.deadline = event["deadline"]
+
+            get_output_data(*args, shard_checkpoint)
+
+            records = shard_checkpoint.get_records(repositories)
+
+    key = sharding.get_shard_key(event["run_id"], event["shard"])
+
+    save_information(logger, write_to_s3, key, records, s3, bucket_name, "ndjson")
+
+    return {"shard": event["shard"], "key": key, "records": len(records), "complete": len(records) == len(repositories)}
+
+
+def collect_sharded(logger: wrapped_logging, session: boto3.session.Session, context: Any, settings: dict, repositories: list[dict], security_index: dict[str, dict], write_to_s3: bool, s3: boto3.client = None, bucket_name: str = None, checkpoint: CollectionCheckpoint | None = None) -> list[dict] | None:
+    """Collects the repository records by splitting the repositories into shards, collected by worker invocations, and merging their outputs.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        session (boto3.session.Session): The Boto3 session, used to create the Lambda client.
+        context (Any): The Lambda context of the coordinator (None when running locally).
+        settings (dict): The settings from config.json.
+        repositories (list[dict]): The repositories to collect.
+        security_index (dict[str, dict]): The visibility and security settings of each repository (empty to use the REST API per repository).
+        write_to_s3 (bool): Whether the shard outputs are written to S3 or locally.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket. Defaults to None.
+        checkpoint (CollectionCheckpoint | None, optional): When given, repositories already in the checkpoint are not
+            sharded, each shard's records are added to the checkpoint as it completes, and no more shards are started
+            once the checkpoint's deadline passes. The workers stop at the same deadline. Defaults to None.
+
+    Raises:
+        Exception: If the lambda shard runner is used outside of AWS Lambda.
+        Exception: If any shard failed, once the other shards have finished (and been added to the checkpoint).
+
+    Returns:
+        list[dict] | None: The repository records, in the same order as the repositories, or None if the deadline passed before every shard was collected.
+    """
+
+    shard_size = get_dict_value(settings, "shard_size")
+    shard_runner = get_dict_value(settings, "shard_runner")
+    shard_concurrency = get_dict_value(settings, "shard_concurrency")
+
+    pending = repositories
+
+    if checkpoint is not None:
+        pending = checkpoint.get_pending(repositories)
+
+    shard_run_id = snapshots.create_run_id()
+
+    # Each shard's repositories are written to its input, so the event payloads stay within Lambda's 6 MB limit
+    events = []
+
+    for shard, shard_repositories in enumerate(sharding.split_into_shards(pending, shard_size)):
+        input_key = sharding.get_shard_input_key(shard_run_id, shard)
+
+        save_information(logger, write_to_s3, input_key, sharding.build_shard_input(shard_repositories, security_index), s3, bucket_name, "ndjson")
+
+        events.append(sharding.build_worker_event(shard_run_id, shard, shard_repositories, input_key, checkpoint.deadline if checkpoint is not None else None))
+
+    lambda_client = None
+    function_name = None
+
+    if shard_runner == "lambda":
+        if context is None:
+            raise Exception("The lambda shard runner can only be used on AWS Lambda. Use the process_pool shard runner locally.")
+
+        # Workers can run for as long as the Lambda timeout, so the client must wait for them
+        # Failed invocations are not retried by the client, as the worker may have already collected the shard
+        lambda_client = session.client("lambda", config=Config(read_timeout=sharding.LAMBDA_READ_TIMEOUT, retries={"max_attempts": 0}))
+        function_name = context.function_name
+
+    collected = []
+    keys = [event["input_key"] for event in events]
+
+    # When checkpointing, no more shards are started once the deadline passes, and the workers stop at the same deadline
+    should_stop = checkpoint.is_out_of_time if checkpoint is not None else None
+
+    shards_collected = 0
+    failed_shards = []
+
+    try:
+        for result in sharding.run_shards(logger, shard_runner, events, shard_concurrency, lambda_client, function_name, should_stop):
+            if "error" in result:
+                failed_shards.append(result["shard"])
+                continue
+
+            shard_records = load_shard_records(write_to_s3, result["key"], s3, bucket_name)
+
+            keys.append(result["key"])
+
+            if result["complete"]:
+                shards_collected += 1
+
+            if checkpoint is not None:
+                checkpoint.add_records(shard_records)
+            else:
+                collected.extend(shard_records)
+
+    finally:
+        # The shard inputs and outputs are removed even if the coordinator fails, so they are not left behind
+        sharding.remove_shard_outputs(logger, write_to_s3, keys, s3, bucket_name)
+
+    if failed_shards:
+        # The records of the shards which finished are kept, so the next run only collects the failed shards
+        if checkpoint is not None:
+            checkpoint.save()
+
+        raise Exception(f"{len(failed_shards)} of {len(events)} shards failed (shards {sorted(failed_shards)}).")
+
+    if shards_collected < len(events):
+        logger.log_warning(f"Deadline reached with {len(events) - shards_collected} of {len(events)} shards not collected.")
+        return None
+
+    if checkpoint is not None:
+        output = checkpoint.get_records(repositories)
+    else:
+        output = merge_repository_data(repositories, collected, {})
+
+    logger.log_info(f"Merged {len(output)} repositories from {len(events)} shards.")
+
+    return output
+
+
+def run_stage(logger: wrapped_logging, dataset: str, collect: Callable[..., list[dict]], args: tuple, write_to_s3: bool, output_format: str, columnar_output: bool, run_id: str | None, s3: boto3.client = None, bucket_name: str = None) -> tuple[dict, float]:
+    """Collects and publishes a dataset, timing the stage.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        dataset (str): The name of the dataset (dependabot or secret_scanning).
+        collect (Callable[..., list[dict]]): The function which collects the dataset.
+        args (tuple): The arguments for the collect function.
+        write_to_s3 (bool): Whether to write the outputs to S3 or locally.
+        output_format (str): The format to write the JSON output in (json or ndjson).
+        columnar_output (bool): Whether to also write the dataset as a Parquet file.
+        run_id (str | None): The ID of the run to write the outputs under, or None to overwrite the unversioned outputs.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+    Returns:
+        tuple[dict, float]: The dataset's entry in the manifest and the time (in seconds) the stage took.
+    """
+
+    stage_start_time = time.time()
+
+    # Requests made by this stage (and the threads it starts) are attributed to it in the run's metrics
+    metrics.set_stage(dataset)
+
+    logger.log_info(f"Collecting {dataset} data.")
+
+    data = collect(*args)
+
+    logger.log_info(f"Taken {time.time() - stage_start_time} seconds to collect {dataset} data.")
+
+    entry = publish_dataset(logger, write_to_s3, dataset, data, output_format, columnar_output, run_id, s3, bucket_name)
+
+    return entry, time.time() - stage_start_time
+
+
+def report_metrics(logger: wrapped_logging, write_to_s3: bool, run_id: str | None, timings: dict[str, float], namespace: str, s3: boto3.client = None, bucket_name: str = None) -> None:
+    """Saves the run report and emits the run's metrics in CloudWatch Embedded Metric Format.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the report to S3 or locally.
+        run_id (str | None): The ID of the run to write the report under, or None to overwrite the unversioned report.
+        timings (dict[str, float]): The time (in seconds) the run and each stage took.
+        namespace (str): The CloudWatch namespace to publish the metrics under.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+    """
+
+    report = metrics.recorder.build_report(run_id, timings)
+
+    # Endpoints are ordered by the total time spent waiting on them, so the first few are where the run spent its time
+    for endpoint, endpoint_metrics in list(report["endpoints"].items())[:5]:
+        logger.log_info(f"{endpoint}: {endpoint_metrics['calls']} calls, {endpoint_metrics['latency']['total']:.2f} seconds, {endpoint_metrics['latency']['mean']:.3f} seconds on average.")
+
+    logger.log_info(f"Rate limit cost by stage: {report['stages']}")
+
+    key = snapshots.get_run_key(run_id, metrics.REPORT_FILENAME) if run_id else metrics.REPORT_FILENAME
+
+    metrics.save_report(logger, write_to_s3, key, report, s3, bucket_name)
+
+    metrics.recorder.emit_emf(logger, namespace)
+
+
+def save_caches(logger: wrapped_logging, cache: ResponseCache | None, codeowners_cache: CodeownersCache | None) -> None:
+    """Saves the caches used during the run, so they can be used by the next run.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        cache (ResponseCache | None): The response cache, if enabled.
+        codeowners_cache (CodeownersCache | None): The CODEOWNERS cache, if enabled.
+    """
+
+    if cache is not None:
+        cache.save()
+
+        logger.log_info(f"Response cache summary: {cache.summary()}")
+
+    if codeowners_cache is not None:
+        codeowners_cache.save()
+
+        logger.log_info(f"CODEOWNERS cache summary: {codeowners_cache.summary()}")
+
+
+def handler(event, context) -> str | dict: # type: ignore[no-untyped-def]
 
     start_time = time.time()
 
@@ -937,6 +2174,13 @@ def handler(event, context) -> str: # type: ignore[no-untyped-def]
     features = get_dict_value(config, "features")
     settings = get_dict_value(config, "settings")
 
+    # Record per-endpoint request metrics from scratch, as a warm Lambda environment keeps them between runs
+
+    metrics.reset()
+
+    run_metrics = get_dict_value(features, "run_metrics")
+    metrics_namespace = get_dict_value(settings, "metrics_namespace")
+
     # Initialise logging
 
     debug = get_dict_value(features, "show_log_locally")
@@ -973,22 +2217,163 @@ def handler(event, context) -> str: # type: ignore[no-untyped-def]
 
     # Setup API Interfaces (REST and GraphQL)
 
-    token = get_access_token(secret_manager, aws_secret_name, org, app_client_id)
+    ## Installation tokens expire after an hour, so the token is replaced before it expires
+    ## The new token is swapped into the shared interfaces without stopping in-flight workers
+
+    token_refresh_margin = get_dict_value(settings, "token_refresh_margin")
+
+    token_manager = InstallationTokenManager(
+        logger,
+        lambda: get_access_token(secret_manager, aws_secret_name, org, app_client_id),
+        token_refresh_margin,
+    )
+
+    ## Every request goes through a shared rate limit governor
+    ## This paces requests as the REST and GraphQL rate limits drain
+
+    thread_count = get_dict_value(settings, "thread_count")
+    collection_engine = get_dict_value(settings, "collection_engine")
+
+    if collection_engine == "asyncio":
+        max_concurrency = get_dict_value(settings, "async_max_concurrency")
+        graphql_concurrency = get_dict_value(settings, "async_graphql_concurrency")
+
+        governor = RateLimitGovernor(max_concurrency, graphql_concurrency)
+    else:
+        governor = RateLimitGovernor(thread_count, thread_count)
+
+    ## Failed requests are retried with exponential backoff and jitter, honouring Retry-After
+    ## Every retry comes out of a budget shared by the whole run, so a storm of failures cannot use up the Lambda's time
+
+    retry_policy.configure(
+        logger,
+        get_dict_value(settings, "retry_max_attempts"),
+        get_dict_value(settings, "retry_base_delay"),
+        get_dict_value(settings, "retry_max_delay"),
+        get_dict_value(settings, "retry_budget"),
+    )
 
-    ql = github_api_toolkit.github_graphql_interface(token[0])
-    rest = github_api_toolkit.github_interface(token[0])
+    ## When enabled, REST responses are cached with their ETags between runs
+    ## Requests for cached responses are made conditionally, which do not count against the rate limit if unchanged
+
+    write_to_s3 = get_dict_value(features, "write_to_s3")
+    response_cache_enabled = get_dict_value(features, "response_cache")
+
+    cache = None
+
+    if response_cache_enabled:
+        response_cache_directory = get_dict_value(settings, "response_cache_directory")
+        response_cache_s3_key = get_dict_value(settings, "response_cache_s3_key")
+
+        # The cache is only backed by S3 when writing outputs to S3
+        if write_to_s3 and response_cache_s3_key:
+            cache = ResponseCache(logger, response_cache_directory, s3, bucket_name, response_cache_s3_key)
+        else:
+            cache = ResponseCache(logger, response_cache_directory)
+
+        cache.load()
+
+    ## When enabled, CODEOWNERS team members and user emails are resolved once and shared across repositories
+
+    codeowners_cache = None
+
+    if get_dict_value(features, "codeowners_cache"):
+        codeowners_cache_ttl = get_dict_value(settings, "codeowners_cache_ttl")
+        codeowners_cache_directory = get_dict_value(settings, "codeowners_cache_directory")
+        codeowners_cache_s3_key = get_dict_value(settings, "codeowners_cache_s3_key")
+
+        # The cache is only backed by S3 when writing outputs to S3
+        if write_to_s3 and codeowners_cache_s3_key:
+            codeowners_cache = CodeownersCache(logger, codeowners_cache_ttl, codeowners_cache_directory, s3, bucket_name, codeowners_cache_s3_key)
+        else:
+            codeowners_cache = CodeownersCache(logger, codeowners_cache_ttl, codeowners_cache_directory)
+
+        codeowners_cache.load()
+
+    ## Requests are sent over pooled keep-alive connections shared by every thread, so TLS handshakes are not repeated
+    ## The pool holds a connection for every request the governor allows in flight at once, so none are thrown away
+
+    transport = PooledTransport(logger, governor.max_concurrency["rest"] + governor.max_concurrency["graphql"])
+
+    ql = interfaces.graphql_interface(token_manager.token, governor, codeowners_cache, token_manager, transport)
+    rest = interfaces.rest_interface(token_manager.token, governor, cache, token_manager, transport)
 
     logger.log_info("API interfaces created.")
 
+    # Worker invocations collect a single shard of repositories for a coordinator (see sharded_collection), then return
+
+    if event and event.get("mode") == "worker":
+        metrics.set_stage("repositories")
+
+        result = collect_shard(logger, rest, ql, org, settings, features, event, write_to_s3, s3, bucket_name)
+
+        # The caches are only read by workers. Every worker shares the same cache keys, so saving them would overwrite
+        # the other workers' entries (the last worker to finish would win). Only the coordinator saves the caches
+
+        # Each worker emits its own metrics. Only the coordinator writes a run report
+        if run_metrics:
+            metrics.recorder.emit_emf(logger, metrics_namespace)
+
+        return result
+
+    # Get the format to write the outputs in (json or ndjson)
+
+    output_format = get_dict_value(settings, "output_format")
+
+    # When enabled, each dataset is also written as a compressed Parquet file for the dashboard
+
+    columnar_output = get_dict_value(features, "columnar_output")
+
+    # When enabled, each run's outputs are written under runs/<run_id>/ and published by writing manifest.json last
+    # Readers only see a run once its manifest is published, so they never see a mix of old and new outputs
+
+    versioned_output = get_dict_value(features, "versioned_output")
+
+    run_id = None
+    previous_manifest = None
+
+    if versioned_output:
+        run_id = snapshots.create_run_id()
+        previous_manifest = snapshots.load_manifest(logger, write_to_s3, s3, bucket_name)
+
+        logger.log_info(f"Writing outputs for run {run_id}.")
+
+    datasets = {}
+
     # Initialise time variables
 
-    repository_time = 0
-    dependabot_time = 0
-    secret_scanning_time = 0
+    stage_times = {"repositories": 0, "dependabot": 0, "secret_scanning": 0}
 
-    # Get write_to_s3 from the configuration file
+    # Get Dependabot and Secret Scanning Information
+    ## Each only needs a handful of requests and does not depend on the repository list
 
-    write_to_s3 = get_dict_value(features, "write_to_s3")
+    alert_stages = {}
+
+    if get_dict_value(features, "dependabot_collection"):
+        dependabot_thresholds = get_dict_value(settings, "dependabot_thresholds")
+
+        alert_stages["dependabot"] = (get_dependabot_data, (logger, rest, org, dependabot_thresholds))
+    else:
+        logger.log_info("Dependabot collection disabled. Skipping Dependabot data collection.")
+
+    if get_dict_value(features, "secret_scanning_collection"):
+        secret_scanning_threshold = get_dict_value(settings, "secret_scanning_threshold")
+
+        alert_stages["secret_scanning"] = (get_secret_scanning_data, (logger, rest, org, secret_scanning_threshold, thread_count))
+    else:
+        logger.log_info("Secret Scanning collection disabled. Skipping Secret Scanning data collection.")
+
+    ## When enabled, they are collected and published alongside repository collection, rather than waiting behind it
+    ## Every stage shares the same API interfaces, so they share the rate limit governor's concurrency and rate budget
+
+    stage_executor = None
+    stage_futures = {}
+
+    if get_dict_value(features, "concurrent_stages") and alert_stages:
+        stage_executor = ThreadPoolExecutor(max_workers=len(alert_stages), thread_name_prefix="stage")
+
+        for dataset, (collect, args) in alert_stages.items():
+            stage_futures[dataset] = stage_executor.submit(run_stage, logger, dataset, collect, args, write_to_s3, output_format, columnar_output, run_id, s3, bucket_name)
 
 
     # Get a list of non-archived repositories in the organization
@@ -997,103 +2382,211 @@ def handler(event, context) -> str: # type: ignore[no-untyped-def]
     ## This is so alerts for archived repositories are not collected
     ## This also allows information collection to be modular and toggleable through config.json
 
-    repositories, number_of_pages = get_repositories(logger, ql, org)
+    ## When single-pass collection is enabled, the signed commits, external PR and repository contents data
+    ## is collected alongside the repository list, removing the need to request each repository separately
+
+    repository_collection = get_dict_value(features, "repository_collection")
+    single_pass_collection = get_dict_value(features, "single_pass_collection")
+
+    ## When enabled, the repository listing and collected repository records are checkpointed as they are collected
+    ## If the run nears the Lambda timeout, it stops and saves the checkpoint, and the next run resumes from it
+
+    checkpoint = None
+
+    if repository_collection and get_dict_value(features, "checkpointing"):
+        checkpoint_directory = get_dict_value(settings, "checkpoint_directory")
+        checkpoint_s3_key = get_dict_value(settings, "checkpoint_s3_key")
+        checkpoint_interval = get_dict_value(settings, "checkpoint_interval")
+        checkpoint_max_age = get_dict_value(settings, "checkpoint_max_age")
+        checkpoint_time_margin = get_dict_value(settings, "checkpoint_time_margin")
+
+        # The checkpoint is only backed by S3 when writing outputs to S3
+        if write_to_s3 and checkpoint_s3_key:
+            checkpoint = CollectionCheckpoint(logger, org, checkpoint_directory, checkpoint_interval, checkpoint_max_age, s3, bucket_name, checkpoint_s3_key)
+        else:
+            checkpoint = CollectionCheckpoint(logger, org, checkpoint_directory, checkpoint_interval, checkpoint_max_age)
+
+        checkpoint.load()
+
+        # Leave enough time before the Lambda timeout to finish the tasks in progress and save the checkpoint
+        # There is no context (and no timeout) when running locally
+        if context is not None:
+            checkpoint.set_deadline(context.get_remaining_time_in_millis() / 1000, checkpoint_time_margin)
+
+    # Requests made from here on (by this thread and the threads it starts) are attributed to the repository stage
+
+    metrics.set_stage("repositories")
+
+    if repository_collection and single_pass_collection:
+        logger.log_info("Single-pass collection enabled. Collecting remaining data with the repository list.")
+
+        signed_commit_number = get_dict_value(settings, "signed_commit_number")
+        single_pass_page_size = get_dict_value(settings, "single_pass_page_size")
+
+        repositories, number_of_pages = get_repositories_single_pass(logger, ql, org, signed_commit_number, single_pass_page_size, checkpoint)
+
+    else:
+        repositories, number_of_pages = get_repositories(logger, ql, org, checkpoint)
 
 
     # Get Repository Information
     ## Get, Process, and Store Repository Information
 
-    repository_collection = get_dict_value(features, "repository_collection")
-
     if repository_collection:
 
         repository_start_time = time.time()
 
         logger.log_info("Repository collection enabled. Collecting repository data.")
 
-        thread_count = get_dict_value(settings, "thread_count")
         inactivity_threshold = get_dict_value(settings, "inactivity_threshold")
         signed_commit_number = get_dict_value(settings, "signed_commit_number")
+        remaining_data_batch_size = get_dict_value(settings, "remaining_data_batch_size")
+        graphql_branch_protection = get_dict_value(features, "graphql_branch_protection")
 
-        # Get the remaining data for the repositories and format it appropriately
-        repository_data = get_output_data(logger, rest, ql, org, repositories, inactivity_threshold, signed_commit_number, thread_count)
+        # When incremental collection is enabled, only collect repositories which have changed since the last run
+        incremental_collection = get_dict_value(features, "incremental_collection")
 
-        logger.log_info(f"Taken {time.time() - repository_start_time} seconds repository information.")
+        # Get the visibility and security settings of every repository from the organization's repository list
+        # This replaces a REST request per repository for the secret scanning and push protection checks
+        # It is also used to re-evaluate these checks for repositories carried forward by incremental collection
+        security_index = {}
 
-        # Upload Repository Data to S3
+        if get_dict_value(features, "org_security_index") and repositories:
+            security_index = get_security_index(logger, rest, org, thread_count)
 
-        save_information(logger, write_to_s3, "repositories.json", repository_data, s3, bucket_name)
+        repositories_to_collect = repositories
+        carried_forward = {}
 
-        repository_time = time.time() - repository_start_time
+        if incremental_collection:
+            logger.log_info("Incremental collection enabled. Loading the previous repository data.")
 
-    else:
-        logger.log_info("Repository collection disabled. Skipping repository data collection.")
+            previous_filename = "repositories.json"
 
-    # Get Dependabot Information
-    ## Get, Process, and Store Dependabot Information
+            # With versioned output, the previous data is the last run's repositories.json listed in its manifest
+            if previous_manifest and "repositories" in previous_manifest.get("datasets", {}):
+                previous_filename = previous_manifest["datasets"]["repositories"]["key"]
 
-    dependabot_collection = get_dict_value(features, "dependabot_collection")
+            previous_repositories = load_previous_repositories(logger, write_to_s3, previous_filename, s3, bucket_name)
 
-    if dependabot_collection:
+            carry_forward_max_age = get_dict_value(settings, "carry_forward_max_age")
 
-        dependabot_start_time = time.time()
+            repositories_to_collect, carried_forward = split_changed_repositories(logger, repositories, previous_repositories, inactivity_threshold, carry_forward_max_age, security_index)
 
-        logger.log_info("Dependabot collection enabled. Collecting Dependabot data.")
+        # When enabled, the repositories are split into shards which are collected by worker invocations and merged
+        sharded_collection = get_dict_value(features, "sharded_collection")
 
-        # Get Dependabot Thresholds
-        dependabot_thresholds = get_dict_value(settings, "dependabot_thresholds")
+        # Get the remaining data for the repositories and format it appropriately
+        if sharded_collection:
+            logger.log_info("Sharded collection enabled. Collecting repositories using worker invocations.")
 
-        # Get Dependabot Data
+            repository_data = collect_sharded(logger, session, context, settings, repositories_to_collect, security_index, write_to_s3, s3, bucket_name, checkpoint)
 
-        dependabot_data = get_dependabot_data(logger, rest, org, dependabot_thresholds)
+        elif collection_engine == "asyncio":
+            logger.log_info("Using the asyncio collection engine.")
 
-        logger.log_info(f"Taken {time.time() - dependabot_start_time} seconds to collect Dependabot data.")
+            if checkpoint is not None:
+                logger.log_warning("Checkpointing repository records is only supported by the threads collection engine. Only the repository listing is checkpointed.")
 
-        # Upload Dependabot Data to S3
+            # Imported here so aiohttp is only required when the asyncio engine is used
+            import src.async_collection as async_collection
 
-        save_information(logger, write_to_s3, "dependabot.json", dependabot_data, s3, bucket_name)
+            org_members = get_org_members(logger, rest, org, thread_count)
 
-        dependabot_time = time.time() - dependabot_start_time
+            repository_data = asyncio.run(
+                async_collection.get_output_data(logger, token_manager, governor, ql, org, repositories_to_collect, security_index, org_members, inactivity_threshold, signed_commit_number, remaining_data_batch_size, graphql_branch_protection, max_concurrency, graphql_concurrency, thread_count)
+            )
 
-    else:
-        logger.log_info("Dependabot collection disabled. Skipping Dependabot data collection.")
+        elif collection_engine == "threads":
+            repository_data = get_output_data(logger, rest, ql, org, repositories_to_collect, security_index, inactivity_threshold, signed_commit_number, thread_count, remaining_data_batch_size, graphql_branch_protection, checkpoint)
+
+        else:
+            raise Exception(f"Unknown collection engine {collection_engine}. Please check config.json.")
 
-    # Get Secret Scanning Information
-    ## Get, Process, and Store Secret Scanning Information
+        # The deadline passed before every repository was collected, so save the checkpoint for the next run to resume from
+        # repositories.json is not published, so readers keep seeing the last complete repository data
+        if repository_data is None:
+            checkpoint.save()
 
-    secret_scanning_collection = get_dict_value(features, "secret_scanning_collection")
+            logger.log_info(f"Checkpoint summary: {checkpoint.summary()}")
 
-    if secret_scanning_collection:
-        
-        secret_scanning_start_time = time.time()
+            # The concurrent stages have already written their outputs for this run, so wait for them and publish them
+            # Otherwise they would be left unpublished, and collected again by every run until the checkpoint completes
+            # Stages which have not started (without concurrent stages) are left for the run which completes the checkpoint
+            for dataset, future in stage_futures.items():
+                datasets[dataset], stage_times[dataset] = future.result()
 
-        logger.log_info("Secret Scanning collection enabled. Collecting Secret Scanning data.")
+            if stage_executor is not None:
+                stage_executor.shutdown()
 
-        # Get Secret Scanning Threshold
+            # The manifest carries the last published repository data forward, alongside the new alert data
+            if versioned_output and datasets:
+                manifest = snapshots.build_manifest(run_id, datasets, {"total": time.time() - start_time, **stage_times}, previous_manifest)
 
-        secret_scanning_threshold = get_dict_value(settings, "secret_scanning_threshold")
+                snapshots.publish_manifest(logger, write_to_s3, manifest, s3, bucket_name)
+
+            save_caches(logger, cache, codeowners_cache)
 
-        # Get Secret Scanning Data
+            if run_metrics:
+                metrics.recorder.emit_emf(logger, metrics_namespace)
 
-        secret_scanning_data = get_secret_scanning_data(logger, rest, org, secret_scanning_threshold)
+            return f"Script stopped after {time.time() - start_time} seconds to avoid the timeout. Collection will resume from the checkpoint."
 
-        logger.log_info(f"Taken {time.time() - secret_scanning_start_time} seconds to collect Secret Scanning data.")
+        if incremental_collection:
+            repository_data = merge_repository_data(repositories, repository_data, carried_forward)
 
-        # Upload Secret Scanning Data to S3
+        logger.log_info(f"Taken {time.time() - repository_start_time} seconds repository information.")
+
+        # Upload Repository Data to S3
 
-        save_information(logger, write_to_s3, "secret_scanning.json", secret_scanning_data, s3, bucket_name)
+        datasets["repositories"] = publish_dataset(logger, write_to_s3, "repositories", repository_data, output_format, columnar_output, run_id, s3, bucket_name)
 
-        secret_scanning_time = time.time() - secret_scanning_start_time
+        stage_times["repositories"] = time.time() - repository_start_time
 
     else:
-        logger.log_info("Secret Scanning collection disabled. Skipping Secret Scanning data collection.")
+        logger.log_info("Repository collection disabled. Skipping repository data collection.")
+
+    # Wait for the Dependabot and Secret Scanning stages to finish
+    # Without concurrent stages, they run now, one after another
+
+    for dataset, (collect, args) in alert_stages.items():
+        if dataset in stage_futures:
+            datasets[dataset], stage_times[dataset] = stage_futures[dataset].result()
+        else:
+            datasets[dataset], stage_times[dataset] = run_stage(logger, dataset, collect, args, write_to_s3, output_format, columnar_output, run_id, s3, bucket_name)
+
+    if stage_executor is not None:
+        stage_executor.shutdown()
 
     end_time = time.time()
 
     logger.log_info(f"Script took {end_time - start_time} seconds to run.")
-    logger.log_info(f"Repository collection took {repository_time} seconds.")
-    logger.log_info(f"Dependabot collection took {dependabot_time} seconds.")
-    logger.log_info(f"Secret Scanning collection took {secret_scanning_time} seconds.")
+    logger.log_info(f"Repository collection took {stage_times['repositories']} seconds.")
+    logger.log_info(f"Dependabot collection took {stage_times['dependabot']} seconds.")
+    logger.log_info(f"Secret Scanning collection took {stage_times['secret_scanning']} seconds.")
+    logger.log_info(f"Rate limit governor summary: {governor.summary()}")
+    logger.log_info(f"Retry policy summary: {retry_policy.policy.summary()}")
+    logger.log_info(f"Installation token summary: {token_manager.summary()}")
+    logger.log_info(f"HTTP transport summary: {transport.summary()}")
+
+    timings = {"total": end_time - start_time, **stage_times}
+
+    # The report is written before the manifest, so it is part of the run when the run is published
+    if run_metrics:
+        report_metrics(logger, write_to_s3, run_id, timings, metrics_namespace, s3, bucket_name)
+
+    # Publish the manifest last, so the run's outputs are only used once they have all been written
+    if versioned_output:
+        manifest = snapshots.build_manifest(run_id, datasets, timings, previous_manifest)
+
+        snapshots.publish_manifest(logger, write_to_s3, manifest, s3, bucket_name)
+
+    # The run has been published, so the next run starts from the beginning
+    if checkpoint is not None:
+        logger.log_info(f"Checkpoint summary: {checkpoint.summary()}")
+
+        checkpoint.clear()
+
+    save_caches(logger, cache, codeowners_cache)
 
     return f"Script ran successfully in {end_time - start_time} seconds."
 
@@ -0,0 +1,384 @@
+"""A python module to record per-endpoint request metrics and publish them as a run report and in CloudWatch Embedded Metric Format."""
+
+import bisect
+import contextvars
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import boto3
+
+from src.logger import wrapped_logging
+
+REPORT_FILENAME = "run_report.json"
+
+LOCAL_OUTPUT_DIRECTORY = "./output"
+
+# The upper bounds (in seconds) of the latency histogram buckets. Slower requests go in a final overflow bucket
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# The number of latencies sampled for each endpoint. CloudWatch accepts up to 100 values for a metric in one log event
+LATENCY_SAMPLE_SIZE = 100
+
+# Path segments followed by identifiers, and the number of identifiers which follow them
+PATH_IDENTIFIERS = {
+    "repos": 2,
+    "orgs": 1,
+    "organizations": 1,
+    "users": 1,
+    "teams": 1,
+}
+
+# The stage requests are attributed to, set by the thread (or asyncio task) making them
+_stage = contextvars.ContextVar("stage", default="setup")
+
+# The endpoint of the last request made by the current thread (or asyncio task), so retries can be attributed to it
+_endpoint = contextvars.ContextVar("endpoint", default=None)
+
+
+def set_stage(stage: str) -> None:
+    """Attributes the requests made by the current thread (and the threads it starts) to a stage.
+
+    Args:
+        stage (str): The name of the stage (i.e. repositories, dependabot or secret_scanning).
+    """
+    _stage.set(stage)
+
+
+def get_endpoint_name(method: str, url: str) -> str:
+    """Gets the name of a REST endpoint, with identifiers replaced by placeholders.
+
+    For example, GET https://api.github.com/repos/ONSdigital/example/branches?page=2 is named GET /repos/{}/{}/branches.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The URL or path of the request.
+
+    Returns:
+        str: The name of the endpoint.
+    """
+
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+
+    templated = []
+    index = 0
+
+    while index < len(segments):
+        segment = segments[index]
+
+        templated.append(segment)
+        index += 1
+
+        if segment in PATH_IDENTIFIERS:
+            identifiers = min(PATH_IDENTIFIERS[segment], len(segments) - index)
+
+            templated.extend(["{}"] * identifiers)
+            index += identifiers
+
+        # File paths can be any length
+        elif segment == "contents" and index < len(segments):
+            templated.append("{path}")
+            break
+
+        elif index < len(segments) and segments[index].isdigit():
+            templated.append("{}")
+            index += 1
+
+    return f"{method} /{'/'.join(templated)}"
+
+
+def get_operation_name(query: str) -> str:
+    """Gets the name of a GraphQL operation.
+
+    Named operations (i.e. query RepositoryPage(...)) use their name. Anonymous operations are named after
+    their first top-level fields (i.e. organization.team).
+
+    Args:
+        query (str): The GraphQL query.
+
+    Returns:
+        str: The name of the operation.
+    """
+
+    match = re.match(r"\s*(?:query|mutation)\s+(\w+)", query)
+
+    if match:
+        return f"graphql {match.group(1)}"
+
+    body = query[query.find("{") + 1:]
+
+    fields = [field for field in re.findall(r"(\w+)\s*(?:\([^)]*\))?\s*\{", body) if field != "rateLimit"]
+
+    return f"graphql {'.'.join(fields[:2]) or 'anonymous'}"
+
+
+class RunMetrics:
+    def __init__(self) -> None:
+        """Records the requests made to the GitHub API during a run.
+
+        For each REST endpoint or GraphQL operation, it records the number of calls, errors and retries,
+        a histogram and sample of latencies, the bytes received and the rate limit cost.
+        For each stage, it records the rate limit cost of the requests made by that stage.
+
+        Requests can be recorded from several threads (and asyncio tasks) at once.
+        """
+        self.started_at = time.time()
+
+        self.endpoints = {}
+        self.stages = {}
+
+        self._lock = threading.Lock()
+
+    def _new_endpoint(self) -> dict[str, Any]:
+        """Builds the metrics of an endpoint which has not been requested yet.
+
+        Returns:
+            dict[str, Any]: The empty endpoint metrics.
+        """
+        return {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "bytes": 0,
+            "cost": 0,
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+            "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+            "samples": [],
+        }
+
+    def record_request(self, endpoint: str, resource: str, latency: float, status_code: int | None, bytes_received: int, graphql_cost: int | None = None) -> None:
+        """Records a request against its endpoint and the current stage.
+
+        REST requests cost one request from the rate limit, except conditional requests which were not modified (304).
+        GraphQL requests cost the points reported in the query's rateLimit, or one point if not reported.
+
+        Args:
+            endpoint (str): The name of the endpoint (from get_endpoint_name() or get_operation_name()).
+            resource (str): The API resource (rest or graphql).
+            latency (float): The time (in seconds) the request took.
+            status_code (int | None): The status code of the response, or None if the request did not get a response.
+            bytes_received (int): The size of the response body.
+            graphql_cost (int | None, optional): The cost of a GraphQL query, if reported. Defaults to None.
+        """
+        _endpoint.set(endpoint)
+
+        stage = _stage.get()
+
+        if status_code is None:
+            cost = 0
+        elif resource == "graphql":
+            cost = graphql_cost if graphql_cost is not None else 1
+        else:
+            cost = 0 if status_code == 304 else 1
+
+        with self._lock:
+            metrics = self.endpoints.setdefault(endpoint, self._new_endpoint())
+
+            metrics["calls"] += 1
+            metrics["bytes"] += bytes_received
+            metrics["cost"] += cost
+
+            if status_code is None or status_code >= 400:
+                metrics["errors"] += 1
+
+            metrics["latency_total"] += latency
+            metrics["latency_max"] = max(metrics["latency_max"], latency)
+            metrics["histogram"][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+            # Reservoir sampling keeps an even sample of latencies however many calls are made
+            if len(metrics["samples"]) < LATENCY_SAMPLE_SIZE:
+                metrics["samples"].append(latency)
+            else:
+                index = random.randrange(metrics["calls"])
+
+                if index < LATENCY_SAMPLE_SIZE:
+                    metrics["samples"][index] = latency
+
+            stage_metrics = self.stages.setdefault(stage, {"rest_requests": 0, "rest_cost": 0, "graphql_requests": 0, "graphql_cost": 0})
+
+            stage_metrics[f"{resource}_requests"] += 1
+            stage_metrics[f"{resource}_cost"] += cost
+
+    def record_retry(self) -> None:
+        """Records a retry against the endpoint of the last request made by the current thread (or asyncio task)."""
+        endpoint = _endpoint.get() or "unknown"
+
+        with self._lock:
+            self.endpoints.setdefault(endpoint, self._new_endpoint())["retries"] += 1
+
+    def build_report(self, run_id: str | None, timings: dict[str, float]) -> dict[str, Any]:
+        """Builds the run report.
+
+        Args:
+            run_id (str | None): The ID of the run, if outputs are versioned.
+            timings (dict[str, float]): The time (in seconds) the run and each stage took.
+
+        Returns:
+            dict[str, Any]: The run report.
+        """
+
+        bucket_names = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["le_inf"]
+
+        with self._lock:
+            endpoints = {}
+
+            for endpoint, metrics in sorted(self.endpoints.items(), key=lambda item: item[1]["latency_total"], reverse=True):
+                calls = metrics["calls"]
+
+                endpoints[endpoint] = {
+                    "calls": calls,
+                    "errors": metrics["errors"],
+                    "retries": metrics["retries"],
+                    "bytes": metrics["bytes"],
+                    "cost": metrics["cost"],
+                    "latency": {
+                        "total": metrics["latency_total"],
+                        "mean": metrics["latency_total"] / calls if calls else 0.0,
+                        "max": metrics["latency_max"],
+                        "histogram": dict(zip(bucket_names, metrics["histogram"])),
+                    },
+                }
+
+            stages = {stage: dict(metrics) for stage, metrics in self.stages.items()}
+
+        return {
+            "run_id": run_id,
+            "started_at": self.started_at,
+            "timings": timings,
+            "endpoints": endpoints,
+            "stages": stages,
+        }
+
+    def build_emf_events(self, namespace: str) -> list[dict[str, Any]]:
+        """Builds a CloudWatch Embedded Metric Format (EMF) event for each endpoint and stage.
+
+        When written to a Lambda's logs, CloudWatch extracts the metrics from these events.
+
+        Args:
+            namespace (str): The CloudWatch namespace to publish the metrics under.
+
+        Returns:
+            list[dict[str, Any]]: The EMF events.
+        """
+
+        timestamp = int(time.time() * 1000)
+
+        events = []
+
+        with self._lock:
+            for endpoint, metrics in self.endpoints.items():
+                events.append({
+                    "_aws": {
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [{
+                            "Namespace": namespace,
+                            "Dimensions": [["Endpoint"]],
+                            "Metrics": [
+                                {"Name": "Calls", "Unit": "Count"},
+                                {"Name": "Errors", "Unit": "Count"},
+                                {"Name": "Retries", "Unit": "Count"},
+                                {"Name": "BytesReceived", "Unit": "Bytes"},
+                                {"Name": "Cost", "Unit": "Count"},
+                                {"Name": "Latency", "Unit": "Milliseconds"},
+                            ],
+                        }],
+                    },
+                    "Endpoint": endpoint,
+                    "Calls": metrics["calls"],
+                    "Errors": metrics["errors"],
+                    "Retries": metrics["retries"],
+                    "BytesReceived": metrics["bytes"],
+                    "Cost": metrics["cost"],
+                    "Latency": [round(latency * 1000, 3) for latency in metrics["samples"]],
+                })
+
+            for stage, metrics in self.stages.items():
+                events.append({
+                    "_aws": {
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [{
+                            "Namespace": namespace,
+                            "Dimensions": [["Stage"]],
+                            "Metrics": [
+                                {"Name": "RestRequests", "Unit": "Count"},
+                                {"Name": "RestCost", "Unit": "Count"},
+                                {"Name": "GraphQLRequests", "Unit": "Count"},
+                                {"Name": "GraphQLCost", "Unit": "Count"},
+                            ],
+                        }],
+                    },
+                    "Stage": stage,
+                    "RestRequests": metrics["rest_requests"],
+                    "RestCost": metrics["rest_cost"],
+                    "GraphQLRequests": metrics["graphql_requests"],
+                    "GraphQLCost": metrics["graphql_cost"],
+                })
+
+        return events
+
+    def emit_emf(self, logger: wrapped_logging, namespace: str) -> None:
+        """Writes the EMF events to stdout, which Lambda sends to CloudWatch Logs.
+
+        The events are printed rather than logged, as CloudWatch only extracts metrics from log events which are plain JSON.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            namespace (str): The CloudWatch namespace to publish the metrics under.
+        """
+
+        events = self.build_emf_events(namespace)
+
+        for event in events:
+            print(json.dumps(event), flush=True)
+
+        logger.log_info(f"Emitted {len(events)} CloudWatch metric events under {namespace}.")
+
+
+def save_report(logger: wrapped_logging, write_to_s3: bool, key: str, report: dict, s3: boto3.client = None, bucket_name: str = None) -> None:
+    """Saves the run report.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the report to S3 or locally.
+        key (str): The key (or local path, relative to ./output) to write the report to.
+        report (dict): The run report.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+    """
+
+    contents = json.dumps(report, indent=4)
+
+    if write_to_s3:
+        s3.put_object(Bucket=bucket_name, Key=key, Body=contents, ContentType="application/json")
+    else:
+        path = os.path.join(LOCAL_OUTPUT_DIRECTORY, key)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as f:
+            f.write(contents)
+
+    logger.log_info(f"Saved run report to {key}.")
+
+
+# The metrics shared by the whole run. Replaced by reset() at the start of each run
+recorder = RunMetrics()
+
+
+def reset() -> RunMetrics:
+    """Replaces the shared metrics, so a warm Lambda environment does not carry metrics over from its last run.
+
+    Returns:
+        RunMetrics: The new shared metrics.
+    """
+    global recorder
+
+    recorder = RunMetrics()
+
+    return recorder
@@ -0,0 +1,237 @@
+"""A python module to stream output records to a local file or S3 without building the whole file in memory."""
+
+import io
+import json
+import os
+import threading
+from typing import Any, Iterable
+
+import boto3
+
+from src.logger import wrapped_logging
+
+# The formats records can be written in
+OUTPUT_FORMATS = ["json", "ndjson"]
+
+# S3 requires every part of a multipart upload, except the last, to be at least 5 MiB
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+LOCAL_OUTPUT_DIRECTORY = "./output"
+
+
+class OutputWriter:
+    def __init__(self, logger: wrapped_logging, write_to_s3: bool, filename: str, output_format: str = "json", indent: int | None = None, s3: boto3.client = None, bucket_name: str = None) -> None:
+        """Writes records to an output file one at a time, as either a JSON array or newline delimited JSON (NDJSON).
+
+        Each record is serialised as it is written. Locally, it is written straight to the file.
+        For S3, records are buffered until there is enough for a part of a multipart upload, so only one part is held
+        in memory at a time. Outputs smaller than a single part are uploaded with a single put_object instead.
+
+        Records can be written from several threads at once.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            write_to_s3 (bool): Whether to write the output to S3 or locally.
+            filename (str): The name of the file (or S3 key) to write to.
+            output_format (str, optional): The format to write (json or ndjson). Defaults to "json".
+            indent (int | None, optional): The indentation of each record (json only). Defaults to None (compact).
+            s3 (boto3.client, optional): The S3 Client. Defaults to None.
+            bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+
+        Raises:
+            Exception: If the output format is not supported.
+            Exception: If the S3 client and bucket name are not provided when writing to S3.
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise Exception(f"Unknown output format {output_format}. Please check config.json.")
+
+        if write_to_s3 and (not s3 or not bucket_name):
+            raise Exception("S3 client and bucket name required to write to S3.")
+
+        self.logger = logger
+        self.write_to_s3 = write_to_s3
+        self.filename = filename
+        self.output_format = output_format
+        self.indent = indent if output_format == "json" else None
+
+        self.s3 = s3
+        self.bucket_name = bucket_name
+
+        self.record_count = 0
+        self.bytes_written = 0
+
+        # The ETag of the uploaded object (S3 only), available once the writer is closed
+        self.etag = None
+
+        self._lock = threading.Lock()
+
+        self._file = None
+        self._buffer = io.BytesIO()
+        self._upload_id = None
+        self._parts = []
+
+        self._closed = False
+
+    def __enter__(self) -> "OutputWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self) -> None:
+        """Opens the output and writes the start of the JSON array (json only)."""
+        if not self.write_to_s3:
+            path = os.path.join(LOCAL_OUTPUT_DIRECTORY, self.filename)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            self._file = open(path, "wb")
+
+        if self.output_format == "json":
+            self._write_chunk("[")
+
+    def write(self, record: Any) -> None:
+        """Serialises and writes a single record.
+
+        Args:
+            record (Any): The record to write (must be JSON serialisable).
+        """
+        serialised = json.dumps(record, indent=self.indent)
+
+        with self._lock:
+            if self.output_format == "json":
+                separator = "," if self.record_count else ""
+
+                if self.indent is not None:
+                    serialised = "\n" + serialised
+
+                self._write_chunk(separator + serialised)
+            else:
+                self._write_chunk(serialised + "\n")
+
+            self.record_count += 1
+
+    def write_many(self, records: Iterable[Any]) -> None:
+        """Serialises and writes each record from an iterable, one at a time.
+
+        Args:
+            records (Iterable[Any]): The records to write.
+        """
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        """Writes the end of the JSON array (json only) and completes the file or upload."""
+        with self._lock:
+            if self._closed:
+                return
+
+            if self.output_format == "json":
+                self._write_chunk("\n]" if self.indent is not None and self.record_count else "]")
+
+            if self.write_to_s3:
+                self._complete_upload()
+            else:
+                self._file.close()
+
+            self._closed = True
+
+        location = "uploaded to S3" if self.write_to_s3 else "written locally"
+
+        self.logger.log_info(f"{self.filename} {location} ({self.record_count} records, {self.bytes_written} bytes).")
+
+    def abort(self) -> None:
+        """Abandons the output, aborting any multipart upload so no partial file is published."""
+        with self._lock:
+            if self._closed:
+                return
+
+            if self._upload_id is not None:
+                self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=self.filename, UploadId=self._upload_id)
+
+            if self._file is not None:
+                self._file.close()
+
+            self._closed = True
+
+        self.logger.log_warning(f"Writing {self.filename} was aborted.")
+
+    def _write_chunk(self, chunk: str) -> None:
+        """Writes a chunk of serialised output. Must be called with the lock held.
+
+        Args:
+            chunk (str): The chunk to write.
+        """
+        data = chunk.encode("utf-8")
+
+        self.bytes_written += len(data)
+
+        if not self.write_to_s3:
+            self._file.write(data)
+            return
+
+        self._buffer.write(data)
+
+        if self._buffer.tell() >= MULTIPART_PART_SIZE:
+            self._upload_part()
+
+    def _upload_part(self) -> None:
+        """Uploads the buffer as the next part of the multipart upload. Must be called with the lock held."""
+        if self._upload_id is None:
+            response = self.s3.create_multipart_upload(Bucket=self.bucket_name, Key=self.filename)
+
+            self._upload_id = response["UploadId"]
+
+        part_number = len(self._parts) + 1
+
+        response = self.s3.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.filename,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=self._buffer.getvalue(),
+        )
+
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+        self._buffer = io.BytesIO()
+
+    def _complete_upload(self) -> None:
+        """Uploads the remaining buffer and completes the upload. Must be called with the lock held."""
+        # Small outputs never started a multipart upload, so are uploaded in one request
+        if self._upload_id is None:
+            response = self.s3.put_object(Bucket=self.bucket_name, Key=self.filename, Body=self._buffer.getvalue())
+
+            self.etag = response["ETag"]
+            return
+
+        if self._buffer.tell():
+            self._upload_part()
+
+        response = self.s3.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.filename,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+        self.etag = response["ETag"]
+
+
+def read_records(contents: str) -> list:
+    """Reads the records from an output file, in either format.
+
+    Args:
+        contents (str): The contents of the file.
+
+    Returns:
+        list: The records.
+    """
+    if contents.lstrip().startswith("["):
+        return json.loads(contents)
+
+    return [json.loads(line) for line in contents.splitlines() if line.strip()]
@@ -0,0 +1,120 @@
+"""A python module to concurrently paginate GitHub REST API endpoints which use page numbers."""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+import github_api_toolkit
+from requests import Response
+
+
+def get_last_page(response: Response) -> int:
+    """Gets the number of the last page from the Link header of a response.
+
+    Args:
+        response (Response): The response for the first page.
+
+    Returns:
+        int: The number of the last page (1 if there is only one page).
+    """
+
+    try:
+        return int(parse_qs(urlparse(response.links["last"]["url"]).query)["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return 1
+
+
+def get_page(rest: github_api_toolkit.github_interface, url: str, params: dict, page: int) -> list | dict:
+    """Gets a single page of a paginated endpoint.
+
+    Args:
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        url (str): The endpoint to request.
+        params (dict): The query parameters (excluding page).
+        page (int): The page number to get.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
+
+    Returns:
+        list | dict: The JSON of the page.
+    """
+
+    response = rest.get(url, params={**params, "page": page})
+
+    if type(response) is not Response:
+        raise Exception(response)
+
+    return response.json()
+
+
+def get_pages(rest: github_api_toolkit.github_interface, url: str, params: dict, max_workers: int, stats: dict | None = None) -> Iterator[list | dict]:
+    """Gets every page of a paginated endpoint, yielding each page's JSON in page order.
+
+    The first page is requested on its own to find the number of pages, and is then reused rather than requested again.
+    The remaining pages are requested concurrently, with at most max_workers requests in flight at once.
+    Each page is yielded as soon as it and the pages before it have arrived.
+    If the caller stops iterating early, any pages which have not been requested yet are skipped.
+
+    Args:
+        rest (github_api_toolkit.github_interface): The REST interface for the GitHub API.
+        url (str): The endpoint to request.
+        params (dict): The query parameters (excluding page).
+        max_workers (int): The maximum number of pages to request at once.
+        stats (dict | None, optional): A dictionary which is updated with the total number of pages ("pages"),
+            the number of pages requested ("requested") and the number of pages yielded ("yielded"). Defaults to None.
+
+    Raises:
+        Exception: If the response from the GitHub API is not a Response object (Request failed).
+
+    Yields:
+        list | dict: The JSON of each page.
+    """
+
+    response = rest.get(url, params={**params, "page": 1})
+
+    if type(response) is not Response:
+        raise Exception(response)
+
+    last_page = get_last_page(response)
+
+    if stats is None:
+        stats = {}
+
+    stats["pages"] = last_page
+    stats["requested"] = 1
+    stats["yielded"] = 1
+
+    yield response.json()
+
+    if last_page == 1:
+        return
+
+    max_workers = max(1, max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+
+        next_page = 2
+
+        # Keep up to max_workers pages in flight ahead of the page being yielded
+        for page in range(2, last_page + 1):
+            while next_page <= last_page and next_page < page + max_workers:
+                # Each page runs in a copy of the current context, so its request is attributed to the current stage
+                futures[next_page] = executor.submit(contextvars.copy_context().run, get_page, rest, url, params, next_page)
+                stats["requested"] += 1
+                next_page += 1
+
+            try:
+                page_json = futures.pop(page).result()
+
+                stats["yielded"] += 1
+
+                yield page_json
+            except BaseException:
+                # Pages which have not started are cancelled, so are not requested
+                for future in futures.values():
+                    if future.cancel():
+                        stats["requested"] -= 1
+                raise
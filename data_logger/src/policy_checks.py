@@ -1,8 +1,57 @@
 """A list of policy related checks for the data logger."""
 
 import datetime
+import re
 from dateutil.relativedelta import relativedelta
 
+# The format of GitHub's timestamps. Timestamps in this format sort in the same order as the times they represent.
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Names which only contain lowercase ASCII letters, numbers, underscores and hyphens follow the naming convention
+NAMING_CONVENTION = re.compile(r"[a-z0-9_-]*")
+
+# The files required in the root of a repository, keyed by their check
+REQUIRED_FILES = {
+    "readme_missing": "README.md",
+    "license_missing": "LICENSE",
+    "pirr_missing": "PIRR.md",
+    "gitignore_missing": ".gitignore",
+}
+
+# The facts about each repository which evaluate_batch() expects, as columns of equal length
+FACT_COLUMNS = [
+    "name",
+    "visibility",
+    "pushed_at",
+    "commits",
+    "pull_requests",
+    "contents",
+    "branch_protection",
+    "secret_scanning",
+    "push_protection",
+    "dependabot_enabled",
+    "codeowners_missing",
+    "point_of_contact_missing",
+]
+
+# The checks produced by evaluate_batch(), in the order they appear in repositories.json
+CHECKS = [
+    "inactive",
+    "unprotected_branches",
+    "unsigned_commits",
+    "readme_missing",
+    "license_missing",
+    "pirr_missing",
+    "gitignore_missing",
+    "external_pr",
+    "breaks_naming_convention",
+    "secret_scanning_disabled",
+    "push_protection_disabled",
+    "dependabot_disabled",
+    "codeowners_missing",
+    "point_of_contact_missing",
+]
+
 def is_inactive(last_update: str, threshold: int) -> bool:
     """Check if the last update is older than the threshold.
 
@@ -102,4 +151,121 @@ def breaks_naming_convention(name: str) -> bool:
         if not (character.isnumeric() or character.isalpha() or character in ["_", "-"]) or character.isupper():
             return True
         
-    return False
\ No newline at end of file
+    return False
+
+
+def get_inactivity_cutoff(threshold: int, today: datetime.datetime = None) -> str:
+    """Gets the timestamp before which a repository is considered inactive.
+
+    The cutoff is rounded up to the next whole second, as GitHub's timestamps do not include fractions of a second.
+    This means a timestamp can be compared to the cutoff as a string, with the same result as is_inactive().
+
+    Args:
+        threshold (int): The number of years to check against.
+        today (datetime.datetime, optional): The current time. Defaults to None (datetime.datetime.today()).
+
+    Returns:
+        str: The cutoff, in TIMESTAMP_FORMAT.
+    """
+
+    if today is None:
+        today = datetime.datetime.today()
+
+    cutoff = today - relativedelta(years=threshold)
+
+    if cutoff.microsecond:
+        cutoff = cutoff.replace(microsecond=0) + datetime.timedelta(seconds=1)
+
+    return cutoff.strftime(TIMESTAMP_FORMAT)
+
+
+def name_breaks_naming_convention(name: str) -> bool:
+    """Check if the name breaks the naming convention, using a compiled pattern for ASCII names.
+
+    Names containing other characters are checked with breaks_naming_convention(), so that the result is the same.
+
+    Args:
+        name (str): The name to check.
+
+    Returns:
+        bool: True if the name breaks the naming convention, False otherwise.
+    """
+
+    if name.isascii():
+        return NAMING_CONVENTION.fullmatch(name) is None
+
+    return breaks_naming_convention(name)
+
+
+def evaluate_batch(facts: dict[str, list], org_members: list[str], inactivity_threshold: int, today: datetime.datetime = None) -> dict[str, list[bool]]:
+    """Evaluates every policy check for a batch of repositories in a single pass.
+
+    Anything shared between repositories (the inactivity cutoff and the set of organization members) is prepared once
+    for the whole batch, rather than once per repository. The results are the same as the individual checks above.
+
+    Args:
+        facts (dict[str, list]): The facts about each repository, with a column (list) for each of FACT_COLUMNS.
+        org_members (list[str]): The members of the GitHub organization.
+        inactivity_threshold (int): The number of years after which a repository is considered inactive.
+        today (datetime.datetime, optional): The current time. Defaults to None (datetime.datetime.today()).
+
+    Raises:
+        Exception: If a fact column is missing or the columns are not the same length.
+
+    Returns:
+        dict[str, list[bool]]: A column of results for each of CHECKS, in the same order as the facts.
+    """
+
+    missing_columns = [column for column in FACT_COLUMNS if column not in facts]
+
+    if missing_columns:
+        raise Exception(f"Policy check facts are missing the columns: {', '.join(missing_columns)}.")
+
+    length = len(facts["name"])
+
+    if any(len(facts[column]) != length for column in FACT_COLUMNS):
+        raise Exception("Policy check fact columns must all be the same length.")
+
+    cutoff = get_inactivity_cutoff(inactivity_threshold, today)
+
+    # Dependabot PRs are not considered external, so it is treated as a member
+    members = set(org_members)
+    members.add("dependabot")
+
+    results = {check: [] for check in CHECKS}
+
+    for i in range(length):
+        visibility = facts["visibility"][i]
+
+        file_names = {file["name"] for file in facts["contents"][i]}
+
+        results["inactive"].append(facts["pushed_at"][i] < cutoff)
+        results["unprotected_branches"].append(not facts["branch_protection"][i])
+        results["unsigned_commits"].append(any(commit["signature"] is None for commit in facts["commits"][i]))
+
+        for check, filename in REQUIRED_FILES.items():
+            results[check].append(filename not in file_names)
+
+        # If the repository is public, the PIRR.md file is not required
+        # If the repository is private, the LICENSE file is not required
+        if visibility == "PUBLIC":
+            results["pirr_missing"][-1] = False
+        else:
+            results["license_missing"][-1] = False
+
+        # PRs without an author (or login) are from deleted accounts and are not considered external
+        results["external_pr"].append(
+            any(
+                (pr.get("author") or {}).get("login") and pr["author"]["login"] not in members
+                for pr in facts["pull_requests"][i]
+            )
+        )
+
+        results["breaks_naming_convention"].append(name_breaks_naming_convention(facts["name"][i]))
+        results["secret_scanning_disabled"].append(not facts["secret_scanning"][i])
+        results["push_protection_disabled"].append(not facts["push_protection"][i])
+        results["dependabot_disabled"].append(not facts["dependabot_enabled"][i])
+        results["codeowners_missing"].append(facts["codeowners_missing"][i])
+        results["point_of_contact_missing"].append(facts["point_of_contact_missing"][i])
+
+    return results
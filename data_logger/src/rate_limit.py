@@ -0,0 +1,252 @@
+"""A python module to pace requests to the GitHub API based on the remaining rate limit."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Mapping
+
+# Once less than this proportion of a budget remains, concurrency is reduced in proportion to what is left
+SLOWDOWN_RATIO = 0.2
+
+# The wait (in seconds) after a secondary rate limit when GitHub does not send a Retry-After header
+DEFAULT_SECONDARY_WAIT = 60
+
+# How much of the lost concurrency is recovered after each successful response
+RECOVERY_STEP = 0.05
+
+# How often (in seconds) to check for a free request slot
+SLOT_POLL_INTERVAL = 0.05
+
+
+def is_secondary_rate_limit(status_code: int, headers: Mapping[str, str], body: str = "") -> bool:
+    """Checks whether a response is a secondary rate limit response.
+
+    Args:
+        status_code (int): The HTTP status code of the response.
+        headers (Mapping[str, str]): The headers of the response.
+        body (str, optional): The body of the response. Defaults to "".
+
+    Returns:
+        bool: True if the response is a secondary rate limit, False otherwise.
+    """
+
+    if status_code not in (403, 429):
+        return False
+
+    if headers.get("Retry-After") is not None:
+        return True
+
+    return "secondary rate limit" in body.lower()
+
+
+class RateLimitGovernor:
+    def __init__(self, rest_concurrency: int, graphql_concurrency: int) -> None:
+        """Tracks the REST and GraphQL rate limit budgets and limits the number of requests in flight.
+
+        While there is plenty of budget, requests run at full concurrency. As a budget drains below SLOWDOWN_RATIO,
+        concurrency is reduced in proportion. When a budget runs out, requests wait until it resets.
+        A secondary rate limit pauses all requests for the Retry-After period and halves concurrency,
+        which then recovers gradually as requests succeed.
+
+        Args:
+            rest_concurrency (int): The maximum number of REST requests in flight at once.
+            graphql_concurrency (int): The maximum number of GraphQL requests in flight at once.
+        """
+        self.max_concurrency = {
+            "rest": max(1, rest_concurrency),
+            "graphql": max(1, graphql_concurrency),
+        }
+
+        self.budgets = {
+            "rest": {"limit": None, "remaining": None, "reset": None},
+            "graphql": {"limit": None, "remaining": None, "reset": None},
+        }
+
+        self.in_flight = {"rest": 0, "graphql": 0}
+
+        # A multiplier (between 0 and 1) applied to the maximum concurrency after secondary rate limits
+        self.backoff = 1.0
+
+        self.paused_until = 0.0
+
+        self.stats = {
+            "requests": {"rest": 0, "graphql": 0},
+            "graphql_cost": 0,
+            "secondary_rate_limits": 0,
+            "wait_time": 0.0,
+        }
+
+        self._condition = threading.Condition()
+
+    def concurrency_limit(self, resource: str) -> int:
+        """Gets the current number of requests allowed in flight for a resource.
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+
+        Returns:
+            int: The number of requests allowed in flight.
+        """
+        limit = self.max_concurrency[resource] * self.backoff
+
+        budget = self.budgets[resource]
+
+        if budget["remaining"] is not None and budget["limit"]:
+            ratio = budget["remaining"] / budget["limit"]
+
+            if ratio < SLOWDOWN_RATIO:
+                limit *= ratio / SLOWDOWN_RATIO
+
+        return max(1, int(limit))
+
+    def _try_acquire(self, resource: str) -> float:
+        """Takes a request slot for a resource if one is available. Must be called with the condition held.
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+
+        Returns:
+            float: 0 if a slot was taken, otherwise the number of seconds to wait before trying again.
+        """
+        now = time.time()
+
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        budget = self.budgets[resource]
+
+        if budget["reset"] is not None and now >= budget["reset"]:
+            # The budget has reset, so it is unknown until the next response
+            budget["remaining"] = None
+            budget["reset"] = None
+
+        if budget["remaining"] is not None and budget["remaining"] <= self.in_flight[resource]:
+            if budget["reset"] is not None:
+                return budget["reset"] - now + 1
+
+            # The remaining budget came from a GraphQL rateLimit object, without a reset time from the headers
+            # Wait for the requests in flight to report it, or send a single request to find it out
+            if self.in_flight[resource] > 0:
+                return SLOT_POLL_INTERVAL
+
+        if self.in_flight[resource] >= self.concurrency_limit(resource):
+            return SLOT_POLL_INTERVAL
+
+        self.in_flight[resource] += 1
+        self.stats["requests"][resource] += 1
+
+        return 0.0
+
+    def acquire(self, resource: str) -> None:
+        """Waits for a request slot for a resource (for use within threads).
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+        """
+        with self._condition:
+            while (wait := self._try_acquire(resource)) > 0:
+                wait_start = time.perf_counter()
+
+                self._condition.wait(timeout=wait)
+
+                self.stats["wait_time"] += time.perf_counter() - wait_start
+
+    async def acquire_async(self, resource: str) -> None:
+        """Waits for a request slot for a resource (for use within asyncio).
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+        """
+        while True:
+            with self._condition:
+                wait = self._try_acquire(resource)
+
+            if wait <= 0:
+                return
+
+            self.stats["wait_time"] += wait
+            await asyncio.sleep(wait)
+
+    def release(self, resource: str, status_code: int | None, headers: Mapping[str, str] | None, body: str = "", rate_limit: dict | None = None) -> None:
+        """Releases a request slot and updates the budgets from the response.
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+            status_code (int | None): The HTTP status code of the response (None if the request failed to send).
+            headers (Mapping[str, str] | None): The headers of the response (None if the request failed to send).
+            body (str, optional): The body of the response, used to detect secondary rate limits. Defaults to "".
+            rate_limit (dict | None, optional): The rateLimit object from a GraphQL response. Defaults to None.
+        """
+        with self._condition:
+            self.in_flight[resource] -= 1
+
+            if headers is not None:
+                self._update_budget(resource, headers)
+
+            if rate_limit:
+                self.stats["graphql_cost"] += rate_limit.get("cost", 0)
+
+                if rate_limit.get("remaining") is not None:
+                    self.budgets["graphql"]["remaining"] = rate_limit["remaining"]
+
+            if status_code is not None and headers is not None and is_secondary_rate_limit(status_code, headers, body):
+                self._record_secondary_rate_limit(headers)
+            elif status_code is not None and status_code < 400:
+                self.backoff = min(1.0, self.backoff + RECOVERY_STEP)
+
+            self._condition.notify_all()
+
+    def _update_budget(self, resource: str, headers: Mapping[str, str]) -> None:
+        """Updates a budget from the X-RateLimit headers of a response. Must be called with the condition held.
+
+        Args:
+            resource (str): The API resource (rest or graphql).
+            headers (Mapping[str, str]): The headers of the response.
+        """
+        # Only the core (REST) and graphql budgets are tracked
+        if headers.get("X-RateLimit-Resource") not in (None, "core", "graphql"):
+            return
+
+        try:
+            limit = int(headers["X-RateLimit-Limit"])
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = int(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        budget = self.budgets[resource]
+
+        # Responses can arrive out of order, so keep the lowest remaining value within a reset window
+        if budget["remaining"] is None or remaining < budget["remaining"] or reset != budget["reset"]:
+            budget["remaining"] = remaining
+
+        budget["limit"] = limit
+        budget["reset"] = reset
+
+    def _record_secondary_rate_limit(self, headers: Mapping[str, str]) -> None:
+        """Pauses all requests and halves concurrency after a secondary rate limit. Must be called with the condition held.
+
+        Args:
+            headers (Mapping[str, str]): The headers of the secondary rate limit response.
+        """
+        try:
+            wait = int(headers.get("Retry-After", DEFAULT_SECONDARY_WAIT))
+        except ValueError:
+            wait = DEFAULT_SECONDARY_WAIT
+
+        self.paused_until = max(self.paused_until, time.time() + wait)
+        self.backoff = max(self.backoff / 2, 1 / max(self.max_concurrency.values()))
+
+        self.stats["secondary_rate_limits"] += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Gets a summary of the governor's budgets and statistics.
+
+        Returns:
+            dict[str, Any]: The budgets and statistics.
+        """
+        with self._condition:
+            return {
+                "budgets": {resource: dict(budget) for resource, budget in self.budgets.items()},
+                "stats": {**self.stats, "requests": dict(self.stats["requests"])},
+            }
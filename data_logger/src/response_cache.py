@@ -0,0 +1,211 @@
+"""A python module to cache GitHub REST API responses between runs using ETags."""
+
+import json
+import os
+import re
+import threading
+import time
+from typing import Any
+
+import boto3
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from src.logger import wrapped_logging
+
+# Only endpoints which rarely change between runs are cached
+CACHEABLE_PATHS = [
+    re.compile(r"^/repos/[^/]+/[^/]+$"),
+    re.compile(r"^/repos/[^/]+/[^/]+/branches$"),
+    re.compile(r"^/orgs/[^/]+/members$"),
+]
+
+# Entries which have not been used for this many seconds are removed when the cache is saved
+MAX_ENTRY_AGE = 30 * 24 * 60 * 60
+
+CACHE_FILENAME = "response_cache.json"
+
+
+class ResponseCache:
+    def __init__(self, logger: wrapped_logging, directory: str, s3: boto3.client = None, bucket_name: str = None, s3_key: str = None) -> None:
+        """A cache of REST API response bodies and their ETags.
+
+        The cache is stored as a single JSON file in a local directory (i.e. Lambda's /tmp).
+        It can optionally be backed by S3, so that it survives between Lambda environments.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            directory (str): The local directory to store the cache in.
+            s3 (boto3.client, optional): The S3 Client. Defaults to None.
+            bucket_name (str, optional): The name of the S3 bucket to back the cache with. Defaults to None.
+            s3_key (str, optional): The S3 key to back the cache with. Defaults to None (no S3 backing).
+        """
+        self.logger = logger
+        self.path = os.path.join(directory, CACHE_FILENAME)
+
+        self.s3 = s3
+        self.bucket_name = bucket_name
+        self.s3_key = s3_key
+
+        self.entries = {}
+
+        self.stats = {"hits": 0, "misses": 0, "uncacheable": 0}
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_cacheable(path: str) -> bool:
+        """Checks whether an endpoint should be cached.
+
+        Args:
+            path (str): The path of the endpoint (i.e. /repos/{org}/{repo}).
+
+        Returns:
+            bool: True if the endpoint should be cached, False otherwise.
+        """
+        return any(pattern.match(path) for pattern in CACHEABLE_PATHS)
+
+    @staticmethod
+    def get_key(path: str, params: dict) -> str:
+        """Gets the cache key for a request.
+
+        Args:
+            path (str): The path of the endpoint.
+            params (dict): The query parameters.
+
+        Returns:
+            str: The cache key.
+        """
+        query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+
+        return f"{path}?{query}"
+
+    def load(self) -> None:
+        """Loads the cache from the local directory or, if not available locally, from S3."""
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+            self.logger.log_info(f"Loaded {len(self.entries)} cached responses from {self.path}.")
+            return
+
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        if self.s3 and self.bucket_name and self.s3_key:
+            try:
+                response = self.s3.get_object(Bucket=self.bucket_name, Key=self.s3_key)
+
+                self.entries = json.loads(response["Body"].read().decode("utf-8"))
+
+                self.logger.log_info(f"Loaded {len(self.entries)} cached responses from S3.")
+
+            except Exception as e:
+                self.logger.log_warning(f"Unable to load the response cache from S3 ({e}). Starting with an empty cache.")
+
+    def save(self) -> None:
+        """Saves the cache to the local directory and, if configured, to S3. Entries which have not been used recently are removed."""
+        cutoff = time.time() - MAX_ENTRY_AGE
+
+        with self._lock:
+            self.entries = {key: entry for key, entry in self.entries.items() if entry["last_used"] >= cutoff}
+
+            contents = json.dumps(self.entries)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        with open(self.path, "w") as f:
+            f.write(contents)
+
+        if self.s3 and self.bucket_name and self.s3_key:
+            self.s3.put_object(Bucket=self.bucket_name, Key=self.s3_key, Body=contents)
+
+        self.logger.log_info(f"Saved {len(self.entries)} cached responses.")
+
+    def get_etag(self, key: str) -> str | None:
+        """Gets the ETag of a cached response.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str | None: The ETag, or None if the response is not cached.
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+
+        return entry["etag"] if entry else None
+
+    def get_response(self, key: str, url: str) -> Response:
+        """Builds a Response from a cached entry, after GitHub returned 304 Not Modified.
+
+        Args:
+            key (str): The cache key.
+            url (str): The URL of the request.
+
+        Returns:
+            Response: The cached response.
+        """
+        with self._lock:
+            entry = self.entries[key]
+            entry["last_used"] = time.time()
+
+            self.stats["hits"] += 1
+
+        response = Response()
+
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+
+        return response
+
+    def store(self, key: str, response: Response) -> None:
+        """Stores a response in the cache, if it has an ETag.
+
+        Args:
+            key (str): The cache key.
+            response (Response): The response from the GitHub API.
+        """
+        etag = response.headers.get("ETag")
+
+        with self._lock:
+            self.stats["misses"] += 1
+
+            if not etag:
+                return
+
+            # The Link header is kept so paginated endpoints still work from the cache
+            headers = {"ETag": etag}
+
+            if response.headers.get("Link"):
+                headers["Link"] = response.headers["Link"]
+
+            self.entries[key] = {
+                "etag": etag,
+                "headers": headers,
+                "body": response.text,
+                "last_used": time.time(),
+            }
+
+    def record_uncacheable(self) -> None:
+        """Records a request to an endpoint which is not cached."""
+        with self._lock:
+            self.stats["uncacheable"] += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the cache's statistics, including its hit ratio.
+
+        Returns:
+            dict[str, Any]: The cache statistics.
+        """
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+
+            return {
+                **self.stats,
+                "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+            }
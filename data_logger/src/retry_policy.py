@@ -0,0 +1,366 @@
+"""A python module to retry failed GitHub API requests with exponential backoff, within a run-wide retry budget."""
+
+import asyncio
+import random
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Mapping, ParamSpec, TypeVar
+
+import src.metrics as metrics
+from src.logger import wrapped_logging
+from src.rate_limit import DEFAULT_SECONDARY_WAIT, is_secondary_rate_limit
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+# Server errors which usually succeed when retried (i.e. a GraphQL query timing out returns 502)
+RETRYABLE_STATUS_CODES = [500, 502, 503, 504]
+
+# Messages in GraphQL errors which mean the query timed out, rather than the query being invalid
+GRAPHQL_TIMEOUT_MESSAGES = ["timeout", "timed out", "something went wrong"]
+
+# Exception names raised when a request does not get a response (from requests, aiohttp and asyncio)
+CONNECTION_ERRORS = ["ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout", "ClientConnectionError", "ClientConnectorError", "ServerDisconnectedError", "TimeoutError"]
+
+
+def get_error_details(error: BaseException) -> tuple[int | None, Mapping[str, str], str]:
+    """Finds the HTTP status code, headers and body of the response behind an error.
+
+    The Data Logger wraps failed responses in several ways (i.e. Exception(response) or Exception(e) from e),
+    so the error, its arguments and its cause are all checked.
+
+    Args:
+        error (BaseException): The error.
+
+    Returns:
+        tuple[int | None, Mapping[str, str], str]: The status code (None if there was no response), headers and body.
+    """
+
+    candidates = [error]
+    checked = set()
+
+    while candidates:
+        candidate = candidates.pop(0)
+
+        if id(candidate) in checked:
+            continue
+
+        checked.add(id(candidate))
+
+        # requests.Response, or an HTTPError carrying one
+        response = candidate if hasattr(candidate, "status_code") else getattr(candidate, "response", None)
+
+        if response is not None and hasattr(response, "status_code"):
+            return response.status_code, response.headers, response.text
+
+        # aiohttp.ClientResponseError
+        if isinstance(getattr(candidate, "status", None), int) and isinstance(candidate, BaseException):
+            return candidate.status, getattr(candidate, "headers", None) or {}, str(getattr(candidate, "message", ""))
+
+        if isinstance(candidate, BaseException):
+            candidates.extend(argument for argument in candidate.args if isinstance(argument, BaseException) or hasattr(argument, "status_code"))
+
+            if candidate.__cause__ is not None:
+                candidates.append(candidate.__cause__)
+
+    return None, {}, ""
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Checks whether an error (or its cause) means the request did not get a response.
+
+    Args:
+        error (BaseException): The error.
+
+    Returns:
+        bool: True if the request did not get a response, False otherwise.
+    """
+
+    while error is not None:
+        if any(base.__name__ in CONNECTION_ERRORS for base in type(error).__mro__):
+            return True
+
+        error = error.__cause__
+
+    return False
+
+
+def get_graphql_errors(error: BaseException) -> list[dict] | None:
+    """Gets the GraphQL errors an error was raised with (i.e. Exception(response_json["errors"])).
+
+    Args:
+        error (BaseException): The error.
+
+    Returns:
+        list[dict] | None: The GraphQL errors, or None if the error was not raised with them.
+    """
+
+    while error is not None:
+        if error.args and isinstance(error.args[0], list) and all(isinstance(item, dict) for item in error.args[0]) and error.args[0]:
+            return error.args[0]
+
+        error = error.__cause__
+
+    return None
+
+
+def classify(error: BaseException) -> tuple[str, bool, float | None]:
+    """Classifies an error as retryable or fatal.
+
+    Args:
+        error (BaseException): The error.
+
+    Returns:
+        tuple[str, bool, float | None]: The reason for the error, whether it is retryable and how long GitHub
+            asked to wait before retrying (None if it did not say).
+    """
+
+    status_code, headers, body = get_error_details(error)
+
+    if status_code is not None:
+        if is_secondary_rate_limit(status_code, headers, body):
+            retry_after = headers.get("Retry-After")
+
+            return "secondary_rate_limit", True, float(retry_after) if retry_after else float(DEFAULT_SECONDARY_WAIT)
+
+        if status_code in (403, 429) and headers.get("X-RateLimit-Remaining") == "0":
+            reset = headers.get("X-RateLimit-Reset")
+
+            return "rate_limit", True, max(0.0, float(reset) - time.time()) if reset else None
+
+        if status_code in RETRYABLE_STATUS_CODES:
+            return "server_error", True, None
+
+        if status_code == 401:
+            return "unauthorised", False, None
+
+        return "client_error", False, None
+
+    if is_connection_error(error):
+        return "connection_error", True, None
+
+    graphql_errors = get_graphql_errors(error)
+
+    if graphql_errors is not None:
+        messages = " ".join(str(item.get("message", "")) for item in graphql_errors).lower()
+
+        if any(message in messages for message in GRAPHQL_TIMEOUT_MESSAGES):
+            return "graphql_timeout", True, None
+
+        return "graphql_error", False, None
+
+    # Anything else (i.e. an unexpected response shape) was retried before this policy existed, so is still retried
+    return "unknown", True, None
+
+
+class RetryPolicy:
+    def __init__(self, logger: wrapped_logging | None = None, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 60.0, budget: int = 200) -> None:
+        """Retries failed requests with exponential backoff and jitter, within a retry budget shared by the whole run.
+
+        Retryable errors (server errors, rate limits, dropped connections and GraphQL timeouts) are retried up to
+        max_attempts times. The wait doubles after each attempt, starting at base_delay and capped at max_delay,
+        with full jitter so that threads which failed together do not retry together. If GitHub sends Retry-After
+        (or a rate limit reset time), that wait is used instead. Fatal errors (i.e. a bad query or a missing
+        repository) are raised straight away.
+
+        Every retry uses up one retry from the budget. Once the budget is spent, errors are no longer retried,
+        so a storm of failures cannot use up the rest of the run.
+
+        Args:
+            logger (wrapped_logging | None, optional): The logger object. Defaults to None (retries are not logged).
+            max_attempts (int, optional): The number of times a request is attempted before failing. Defaults to 3.
+            base_delay (float, optional): The wait (in seconds) before the first retry. Defaults to 1.0.
+            max_delay (float, optional): The longest wait (in seconds) before a retry. Defaults to 60.0.
+            budget (int, optional): The number of retries allowed across the whole run. Defaults to 200.
+        """
+        self.logger = logger
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+        self.stats = {
+            "retries": {},
+            "fatal": {},
+            "attempts_exhausted": 0,
+            "budget_exhausted": 0,
+            "wait_time": 0.0,
+        }
+
+        self._lock = threading.Lock()
+
+    def get_delay(self, attempt: int, retry_after: float | None) -> float:
+        """Gets the wait before the next attempt.
+
+        Args:
+            attempt (int): The number of the attempt which failed (starting at 1).
+            retry_after (float | None): How long GitHub asked to wait, if it did.
+
+        Returns:
+            float: The wait in seconds.
+        """
+
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _record_failure(self, error: BaseException, attempt: int) -> float:
+        """Classifies a failed attempt and decides whether to retry it.
+
+        Args:
+            error (BaseException): The error raised by the attempt.
+            attempt (int): The number of the attempt (starting at 1).
+
+        Raises:
+            Exception: If the error is fatal, the attempts are used up or the retry budget is spent.
+
+        Returns:
+            float: The wait in seconds before retrying.
+        """
+
+        reason, retryable, retry_after = classify(error)
+
+        with self._lock:
+            if not retryable:
+                self.stats["fatal"][reason] = self.stats["fatal"].get(reason, 0) + 1
+
+                raise Exception(error) from error
+
+            if attempt >= self.max_attempts:
+                self.stats["attempts_exhausted"] += 1
+
+                raise Exception(error) from error
+
+            if self.budget <= 0:
+                self.stats["budget_exhausted"] += 1
+
+                raise Exception(f"Retry budget spent. Not retrying {reason}: {error}") from error
+
+            self.budget -= 1
+
+            self.stats["retries"][reason] = self.stats["retries"].get(reason, 0) + 1
+
+            delay = self.get_delay(attempt, retry_after)
+
+            self.stats["wait_time"] += delay
+
+        metrics.recorder.record_retry()
+
+        if self.logger is not None:
+            self.logger.log_warning(f"Attempt {attempt} failed ({reason}). Retrying in {delay:.2f} seconds...")
+
+        return delay
+
+    def call(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Calls a function, retrying it if it fails.
+
+        A result of None is treated as a retryable failure, as github_api_toolkit requests can return None.
+
+        Args:
+            func (Callable[P, T]): The function to call.
+
+        Raises:
+            Exception: If the function fails with a fatal error, or fails after the maximum number of attempts or the retry budget is spent.
+
+        Returns:
+            T: The result of the function.
+        """
+
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            try:
+                result = func(*args, **kwargs)
+
+                if result is not None:
+                    return result
+
+                raise Exception("Request failed with None result")
+
+            except Exception as e:
+                time.sleep(self._record_failure(e, attempt))
+
+    async def call_async(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Awaits a coroutine function, retrying it if it fails.
+
+        Args:
+            func (Callable[..., Any]): The coroutine function to await.
+
+        Raises:
+            Exception: If the function fails with a fatal error, or fails after the maximum number of attempts or the retry budget is spent.
+
+        Returns:
+            Any: The result of the function.
+        """
+
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            try:
+                return await func(*args, **kwargs)
+
+            except Exception as e:
+                await asyncio.sleep(self._record_failure(e, attempt))
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the number of retries for each reason, fatal errors for each reason and the time spent waiting.
+
+        Returns:
+            dict[str, Any]: The retry statistics.
+        """
+        with self._lock:
+            return {
+                "retries": dict(self.stats["retries"]),
+                "fatal": dict(self.stats["fatal"]),
+                "attempts_exhausted": self.stats["attempts_exhausted"],
+                "budget_exhausted": self.stats["budget_exhausted"],
+                "budget_remaining": self.budget,
+                "wait_time": self.stats["wait_time"],
+            }
+
+
+# The policy shared by the whole run. Replaced by configure() once config.json has been loaded
+policy = RetryPolicy()
+
+
+def configure(logger: wrapped_logging, max_attempts: int, base_delay: float, max_delay: float, budget: int) -> RetryPolicy:
+    """Replaces the shared retry policy using the settings from config.json.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        max_attempts (int): The number of times a request is attempted before failing.
+        base_delay (float): The wait (in seconds) before the first retry.
+        max_delay (float): The longest wait (in seconds) before a retry.
+        budget (int): The number of retries allowed across the whole run.
+
+    Returns:
+        RetryPolicy: The new shared retry policy.
+    """
+    global policy
+
+    policy = RetryPolicy(logger, max_attempts, base_delay, max_delay, budget)
+
+    return policy
+
+
+def retry(func: Callable[P, T]) -> Callable[P, T]:
+    """A decorator that retries a function using the shared retry policy.
+
+    Args:
+        func (Callable[P, T]): The function to retry.
+
+    Returns:
+        Callable[P, T]: The wrapped function.
+    """
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        return policy.call(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,298 @@
+"""A python module to split repository collection into shards, which are collected by separate worker invocations."""
+
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator
+
+import boto3
+
+from src.logger import wrapped_logging
+
+# The prefix shard outputs are written under, before they are merged by the coordinator
+SHARDS_PREFIX = "shards"
+
+# The ways shards can be run: by invoking this Lambda function, or in local processes (for development and testing)
+SHARD_RUNNERS = ["lambda", "process_pool"]
+
+# Synchronous Lambda invocations can last up to the maximum Lambda timeout (15 minutes)
+LAMBDA_READ_TIMEOUT = 900
+
+LOCAL_OUTPUT_DIRECTORY = "./output"
+
+
+def split_into_shards(repositories: list[dict], shard_size: int) -> list[list[dict]]:
+    """Splits a list of repositories into shards of at most shard_size repositories.
+
+    Args:
+        repositories (list[dict]): The repositories to collect.
+        shard_size (int): The maximum number of repositories in each shard.
+
+    Returns:
+        list[list[dict]]: The shards, in the same order as the repositories.
+    """
+
+    shard_size = max(1, shard_size)
+
+    return [repositories[start:start + shard_size] for start in range(0, len(repositories), shard_size)]
+
+
+def get_shard_key(run_id: str, shard: int) -> str:
+    """Gets the key (or local path, relative to ./output) a worker writes its shard's records to.
+
+    Args:
+        run_id (str): The ID of the coordinator's run.
+        shard (int): The index of the shard.
+
+    Returns:
+        str: The key of the shard's output (i.e. shards/20240101T120000.123456Z-1a2b3c4d/shard_0.json).
+    """
+
+    return f"{SHARDS_PREFIX}/{run_id}/shard_{shard}.json"
+
+
+def get_shard_input_key(run_id: str, shard: int) -> str:
+    """Gets the key (or local path, relative to ./output) the coordinator writes a shard's repositories to, for its worker to read.
+
+    Args:
+        run_id (str): The ID of the coordinator's run.
+        shard (int): The index of the shard.
+
+    Returns:
+        str: The key of the shard's input (i.e. shards/20240101T120000.123456Z-1a2b3c4d/shard_0_input.json).
+    """
+
+    return f"{SHARDS_PREFIX}/{run_id}/shard_{shard}_input.json"
+
+
+def build_shard_input(repositories: list[dict], security_index: dict[str, dict]) -> list[dict]:
+    """Builds the records of a shard's input, pairing each repository with its entry from the security index.
+
+    Args:
+        repositories (list[dict]): The repositories in the shard, from the organization listing.
+        security_index (dict[str, dict]): The visibility and security settings of each repository (empty if not used).
+
+    Returns:
+        list[dict]: A record for each repository, with its security settings (None if it is not in the index).
+    """
+
+    return [
+        {"repository": repository, "security": security_index.get(repository["name"])}
+        for repository in repositories
+    ]
+
+
+def read_shard_input(records: list[dict], names: list[str]) -> tuple[list[dict], dict[str, dict]]:
+    """Reads the repositories and security index of a shard from its input records.
+
+    Args:
+        records (list[dict]): The shard's input records, from build_shard_input().
+        names (list[str]): The names of the repositories to collect, from the worker's event payload.
+
+    Raises:
+        Exception: If a repository in the event payload is missing from the input.
+
+    Returns:
+        tuple[list[dict], dict[str, dict]]: The repositories (in the order of names) and their security index.
+    """
+
+    records_by_name = {record["repository"]["name"]: record for record in records}
+
+    missing = [name for name in names if name not in records_by_name]
+
+    if missing:
+        raise Exception(f"{len(missing)} repositories missing from the shard input (i.e. {missing[0]}).")
+
+    repositories = [records_by_name[name]["repository"] for name in names]
+
+    security_index = {
+        name: records_by_name[name]["security"]
+        for name in names
+        if records_by_name[name]["security"] is not None
+    }
+
+    return repositories, security_index
+
+
+def build_worker_event(run_id: str, shard: int, repositories: list[dict], input_key: str, deadline: float | None = None) -> dict[str, Any]:
+    """Builds the event payload which asks a worker invocation to collect a shard.
+
+    Only the repository names are passed in the payload, as synchronous Lambda invocations are limited to 6 MB.
+    The repositories themselves are read from the shard's input (see build_shard_input).
+
+    Args:
+        run_id (str): The ID of the coordinator's run.
+        shard (int): The index of the shard.
+        repositories (list[dict]): The repositories in the shard, from the organization listing.
+        input_key (str): The key of the shard's input.
+        deadline (float | None, optional): The coordinator's checkpoint deadline (from time.time()), after which the
+            worker starts no more work and returns the records collected so far. Defaults to None (no deadline).
+
+    Returns:
+        dict[str, Any]: The worker's event payload.
+    """
+
+    return {
+        "mode": "worker",
+        "run_id": run_id,
+        "shard": shard,
+        "repositories": [repository["name"] for repository in repositories],
+        "input_key": input_key,
+        "deadline": deadline,
+    }
+
+
+def invoke_lambda_worker(lambda_client: boto3.client, function_name: str, event: dict) -> dict:
+    """Invokes a worker synchronously and waits for its result.
+
+    Args:
+        lambda_client (boto3.client): The Lambda client.
+        function_name (str): The name of the Lambda function to invoke (this function).
+        event (dict): The worker's event payload.
+
+    Raises:
+        Exception: If the worker invocation failed.
+
+    Returns:
+        dict: The worker's result.
+    """
+
+    response = lambda_client.invoke(
+        FunctionName=function_name,
+        InvocationType="RequestResponse",
+        Payload=json.dumps(event).encode("utf-8"),
+    )
+
+    payload = json.loads(response["Payload"].read().decode("utf-8"))
+
+    if response.get("FunctionError"):
+        raise Exception(f"Shard {event['shard']} failed: {payload}")
+
+    return payload
+
+
+def run_local_worker(event: dict) -> dict:
+    """Runs a worker in the current process. Used by the process_pool runner in place of a Lambda invocation.
+
+    Args:
+        event (dict): The worker's event payload.
+
+    Returns:
+        dict: The worker's result.
+    """
+
+    # Imported here as the handler imports this module
+    import src.main as main
+
+    return main.handler(event, None)
+
+
+def run_shards(logger: wrapped_logging, runner: str, events: list[dict], concurrency: int, lambda_client: boto3.client = None, function_name: str = None, should_stop: Callable[[], bool] | None = None) -> Iterator[dict]:
+    """Runs a worker for each shard, with at most concurrency workers at once, yielding each result as it completes.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        runner (str): How to run the workers (lambda or process_pool).
+        events (list[dict]): The event payload for each worker.
+        concurrency (int): The maximum number of workers running at once.
+        lambda_client (boto3.client, optional): The Lambda client (lambda runner only). Defaults to None.
+        function_name (str, optional): The name of the Lambda function to invoke (lambda runner only). Defaults to None.
+        should_stop (Callable[[], bool] | None, optional): Checked before each new worker is started.
+            Once it returns True, the running workers finish but no more are started. Defaults to None.
+
+    Raises:
+        Exception: If the runner is not supported.
+        Exception: If the Lambda client and function name are not provided for the lambda runner.
+
+    Yields:
+        dict: The result of each worker, in the order they complete. A worker which failed yields its shard and the error instead.
+    """
+
+    if runner not in SHARD_RUNNERS:
+        raise Exception(f"Unknown shard runner {runner}. Please check config.json.")
+
+    if runner == "lambda" and (not lambda_client or not function_name):
+        raise Exception("Lambda client and function name required to run shards using Lambda.")
+
+    concurrency = max(1, min(concurrency, len(events)))
+
+    executor: Executor
+
+    # Lambda invocations spend their time waiting on the network, so threads are enough
+    # Local workers do the collection themselves, so each needs its own process
+    if runner == "lambda":
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+    else:
+        executor = ProcessPoolExecutor(max_workers=concurrency)
+
+    logger.log_info(f"Running {len(events)} shards using the {runner} runner ({concurrency} at once).")
+
+    with executor:
+
+        def submit(event: dict) -> Future:
+            if runner == "lambda":
+                return executor.submit(invoke_lambda_worker, lambda_client, function_name, event)
+
+            return executor.submit(run_local_worker, event)
+
+        # Workers are only started as others finish, so no more are started once should_stop returns True
+        pending_events = iter(events)
+        running = {submit(event): event["shard"] for event in itertools.islice(pending_events, concurrency)}
+
+        try:
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    shard = running.pop(future)
+
+                    # A failed worker does not stop the others, so the shards which finish can still be merged
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.log_error(f"Shard {shard} failed ({e}).")
+
+                        result = {"shard": shard, "error": str(e)}
+                    else:
+                        logger.log_info(f"Shard {result['shard']} collected {result['records']} repositories.")
+
+                    yield result
+
+                    if should_stop is not None and should_stop():
+                        continue
+
+                    event = next(pending_events, None)
+
+                    if event is not None:
+                        running[submit(event)] = event["shard"]
+
+        except BaseException:
+            # Shards which have not started are not run
+            for future in running:
+                future.cancel()
+            raise
+
+
+def remove_shard_outputs(logger: wrapped_logging, write_to_s3: bool, keys: list[str], s3: boto3.client = None, bucket_name: str = None) -> None:
+    """Removes the shard outputs once they have been merged.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether the shard outputs were written to S3 or locally.
+        keys (list[str]): The keys of the shard outputs.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket. Defaults to None.
+    """
+
+    for key in keys:
+        try:
+            if write_to_s3:
+                s3.delete_object(Bucket=bucket_name, Key=key)
+            else:
+                os.remove(os.path.join(LOCAL_OUTPUT_DIRECTORY, key))
+
+        except Exception as e:
+            logger.log_warning(f"Unable to remove shard output {key} ({e}).")
+
+    logger.log_info(f"Removed {len(keys)} shard outputs.")
@@ -0,0 +1,145 @@
+"""A python module to publish each run's outputs as a versioned snapshot, described by a manifest."""
+
+import datetime
+import json
+import os
+import uuid
+from typing import Any
+
+import boto3
+
+from src.logger import wrapped_logging
+
+MANIFEST_KEY = "manifest.json"
+
+# Each run's outputs are written under RUNS_PREFIX/<run_id>/
+RUNS_PREFIX = "runs"
+
+# The number of random hex characters at the end of a run ID
+RUN_ID_SUFFIX_LENGTH = 8
+
+LOCAL_OUTPUT_DIRECTORY = "./output"
+
+
+def create_run_id(now: datetime.datetime = None) -> str:
+    """Creates the ID of a run from the time it started.
+
+    Run IDs sort in the order the runs started. The time has microsecond precision, and is followed by a random
+    suffix, so runs which start at the same time (i.e. two invocations in the same second) never share an ID.
+
+    Args:
+        now (datetime.datetime, optional): The time the run started. Defaults to None (the current UTC time).
+
+    Returns:
+        str: The run ID (i.e. 20240101T120000.123456Z-1a2b3c4d).
+    """
+
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+
+    return f"{now.strftime('%Y%m%dT%H%M%S.%fZ')}-{uuid.uuid4().hex[:RUN_ID_SUFFIX_LENGTH]}"
+
+
+def get_run_key(run_id: str, filename: str) -> str:
+    """Gets the key (or local path, relative to ./output) of an output within a run.
+
+    Args:
+        run_id (str): The ID of the run.
+        filename (str): The name of the output (i.e. repositories.json).
+
+    Returns:
+        str: The key of the output (i.e. runs/20240101T120000.123456Z-1a2b3c4d/repositories.json).
+    """
+
+    return f"{RUNS_PREFIX}/{run_id}/{filename}"
+
+
+def load_manifest(logger: wrapped_logging, write_to_s3: bool, s3: boto3.client = None, bucket_name: str = None) -> dict | None:
+    """Loads the manifest of the last published run.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to read the manifest from S3 or locally.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to read from. Defaults to None.
+
+    Returns:
+        dict | None: The manifest, or None if no run has been published.
+    """
+
+    try:
+        if write_to_s3:
+            response = s3.get_object(Bucket=bucket_name, Key=MANIFEST_KEY)
+
+            return json.loads(response["Body"].read().decode("utf-8"))
+
+        with open(os.path.join(LOCAL_OUTPUT_DIRECTORY, MANIFEST_KEY)) as f:
+            return json.load(f)
+
+    except Exception as e:
+        logger.log_warning(f"Unable to load the previous {MANIFEST_KEY} ({e}).")
+        return None
+
+
+def build_manifest(run_id: str, datasets: dict[str, dict], timings: dict[str, float], previous_manifest: dict | None) -> dict[str, Any]:
+    """Builds the manifest for a run.
+
+    Datasets which were not collected during the run (i.e. their collection is disabled) are carried forward from the
+    previous manifest, so the manifest always describes a complete, consistent set of outputs.
+
+    Args:
+        run_id (str): The ID of the run.
+        datasets (dict[str, dict]): The outputs written during the run, keyed by dataset name.
+        timings (dict[str, float]): The time (in seconds) each stage of the run took.
+        previous_manifest (dict | None): The manifest of the previous run, if there is one.
+
+    Returns:
+        dict[str, Any]: The manifest.
+    """
+
+    published_at = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    manifest_datasets = {}
+
+    if previous_manifest:
+        manifest_datasets.update(previous_manifest.get("datasets", {}))
+
+    # Carried forward datasets keep the time they were originally published
+    for name, entry in datasets.items():
+        manifest_datasets[name] = {**entry, "published_at": published_at}
+
+    return {
+        "run_id": run_id,
+        "published_at": published_at,
+        "datasets": manifest_datasets,
+        "timings": timings,
+    }
+
+
+def publish_manifest(logger: wrapped_logging, write_to_s3: bool, manifest: dict, s3: boto3.client = None, bucket_name: str = None) -> None:
+    """Publishes a run's manifest. This must be the last output written, as readers switch to the run once it exists.
+
+    Args:
+        logger (wrapped_logging): The logger object.
+        write_to_s3 (bool): Whether to write the manifest to S3 or locally.
+        manifest (dict): The manifest.
+        s3 (boto3.client, optional): The S3 Client. Defaults to None.
+        bucket_name (str, optional): The name of the S3 bucket to write to. Defaults to None.
+    """
+
+    contents = json.dumps(manifest, indent=4)
+
+    if write_to_s3:
+        s3.put_object(Bucket=bucket_name, Key=MANIFEST_KEY, Body=contents, ContentType="application/json")
+    else:
+        os.makedirs(LOCAL_OUTPUT_DIRECTORY, exist_ok=True)
+
+        path = os.path.join(LOCAL_OUTPUT_DIRECTORY, MANIFEST_KEY)
+
+        # Write to a temporary file first, so the manifest is replaced in a single step
+        with open(f"{path}.tmp", "w") as f:
+            f.write(contents)
+
+        os.replace(f"{path}.tmp", path)
+
+    logger.log_info(f"Published {MANIFEST_KEY} for run {manifest['run_id']}.")
@@ -0,0 +1,146 @@
+"""A python module to keep the GitHub App installation token used by every worker fresh for the whole run."""
+
+import datetime
+import threading
+import time
+from typing import Any, Callable
+
+from src.logger import wrapped_logging
+
+# GitHub App installation tokens expire an hour after they are created
+TOKEN_LIFETIME = 60 * 60
+
+
+def get_expiry(expires_at: Any, issued_at: float) -> float:
+    """Gets the time an installation token expires.
+
+    Args:
+        expires_at (Any): The expiry returned with the token (a datetime or ISO 8601 string), if any.
+        issued_at (float): The time (from time.time()) the token was created.
+
+    Returns:
+        float: The time (from time.time()) the token expires.
+    """
+
+    if isinstance(expires_at, str):
+        try:
+            expires_at = datetime.datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        except ValueError:
+            expires_at = None
+
+    if isinstance(expires_at, datetime.datetime):
+        # Naive datetimes from the GitHub API are in UTC
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+
+        return expires_at.timestamp()
+
+    return issued_at + TOKEN_LIFETIME
+
+
+class InstallationTokenManager:
+    def __init__(self, logger: wrapped_logging, mint: Callable[[], tuple], refresh_margin: int) -> None:
+        """Provides the GitHub App installation token, replacing it before it expires.
+
+        A new token is created once the current one is within refresh_margin seconds of expiring.
+        Only one thread creates the new token; the others keep using the current token, which is still valid,
+        so in-flight workers are never stopped. The new token is then swapped into the headers of every registered interface.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            mint (Callable[[], tuple]): Creates a new installation token, returning (token, expires_at).
+            refresh_margin (int): The number of seconds before expiry at which the token is replaced.
+        """
+        self.logger = logger
+        self.mint = mint
+        self.refresh_margin = refresh_margin
+
+        self.token = None
+        self.expires_at = 0.0
+
+        self.refreshes = 0
+
+        self._interfaces = []
+
+        self._lock = threading.Lock()
+
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Creates a new token and swaps it into the registered interfaces. Called with the lock held (except when first created)."""
+        issued_at = time.time()
+
+        token = self.mint()
+
+        self.token = token[0]
+        self.expires_at = get_expiry(token[1] if len(token) > 1 else None, issued_at)
+
+        for interface in self._interfaces:
+            self._apply(interface)
+
+        self.logger.log_info(f"Installation token created. Expires in {self.expires_at - time.time():.0f} seconds.")
+
+    def _apply(self, interface: Any) -> None:
+        """Swaps the current token into an interface's headers.
+
+        A new headers dictionary is assigned, rather than the existing one being changed,
+        so requests which have already read the headers are unaffected.
+
+        Args:
+            interface (Any): The interface (any object with a headers dictionary).
+        """
+        interface.headers = {**interface.headers, "Authorization": f"token {self.token}"}
+
+    def needs_refresh(self) -> bool:
+        """Checks whether the token is within refresh_margin seconds of expiring.
+
+        Returns:
+            bool: True if the token should be replaced, False otherwise.
+        """
+        return time.time() >= self.expires_at - self.refresh_margin
+
+    def register(self, interface: Any) -> None:
+        """Registers an interface to receive new tokens.
+
+        Args:
+            interface (Any): The interface (any object with a headers dictionary).
+        """
+        with self._lock:
+            self._interfaces.append(interface)
+
+            self._apply(interface)
+
+    def ensure_fresh(self) -> None:
+        """Replaces the token if it is about to expire. Called before every request."""
+        if not self.needs_refresh():
+            return
+
+        with self._lock:
+            # Another thread may have replaced the token while this one waited for the lock
+            if not self.needs_refresh():
+                return
+
+            self._refresh()
+
+            self.refreshes += 1
+
+    def get_token(self) -> str:
+        """Gets a token which is not about to expire.
+
+        Returns:
+            str: The installation token.
+        """
+        self.ensure_fresh()
+
+        return self.token
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the number of times the token was replaced and when the current token expires.
+
+        Returns:
+            dict[str, Any]: The token statistics.
+        """
+        return {
+            "refreshes": self.refreshes,
+            "expires_in": self.expires_at - time.time(),
+        }
@@ -0,0 +1,135 @@
+"""A python module to send GitHub API requests over pooled keep-alive connections shared by every worker thread."""
+
+import threading
+from typing import Any
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from src.logger import wrapped_logging
+
+# The number of hosts to keep connection pools for (the GitHub API, plus any hosts reached through Link headers)
+POOL_HOSTS = 4
+
+# The (connect, read) timeouts in seconds for every request, so a stalled connection fails and is retried rather than hanging until the Lambda timeout
+REQUEST_TIMEOUT = (10, 60)
+
+
+class PooledTransport:
+    def __init__(self, logger: wrapped_logging, pool_size: int) -> None:
+        """Sends requests over a pool of keep-alive connections, so TLS handshakes are not repeated for every request.
+
+        requests sessions are not safe to share between threads, so each worker thread gets its own session.
+        Every session uses the same connection pool (which is safe to share), so a connection opened by one
+        thread can be reused by any other. The pool keeps up to pool_size connections open per host, which should
+        be the most requests that can be in flight at once; any fewer and connections are thrown away and reopened.
+
+        Responses are requested compressed (gzip), and decompressed by requests as they are read.
+
+        Args:
+            logger (wrapped_logging): The logger object.
+            pool_size (int): The number of connections to keep open per host.
+        """
+        self.logger = logger
+        self.pool_size = max(1, pool_size)
+
+        # Retries are handled by the retry policy, so the adapter does not retry requests itself
+        self.adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=self.pool_size, max_retries=0)
+
+        self.stats = {
+            "sessions": 0,
+            "requests": 0,
+            "compressed_responses": 0,
+        }
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        self.logger.log_info(f"HTTP transport created with a pool of {self.pool_size} connections per host.")
+
+    def get_session(self) -> requests.Session:
+        """Gets the current thread's session, creating it on the thread's first request.
+
+        Returns:
+            requests.Session: The session, using the shared connection pool.
+        """
+        session = getattr(self._local, "session", None)
+
+        if session is None:
+            session = requests.Session()
+
+            session.mount("https://", self.adapter)
+            session.mount("http://", self.adapter)
+
+            session.headers["Accept-Encoding"] = "gzip"
+
+            self._local.session = session
+
+            with self._lock:
+                self.stats["sessions"] += 1
+
+        return session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        """Sends a request using the current thread's session, with REQUEST_TIMEOUT unless another timeout is given.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full URL of the request.
+
+        Returns:
+            Response: The response.
+        """
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+
+        response = self.get_session().request(method, url, **kwargs)
+
+        with self._lock:
+            self.stats["requests"] += 1
+
+            if response.headers.get("Content-Encoding") == "gzip":
+                self.stats["compressed_responses"] += 1
+
+        return response
+
+    def get_connection_counts(self) -> tuple[int, int]:
+        """Gets the number of requests sent and connections opened, from the connection pools.
+
+        Returns:
+            tuple[int, int]: The number of requests sent and the number of connections opened.
+        """
+        pools = self.adapter.poolmanager.pools
+
+        requests_sent = 0
+        connections_opened = 0
+
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+
+        return requests_sent, connections_opened
+
+    def summary(self) -> dict[str, Any]:
+        """Gets the number of requests, connections opened and reused, and compressed responses.
+
+        Returns:
+            dict[str, Any]: The transport statistics.
+        """
+        requests_sent, connections_opened = self.get_connection_counts()
+
+        with self._lock:
+            stats = dict(self.stats)
+
+        reused = max(0, requests_sent - connections_opened)
+
+        return {
+            **stats,
+            "pool_size": self.pool_size,
+            "connections_opened": connections_opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / requests_sent if requests_sent else 0.0,
+        }
@@ -0,0 +1,63 @@
+"""Tests for the collection checkpoint's deadline and maximum age."""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.checkpoint import FALLBACK_MARGIN_FRACTION, CollectionCheckpoint
+
+
+def test_deadline_leaves_margin_before_timeout(tmp_path: str) -> None:
+    logger = Mock()
+    checkpoint = CollectionCheckpoint(logger, "org", str(tmp_path), 60, 86400)
+
+    checkpoint.set_deadline(300, 120)
+
+    assert abs(checkpoint.deadline - (time.time() + 180)) < 1
+    assert not checkpoint.is_out_of_time()
+    logger.log_warning.assert_not_called()
+
+
+def test_margin_longer_than_timeout_is_reduced(tmp_path: str) -> None:
+    logger = Mock()
+    checkpoint = CollectionCheckpoint(logger, "org", str(tmp_path), 60, 86400)
+
+    # The default margin of 120 seconds with the default Terraform timeout of 60 seconds
+    checkpoint.set_deadline(60, 120)
+
+    assert abs(checkpoint.deadline - (time.time() + 60 * (1 - FALLBACK_MARGIN_FRACTION))) < 1
+    assert not checkpoint.is_out_of_time()
+    logger.log_warning.assert_called_once()
+
+
+def test_age_is_measured_from_the_last_save(tmp_path: str) -> None:
+    checkpoint = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+
+    # A collection which was first checkpointed two days ago, and saved again by the last run
+    checkpoint.state["created_at"] = time.time() - 2 * 86400
+    checkpoint.add_records([{"name": "repository-0"}])
+    checkpoint.save()
+
+    resumed = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+    resumed.load()
+
+    assert resumed.resumed
+    assert list(resumed.state["records"]) == ["repository-0"]
+
+
+def test_checkpoint_not_saved_within_max_age_is_discarded(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    checkpoint = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+    checkpoint.add_records([{"name": "repository-0"}])
+    checkpoint.save()
+
+    resumed = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+
+    # Loaded two days after the last save
+    saved_at = checkpoint.state["saved_at"]
+    monkeypatch.setattr(time, "time", lambda: saved_at + 2 * 86400)
+
+    resumed.load()
+
+    assert not resumed.resumed
+    assert resumed.state["records"] == {}
@@ -0,0 +1,117 @@
+"""Tests for a run which stops at the checkpoint deadline, and the run which resumes from its checkpoint.
+
+The handler runs against the fake GitHub API from benchmarks/fake_github.py, with the S3, Secrets Manager and
+GitHub App token stubs from benchmarks/replay_harness.py.
+"""
+
+import json
+from typing import Any, Iterator
+
+import pytest
+
+import src.main as main
+from benchmarks.fake_github import FakeGitHub, start_server
+from benchmarks.replay_harness import FakeS3, build_config, run_handler
+from benchmarks.scale_benchmark import ENVIRONMENT_VARIABLES, RedirectingSession
+from benchmarks.synthetic_org import generate_org
+from src.checkpoint import CollectionCheckpoint
+from src.transport import PooledTransport
+
+REPOSITORY_COUNT = 30
+
+# The number of repositories collected before the first run's deadline passes
+COLLECTED_BEFORE_DEADLINE = 10
+
+
+@pytest.fixture
+def org(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, Any]]:
+    """Serves a synthetic organisation from the fake GitHub API, and sends the handler's requests to it.
+
+    Yields:
+        dict[str, Any]: The synthetic organisation.
+    """
+    org = generate_org(REPOSITORY_COUNT, seed=1)
+
+    server = start_server(FakeGitHub(org))
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    for variable, value in ENVIRONMENT_VARIABLES.items():
+        monkeypatch.setenv(variable, value)
+
+    monkeypatch.setenv("GITHUB_ORG", org["login"])
+
+    get_session = PooledTransport.get_session
+
+    monkeypatch.setattr(PooledTransport, "get_session", lambda self: RedirectingSession(get_session(self), base_url))
+
+    yield org
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_stopped_run_publishes_alerts_and_next_run_resumes(org: dict[str, Any], monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    # A single thread collecting 5 repositories per task, so the deadline can pass part way through the repositories
+    features = ["features.checkpointing=true", "features.versioned_output=true", "features.concurrent_stages=true"]
+
+    config = build_config(features + ["settings.thread_count=1", "settings.remaining_data_batch_size=5"], str(tmp_path))
+    checkpoint_key = config["settings"]["checkpoint_s3_key"]
+
+    s3 = FakeS3()
+
+    # Stop -- the deadline passes once COLLECTED_BEFORE_DEADLINE repositories have been collected
+
+    monkeypatch.setattr(CollectionCheckpoint, "is_out_of_time", lambda self: len(self.state["records"]) >= COLLECTED_BEFORE_DEADLINE)
+
+    _, result = run_handler(config, s3, replay=True)
+
+    assert "resume from the checkpoint" in result
+
+    checkpoint = json.loads(s3.objects[checkpoint_key])
+
+    assert checkpoint["listing"]["complete"]
+    assert len(checkpoint["records"]) == COLLECTED_BEFORE_DEADLINE
+
+    # The alert datasets written during the stopped run are published, rather than left orphaned under runs/
+    stopped_manifest = json.loads(s3.objects["manifest.json"])
+
+    assert set(stopped_manifest["datasets"]) == {"dependabot", "secret_scanning"}
+
+    for entry in stopped_manifest["datasets"].values():
+        assert entry["key"] in s3.objects
+
+    # Resume -- only the repositories missing from the checkpoint are collected
+
+    monkeypatch.setattr(CollectionCheckpoint, "is_out_of_time", lambda self: False)
+
+    collected = []
+    get_remaining_data_batch = main.get_remaining_data_batch
+
+    def record_remaining_data_batch(ql: Any, org_name: str, repositories: list[str], max_commits: int) -> Any:
+        collected.extend(repositories)
+
+        return get_remaining_data_batch(ql, org_name, repositories, max_commits)
+
+    monkeypatch.setattr(main, "get_remaining_data_batch", record_remaining_data_batch)
+
+    _, result = run_handler(config, s3, replay=True)
+
+    assert "ran successfully" in result
+
+    assert len(collected) == REPOSITORY_COUNT - COLLECTED_BEFORE_DEADLINE
+    assert not set(collected) & set(checkpoint["records"])
+
+    # Publish -- every repository is published in a new run, and the checkpoint is removed
+
+    manifest = json.loads(s3.objects["manifest.json"])
+
+    assert manifest["run_id"] != stopped_manifest["run_id"]
+    assert set(manifest["datasets"]) == {"repositories", "dependabot", "secret_scanning"}
+
+    repositories = json.loads(s3.objects[manifest["datasets"]["repositories"]["key"]])
+
+    expected = sorted(repository["name"] for repository in org["repositories"] if not repository["archived"])
+
+    assert sorted(repository["name"] for repository in repositories) == expected
+
+    assert checkpoint_key not in s3.objects
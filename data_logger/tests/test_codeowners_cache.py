@@ -0,0 +1,42 @@
+"""Tests for the CODEOWNERS cache and the lookups which use it."""
+
+from unittest.mock import Mock
+
+import github_api_toolkit
+import pytest
+
+import src.interfaces as interfaces
+from src.codeowners_cache import CodeownersCache
+from src.rate_limit import RateLimitGovernor
+
+
+@pytest.fixture
+def cache(tmp_path: str) -> CodeownersCache:
+    return CodeownersCache(Mock(), 86400, str(tmp_path))
+
+
+def test_empty_lookups_are_not_cached(cache: CodeownersCache) -> None:
+    # A failed team lookup returns no members, then succeeds
+    resolve = Mock(side_effect=[[], ["octocat"], ["not-requested"]])
+
+    assert cache.get("members", "org", "team", resolve) == []
+    assert cache.get("members", "org", "team", resolve) == ["octocat"]
+    assert cache.get("members", "org", "team", resolve) == ["octocat"]
+
+    assert resolve.call_count == 2
+    assert cache.summary()["members"]["empty"] == 1
+
+
+def test_users_and_emails_are_deduplicated(cache: CodeownersCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    teams = {"team-a": ["alice", "bob"], "team-b": ["bob", "carol"]}
+    emails = {"alice": ["shared@example.com"], "bob": ["bob@example.com", "shared@example.com"], "carol": []}
+
+    monkeypatch.setattr(github_api_toolkit.github_graphql_interface, "get_codeowner_users", lambda self, org, codeowners: teams[codeowners[0]])
+    monkeypatch.setattr(github_api_toolkit.github_graphql_interface, "get_codeowner_emails", lambda self, codeowners, org: emails[codeowners[0]])
+
+    ql = interfaces.graphql_interface("token", RateLimitGovernor(1, 1), codeowners_cache=cache)
+
+    users = ql.get_codeowner_users("org", ["team-a", "team-b"])
+
+    assert users == ["alice", "bob", "carol"]
+    assert ql.get_codeowner_emails(users, "org") == ["shared@example.com", "bob@example.com"]
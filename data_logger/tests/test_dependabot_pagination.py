@@ -0,0 +1,74 @@
+"""Tests that Dependabot pagination stops at the threshold and logs the pages it fetched and skipped."""
+
+import datetime
+import json
+from unittest.mock import Mock
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+import src.main as main
+
+ALERTS_URL = "https://api.github.com/orgs/org/dependabot/alerts"
+
+
+def build_alert(days_open: int) -> dict:
+    created_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_open)
+
+    return {
+        "created_at": created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "repository": {"name": "repository", "html_url": "https://github.com/org/repository"},
+        "security_advisory": {"severity": "high"},
+        "html_url": "https://github.com/org/repository/security/dependabot/1",
+    }
+
+
+def build_response(alerts: list[dict], links: dict[str, str]) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.headers = CaseInsensitiveDict({"Link": ", ".join(f'<{url}>; rel="{rel}"' for rel, url in links.items())})
+    response._content = json.dumps(alerts).encode("utf-8")
+
+    return response
+
+
+def get_summary(logger: Mock) -> str:
+    return [call.args[0] for call in logger.log_info.call_args_list if call.args[0].startswith("Processed")][0]
+
+
+def test_pages_within_threshold_are_skipped() -> None:
+    rest = Mock()
+    rest.get.side_effect = [
+        build_response([build_alert(30)], {"next": f"{ALERTS_URL}?after=a"}),
+        build_response([build_alert(30), build_alert(1)], {"next": f"{ALERTS_URL}?after=b"}),
+    ]
+    logger = Mock()
+
+    alerts = main.get_dependabot_data_for_severity(logger, rest, "org", "high", 7, "Thread-1")
+
+    assert len(alerts) == 2
+    assert rest.get.call_count == 2
+    assert get_summary(logger) == "Processed 2 pages of Dependabot alerts for high severity. 2 pages fetched and the remaining pages (at least 1) skipped as they are within the threshold. Using Thread-1."
+
+
+def test_skipped_pages_are_counted_from_the_last_page_link() -> None:
+    rest = Mock()
+    rest.get.side_effect = [build_response([build_alert(1)], {"next": f"{ALERTS_URL}?page=2", "last": f"{ALERTS_URL}?page=5"})]
+    logger = Mock()
+
+    main.get_dependabot_data_for_severity(logger, rest, "org", "high", 7, "Thread-1")
+
+    assert get_summary(logger) == "Processed 1 pages of Dependabot alerts for high severity. 1 pages fetched and 4 skipped as they are within the threshold. Using Thread-1."
+
+
+def test_every_page_is_fetched_when_none_are_within_threshold() -> None:
+    rest = Mock()
+    rest.get.side_effect = [
+        build_response([build_alert(30)], {"next": f"{ALERTS_URL}?after=a"}),
+        build_response([build_alert(30)], {}),
+    ]
+    logger = Mock()
+
+    main.get_dependabot_data_for_severity(logger, rest, "org", "high", 7, "Thread-1")
+
+    assert get_summary(logger) == "Processed 2 pages of Dependabot alerts for high severity. 2 pages fetched and 0 skipped as they are within the threshold. Using Thread-1."
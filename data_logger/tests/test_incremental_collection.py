@@ -0,0 +1,80 @@
+"""Tests for which repositories incremental collection carries forward, and what it re-evaluates for them."""
+
+import datetime
+from unittest.mock import Mock
+
+import src.main as main
+import src.policy_checks as policy_checks
+
+MAX_AGE = 7 * 24 * 60 * 60
+
+
+def build_repository(name: str) -> dict:
+    return {
+        "name": name,
+        "visibility": "PUBLIC",
+        "url": f"https://github.com/org/{name}",
+        "createdAt": "2023-01-01T00:00:00Z",
+        "pushedAt": "2024-01-01T00:00:00Z",
+        "headCommit": {"target": {"oid": "abc123"}},
+        "hasVulnerabilityAlertsEnabled": True,
+    }
+
+
+def build_previous_record(name: str, collected_at: str | None) -> dict:
+    record = {
+        "name": name,
+        "type": "PUBLIC",
+        "pushed_at": "2024-01-01T00:00:00Z",
+        "head_commit": "abc123",
+        "checklist": {check: False for check in policy_checks.CHECKS},
+    }
+
+    if collected_at is not None:
+        record["collected_at"] = collected_at
+
+    return record
+
+
+def days_ago(days: int) -> str:
+    return (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)).strftime(policy_checks.TIMESTAMP_FORMAT)
+
+
+def test_old_records_are_collected_again() -> None:
+    repositories = [build_repository(name) for name in ["recent", "expired", "before-collected-at"]]
+
+    previous_repositories = {
+        "recent": build_previous_record("recent", days_ago(1)),
+        "expired": build_previous_record("expired", days_ago(8)),
+        "before-collected-at": build_previous_record("before-collected-at", None),
+    }
+
+    to_collect, carried_forward = main.split_changed_repositories(Mock(), repositories, previous_repositories, 1, MAX_AGE)
+
+    assert [repository["name"] for repository in to_collect] == ["expired", "before-collected-at"]
+    assert list(carried_forward) == ["recent"]
+
+    # The record keeps the time it was collected, so it still expires while being carried forward
+    assert carried_forward["recent"]["collected_at"] == previous_repositories["recent"]["collected_at"]
+
+
+def test_security_checks_are_re_evaluated_from_the_security_index() -> None:
+    repositories = [build_repository("repository")]
+    previous_repositories = {"repository": build_previous_record("repository", days_ago(1))}
+
+    security_index = {
+        "repository": {
+            "visibility": "public",
+            "security_and_analysis": {
+                "secret_scanning": {"status": "disabled"},
+                "secret_scanning_push_protection": {"status": "enabled"},
+            },
+        },
+    }
+
+    _, carried_forward = main.split_changed_repositories(Mock(), repositories, previous_repositories, 1, MAX_AGE, security_index)
+
+    checklist = carried_forward["repository"]["checklist"]
+
+    assert checklist["secret_scanning_disabled"]
+    assert not checklist["push_protection_disabled"]
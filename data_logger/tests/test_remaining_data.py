@@ -0,0 +1,69 @@
+"""Tests that a batch of remaining data which fails as a whole is retried, rather than published as empty."""
+
+import asyncio
+import json
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+
+import src.async_collection as async_collection
+import src.main as main
+import src.retry_policy as retry_policy
+from src.rate_limit import RateLimitGovernor
+
+# GitHub's response when a query times out: 200 OK with no data
+TIMED_OUT = {"data": None, "errors": [{"message": "Something went wrong while executing your query. This may be the result of a timeout."}]}
+
+COLLECTED = {"data": {"repo0": None, "repo1": None}}
+
+
+def build_response(body: dict) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(body).encode("utf-8")
+
+    return response
+
+
+@pytest.fixture(autouse=True)
+def policy(monkeypatch: pytest.MonkeyPatch) -> retry_policy.RetryPolicy:
+    """Replaces the shared retry policy with one which does not wait between attempts.
+
+    Returns:
+        retry_policy.RetryPolicy: The retry policy.
+    """
+    policy = retry_policy.RetryPolicy(base_delay=0)
+
+    monkeypatch.setattr(retry_policy, "policy", policy)
+
+    return policy
+
+
+def test_timed_out_batch_is_retried(policy: retry_policy.RetryPolicy) -> None:
+    ql = Mock()
+    ql.make_ql_request.side_effect = [build_response(TIMED_OUT), build_response(COLLECTED)]
+
+    remaining_data = main.get_remaining_data_batch(ql, "org", ["repo-a", "repo-b"], 15)
+
+    assert ql.make_ql_request.call_count == 2
+    assert set(remaining_data) == {"repo-a", "repo-b"}
+    assert policy.summary()["retries"] == {"graphql_timeout": 1}
+
+
+def test_timed_out_batch_is_retried_by_the_asyncio_engine(policy: retry_policy.RetryPolicy) -> None:
+    client = async_collection.AsyncGitHubClient(Mock(), RateLimitGovernor(1, 1), 1, 1)
+
+    responses = [TIMED_OUT, COLLECTED]
+
+    async def send(*args: Any, **kwargs: Any) -> dict:
+        return responses.pop(0)
+
+    client._send = send
+
+    remaining_data = asyncio.run(async_collection.get_remaining_data_batch(client, "org", ["repo-a", "repo-b"], 15))
+
+    assert not responses
+    assert set(remaining_data) == {"repo-a", "repo-b"}
+    assert policy.summary()["retries"] == {"graphql_timeout": 1}
@@ -0,0 +1,90 @@
+"""Tests that GraphQL failures reach the retry policy's classification through the real request path."""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+import src.interfaces as interfaces
+import src.main as main
+import src.retry_policy as retry_policy
+from src.rate_limit import RateLimitGovernor
+
+TIMED_OUT = {"data": None, "errors": [{"message": "Something went wrong while executing your query. This may be the result of a timeout."}]}
+
+BAD_QUERY = {"data": None, "errors": [{"message": "Field 'unknownField' doesn't exist on type 'Repository'"}]}
+
+SECONDARY_RATE_LIMIT = {"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."}
+
+COLLECTED = {"data": {"repo0": None}}
+
+
+def build_response(body: dict, status_code: int = 200, headers: dict | None = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers or {})
+    response._content = json.dumps(body).encode("utf-8")
+    response.url = f"{interfaces.GITHUB_API_URL}/graphql"
+
+    return response
+
+
+@pytest.fixture
+def policy(monkeypatch: pytest.MonkeyPatch) -> retry_policy.RetryPolicy:
+    """Replaces the shared retry policy with one which does not wait between attempts.
+
+    Returns:
+        retry_policy.RetryPolicy: The retry policy.
+    """
+    policy = retry_policy.RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+    monkeypatch.setattr(retry_policy, "policy", policy)
+
+    return policy
+
+
+def build_interface(*responses: Response) -> interfaces.graphql_interface:
+    transport = Mock()
+    transport.request.side_effect = list(responses)
+
+    return interfaces.graphql_interface("token", RateLimitGovernor(1, 1), transport=transport)
+
+
+def test_timeout_and_secondary_rate_limit_are_retried(policy: retry_policy.RetryPolicy) -> None:
+    ql = build_interface(
+        build_response(TIMED_OUT),
+        build_response(SECONDARY_RATE_LIMIT, 403, {"Retry-After": "0"}),
+        build_response(COLLECTED),
+    )
+
+    remaining_data = main.get_remaining_data_batch(ql, "org", ["repo-a"], 15)
+
+    assert set(remaining_data) == {"repo-a"}
+    assert policy.summary()["retries"] == {"graphql_timeout": 1, "secondary_rate_limit": 1}
+
+
+def test_bad_query_is_not_retried(policy: retry_policy.RetryPolicy) -> None:
+    ql = build_interface(build_response(BAD_QUERY), build_response(COLLECTED))
+
+    with pytest.raises(Exception):
+        main.get_remaining_data_batch(ql, "org", ["repo-a"], 15)
+
+    assert ql.transport.request.call_count == 1
+    assert policy.summary()["fatal"] == {"graphql_error": 1}
+
+
+@pytest.mark.parametrize(
+    ("response", "expected"),
+    [
+        (build_response(TIMED_OUT), ("graphql_timeout", True)),
+        (build_response(BAD_QUERY), ("graphql_error", False)),
+        (build_response(SECONDARY_RATE_LIMIT, 403, {"Retry-After": "30"}), ("secondary_rate_limit", True)),
+    ],
+)
+def test_graphql_errors_are_classified(response: Response, expected: tuple[str, bool]) -> None:
+    with pytest.raises(Exception) as error:
+        interfaces.get_graphql_json(build_interface(response).make_ql_request("query { viewer { login } }", {}))
+
+    assert retry_policy.classify(error.value)[:2] == expected
@@ -0,0 +1,202 @@
+"""Tests for sharded collection: the worker event payloads, and a coordinator which stops at the checkpoint deadline."""
+
+import json
+import os
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+import src.main as main
+import src.sharding as sharding
+from benchmarks.replay_harness import FakeS3
+from src.checkpoint import CHECKPOINT_FILENAME, CollectionCheckpoint
+
+BUCKET_NAME = "bucket"
+
+# The limit on the payload of a synchronous Lambda invocation
+LAMBDA_PAYLOAD_LIMIT = 6 * 1024 * 1024
+
+SETTINGS = {
+    "shard_size": 2,
+    "shard_runner": "lambda",
+    "shard_concurrency": 1,
+    "inactivity_threshold": 12,
+    "signed_commit_number": 15,
+    "thread_count": 1,
+    "remaining_data_batch_size": 5,
+    "checkpoint_interval": 60,
+    "checkpoint_max_age": 86400,
+}
+
+FEATURES = {"graphql_branch_protection": False}
+
+
+def build_repositories(count: int, description_length: int = 10) -> list[dict]:
+    return [{"name": f"repository-{index}", "description": "x" * description_length} for index in range(count)]
+
+
+def test_worker_event_stays_within_the_payload_limit() -> None:
+    # Around 10 MB of repository listing in a single shard
+    repositories = build_repositories(1_000, description_length=10_000)
+    security_index = {"repository-0": {"visibility": "private"}}
+
+    shard_input = sharding.build_shard_input(repositories, security_index)
+    event = sharding.build_worker_event("run", 0, repositories, sharding.get_shard_input_key("run", 0))
+
+    assert len(json.dumps(shard_input)) > LAMBDA_PAYLOAD_LIMIT
+    assert len(json.dumps(event)) < LAMBDA_PAYLOAD_LIMIT
+
+    assert sharding.read_shard_input(shard_input, event["repositories"]) == (repositories, security_index)
+
+
+def test_run_shards_starts_no_workers_once_stopped(monkeypatch: pytest.MonkeyPatch) -> None:
+    events = [{"shard": shard} for shard in range(5)]
+    invoked = []
+
+    def invoke(lambda_client: Any, function_name: str, event: dict) -> dict:
+        invoked.append(event["shard"])
+
+        return {"shard": event["shard"], "records": 0}
+
+    monkeypatch.setattr(sharding, "invoke_lambda_worker", invoke)
+
+    results = list(sharding.run_shards(Mock(), "lambda", events, 2, Mock(), "data-logger", should_stop=lambda: len(invoked) >= 3))
+
+    # The two running workers finish, and one more is started before the deadline
+    assert len(invoked) == 3
+    assert sorted(result["shard"] for result in results) == sorted(invoked)
+
+
+@pytest.fixture
+def s3(monkeypatch: pytest.MonkeyPatch) -> FakeS3:
+    """Runs each shard's worker in the current thread, reading and writing its input and output in an in-memory S3.
+
+    Returns:
+        FakeS3: The in-memory S3.
+    """
+    s3 = FakeS3()
+
+    def get_output_data(logger: Any, rest: Any, ql: Any, org: str, repositories: list[dict], *args: Any) -> list[dict] | None:
+        records = [{"name": repository["name"], "collected": True} for repository in repositories]
+
+        # With a deadline, a worker collects one repository at a time until it passes
+        if len(args) > 6 and args[6] is not None:
+            checkpoint = args[6]
+
+            for record in records:
+                if checkpoint.is_out_of_time():
+                    return None
+
+                checkpoint.add_records([record])
+
+            return checkpoint.get_records(repositories)
+
+        return records
+
+    def invoke(lambda_client: Any, function_name: str, event: dict) -> dict:
+        # The event is serialised, as it would be when invoking the worker
+        event = json.loads(json.dumps(event))
+
+        return main.collect_shard(Mock(), None, None, "org", SETTINGS, FEATURES, event, True, s3, BUCKET_NAME)
+
+    monkeypatch.setattr(main, "get_output_data", get_output_data)
+    monkeypatch.setattr(sharding, "invoke_lambda_worker", invoke)
+
+    return s3
+
+
+def test_coordinator_stops_at_deadline_and_resumes(s3: FakeS3, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    repositories = build_repositories(10)
+    context = SimpleNamespace(function_name="data-logger")
+
+    checkpoint = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+
+    # Stop -- the deadline passes once two shards have been collected
+    monkeypatch.setattr(CollectionCheckpoint, "is_out_of_time", lambda self: len(self.state["records"]) >= 4)
+
+    output = main.collect_sharded(Mock(), Mock(), context, SETTINGS, repositories, {}, True, s3, BUCKET_NAME, checkpoint)
+
+    assert output is None
+    assert sorted(checkpoint.state["records"]) == [f"repository-{index}" for index in range(4)]
+
+    # The inputs of the shards which were not started are removed with the outputs
+    assert not [key for key in s3.objects if key.startswith(sharding.SHARDS_PREFIX)]
+
+    # Resume -- only the repositories missing from the checkpoint are sharded
+    monkeypatch.setattr(CollectionCheckpoint, "is_out_of_time", lambda self: False)
+
+    invoked = []
+    invoke = sharding.invoke_lambda_worker
+
+    def record_invoke(lambda_client: Any, function_name: str, event: dict) -> dict:
+        invoked.extend(event["repositories"])
+
+        return invoke(lambda_client, function_name, event)
+
+    monkeypatch.setattr(sharding, "invoke_lambda_worker", record_invoke)
+
+    output = main.collect_sharded(Mock(), Mock(), context, SETTINGS, repositories, {}, True, s3, BUCKET_NAME, checkpoint)
+
+    assert invoked == [f"repository-{index}" for index in range(4, 10)]
+    assert [record["name"] for record in output] == [repository["name"] for repository in repositories]
+
+
+def test_run_shards_yields_failed_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    def invoke(lambda_client: Any, function_name: str, event: dict) -> dict:
+        if event["shard"] == 1:
+            raise Exception("Shard 1 failed: Task timed out")
+
+        return {"shard": event["shard"], "records": 0}
+
+    monkeypatch.setattr(sharding, "invoke_lambda_worker", invoke)
+
+    results = list(sharding.run_shards(Mock(), "lambda", [{"shard": shard} for shard in range(3)], 1, Mock(), "data-logger"))
+
+    assert [result["shard"] for result in results] == [0, 1, 2]
+    assert "error" in results[1]
+
+
+def test_worker_stops_at_coordinator_deadline(s3: FakeS3, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    repositories = build_repositories(4)
+    context = SimpleNamespace(function_name="data-logger")
+
+    checkpoint = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+    checkpoint.deadline = time.time() + 60
+
+    # The deadline passes part way through the first shard, once the worker has collected one repository
+    monkeypatch.setattr(CollectionCheckpoint, "is_out_of_time", lambda self: len(self.state["records"]) >= 1)
+
+    output = main.collect_sharded(Mock(), Mock(), context, SETTINGS, repositories, {}, True, s3, BUCKET_NAME, checkpoint)
+
+    # The worker returned its partial shard, which is checkpointed, and no more shards were started
+    assert output is None
+    assert list(checkpoint.state["records"]) == ["repository-0"]
+    assert not [key for key in s3.objects if key.startswith(sharding.SHARDS_PREFIX)]
+
+
+def test_failed_shard_keeps_finished_shards(s3: FakeS3, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    repositories = build_repositories(6)
+    context = SimpleNamespace(function_name="data-logger")
+
+    checkpoint = CollectionCheckpoint(Mock(), "org", str(tmp_path), 60, 86400)
+
+    invoke = sharding.invoke_lambda_worker
+
+    def failing_invoke(lambda_client: Any, function_name: str, event: dict) -> dict:
+        if event["shard"] == 1:
+            raise Exception("Shard 1 failed: Task timed out")
+
+        return invoke(lambda_client, function_name, event)
+
+    monkeypatch.setattr(sharding, "invoke_lambda_worker", failing_invoke)
+
+    with pytest.raises(Exception, match="1 of 3 shards failed"):
+        main.collect_sharded(Mock(), Mock(), context, SETTINGS, repositories, {}, True, s3, BUCKET_NAME, checkpoint)
+
+    # The other shards are checkpointed and saved, and every shard input and output is removed
+    assert sorted(checkpoint.state["records"]) == ["repository-0", "repository-1", "repository-4", "repository-5"]
+    assert os.path.exists(os.path.join(str(tmp_path), CHECKPOINT_FILENAME))
+    assert not [key for key in s3.objects if key.startswith(sharding.SHARDS_PREFIX)]
@@ -0,0 +1,96 @@
+"""Tests that every request to the GitHub API is sent with a timeout."""
+
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+
+import src.interfaces as interfaces
+from src.rate_limit import RateLimitGovernor
+from src.transport import REQUEST_TIMEOUT, PooledTransport
+
+
+def build_response(status_code: int) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = b"{}"
+
+    return response
+
+
+def test_transport_requests_have_a_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = Mock()
+    session.request.return_value = build_response(200)
+
+    transport = PooledTransport(Mock(), 1)
+
+    monkeypatch.setattr(transport, "get_session", lambda: session)
+
+    transport.request("GET", f"{interfaces.GITHUB_API_URL}/orgs/org")
+    transport.request("GET", f"{interfaces.GITHUB_API_URL}/orgs/org", timeout=5)
+
+    assert [call.kwargs["timeout"] for call in session.request.call_args_list] == [REQUEST_TIMEOUT, 5]
+
+
+def test_conditional_get_without_transport_has_a_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests_sent = []
+
+    def get(**kwargs: Any) -> Response:
+        requests_sent.append(kwargs)
+
+        return build_response(200)
+
+    monkeypatch.setattr(interfaces.requests, "get", get)
+
+    cache = Mock()
+    cache.get_etag.return_value = None
+
+    rest = interfaces.rest_interface("token", RateLimitGovernor(1, 1), cache)
+
+    result, _ = rest._get_conditional("/orgs/org/repos", {})
+
+    assert result.status_code == 200
+    assert requests_sent[0]["timeout"] == REQUEST_TIMEOUT
+
+
+def test_get_without_transport_has_a_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests_sent = []
+
+    def get(**kwargs: Any) -> Response:
+        requests_sent.append(kwargs)
+
+        return build_response(200)
+
+    monkeypatch.setattr(interfaces.requests, "get", get)
+
+    rest = interfaces.rest_interface("token", RateLimitGovernor(1, 1))
+
+    assert rest.get("/orgs/org").status_code == 200
+    assert requests_sent[0]["url"] == f"{interfaces.GITHUB_API_URL}/orgs/org"
+    assert requests_sent[0]["timeout"] == REQUEST_TIMEOUT
+
+
+def test_failed_get_without_transport_returns_the_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(interfaces.requests, "get", lambda **kwargs: build_response(404))
+
+    rest = interfaces.rest_interface("token", RateLimitGovernor(1, 1))
+
+    assert isinstance(rest.get("/orgs/org"), interfaces.requests.exceptions.HTTPError)
+
+
+def test_graphql_request_without_transport_has_a_timeout(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests_sent = []
+
+    def post(**kwargs: Any) -> Response:
+        requests_sent.append(kwargs)
+
+        return build_response(200)
+
+    monkeypatch.setattr(interfaces.requests, "post", post)
+
+    ql = interfaces.graphql_interface("token", RateLimitGovernor(1, 1))
+
+    assert ql.make_ql_request("query { viewer { login } }", {}).status_code == 200
+    assert requests_sent[0]["url"] == f"{interfaces.GITHUB_API_URL}/graphql"
+    assert requests_sent[0]["timeout"] == REQUEST_TIMEOUT
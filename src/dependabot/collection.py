@@ -1,35 +1,28 @@
 """A module for managing the collection of dependabot data for the dashboard."""
 
 import streamlit as st
-from botocore.exceptions import ClientError
 import pandas as pd
 from datetime import datetime, timedelta
-import json
+
+from utilities import load_dataset
 
 @st.cache_data(ttl=timedelta(hours=1))
-def load_dependabot(_s3, bucket: str) -> pd.DataFrame | None:
+def load_dependabot(_s3, bucket: str, manifest_dataset: dict | None = None) -> pd.DataFrame | None:
     """Load Dependabot data from an S3 bucket and return it as a DataFrame.
 
     Args:
         _s3 (boto3.client): A Boto3 S3 client to interact with AWS S3.
         bucket (str): The name of the S3 bucket where the Dependabot data is stored.
+        manifest_dataset (dict | None, optional): The dataset's entry in the manifest. A new run has a new entry, so it is not served from the cache. Defaults to None.
 
     Returns:
         pd.DataFrame | None: A DataFrame containing the Dependabot data, or None if an error occurs.
     """
 
-    # Get dependabot.json from S3
-    try:
-        response = _s3.get_object(Bucket=bucket, Key="dependabot.json")
-    except ClientError as e:
-        return None
-    
-    # Convert the response to a JSON object
-    json_data = json.loads(response["Body"].read().decode("utf-8"))
-
-    df_dependabot = pd.json_normalize(json_data)
+    # Get the Dependabot data from S3 (Parquet if available, otherwise JSON)
+    df_dependabot = load_dataset(_s3, bucket, "dependabot", manifest_dataset)
 
-    if df_dependabot.empty:
+    if df_dependabot is None or df_dependabot.empty:
         return None
 
     # Rename the columns to be more readable
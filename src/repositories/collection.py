@@ -1,34 +1,29 @@
 """A module for managing the collection of repository data for the dashboard."""
 
 import streamlit as st
-from botocore.exceptions import ClientError
 import pandas as pd
 from datetime import timedelta
 import json
 
+from utilities import load_dataset
+
 @st.cache_data(ttl=timedelta(hours=1))
-def load_repositories(_s3, bucket: str) -> pd.DataFrame | None:
+def load_repositories(_s3, bucket: str, manifest_dataset: dict | None = None) -> pd.DataFrame | None:
     """Load repository data from an S3 bucket and return it as a DataFrame.
 
     Args:
         _s3 (boto3.client): A Boto3 S3 client to interact with AWS S3.
         bucket (str): The name of the S3 bucket containing the repository data.
+        manifest_dataset (dict | None, optional): The dataset's entry in the manifest. A new run has a new entry, so it is not served from the cache. Defaults to None.
 
     Returns:s
         pd.DataFrame | None: A DataFrame containing the repository data or None if the data could not be loaded.
     """
 
-    try:
-        response = _s3.get_object(Bucket=bucket, Key="repositories.json")
-    except ClientError as e:
-        return None
-    
-    # Convert the JSON data to a Pandas DataFrame
-    json_data = json.loads(response["Body"].read().decode("utf-8"))
-
-    df_repositories = pd.json_normalize(json_data)
+    # Get the repository data from S3 (Parquet if available, otherwise JSON)
+    df_repositories = load_dataset(_s3, bucket, "repositories", manifest_dataset)
 
-    if df_repositories.empty:
+    if df_repositories is None or df_repositories.empty:
         return None
 
     # Update repository_type to be title case
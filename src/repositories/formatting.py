@@ -22,11 +22,14 @@ def get_rules_from_repositories(df_repositories: pd.DataFrame) -> Tuple[list | N
     if df_repositories.empty:
         return []
 
-    rules = df_repositories.columns.to_list()[4:]
+    # Only keep the repository details and the rules
+    # Other columns (i.e. pushed_at and head_commit) are used by the data logger
+    rule_columns = [column for column in df_repositories.columns if column.startswith("checklist.")]
+
+    df_repositories = df_repositories[["name", "type", "url", "created_at"] + rule_columns]
 
     # Cleans the rules to remove the "checklist." prefix
-    for i in range(len(rules)):
-        rules[i] = rules[i].replace("checklist.", "")
+    rules = [column.replace("checklist.", "") for column in rule_columns]
 
     # Rename the dataframe columns to match the rules
     df_repositories.columns = ["repository", "repository_type", "url", "created_at"] + rules
@@ -17,15 +17,25 @@ s3 = session.client("s3")
 secret_manager = session.client("secretsmanager", region_name=env["secret_region"])
 
 
+# The manifest lists the outputs of the Data Logger's last run (None if it has not published one)
+manifest = utils.load_manifest(
+    s3=s3,
+    bucket=env["bucket_name"]
+)
+
+manifest_dataset = utils.get_manifest_dataset(manifest, "repositories")
+
 last_modified = utils.get_last_modified(
     s3=s3,
     bucket=env["bucket_name"],
-    filename="repositories.json"
+    filename="repositories.json",
+    manifest_dataset=manifest_dataset
 )
 
 df_repositories = collection.load_repositories(
     _s3=s3,
     bucket=env["bucket_name"],
+    manifest_dataset=manifest_dataset
 )
 
 rules, df_repositories = fmt.get_rules_from_repositories(
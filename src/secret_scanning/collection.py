@@ -1,35 +1,28 @@
 """A module for managing the collection of secret scanning data for the dashboard."""
 
 import streamlit as st
-from botocore.exceptions import ClientError
 import pandas as pd
 from datetime import datetime, timedelta
-import json
+
+from utilities import load_dataset
 
 @st.cache_data(ttl=timedelta(hours=1))
-def load_secret_scanning(_s3, bucket: str) -> pd.DataFrame | None:
+def load_secret_scanning(_s3, bucket: str, manifest_dataset: dict | None = None) -> pd.DataFrame | None:
     """Load secret scanning data from an S3 bucket and return it as a DataFrame.
 
     Args:
         _s3 (boto3.client): A Boto3 S3 client to interact with AWS S3.
         bucket (str): The name of the S3 bucket containing the secret scanning data.
+        manifest_dataset (dict | None, optional): The dataset's entry in the manifest. A new run has a new entry, so it is not served from the cache. Defaults to None.
 
     Returns:
         pd.DataFrame | None: A DataFrame containing the secret scanning data or None if the data could not be loaded.
     """
 
-    # Get secret_scanning.json from S3
-    try:
-        response = _s3.get_object(Bucket=bucket, Key="secret_scanning.json")
-    except ClientError as e:
-        return None
-    
-    # Convert the response to a JSON object
-    json_data = json.loads(response["Body"].read().decode("utf-8"))
-
-    df_secret_scanning = pd.json_normalize(json_data)
+    # Get the Secret Scanning data from S3 (Parquet if available, otherwise JSON)
+    df_secret_scanning = load_dataset(_s3, bucket, "secret_scanning", manifest_dataset)
 
-    if df_secret_scanning.empty:
+    if df_secret_scanning is None or df_secret_scanning.empty:
         return None
 
     # Rename the columns to be more readable
@@ -2,11 +2,20 @@
 
 import streamlit as st
 import os
+import io
+import json
 import boto3
 import github_api_toolkit
-from datetime import timedelta, timezone
+import pandas as pd
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from requests import Response
-from typing import Tuple
+from typing import Iterator, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# The maximum number of pages requested at once when paginating the GitHub API
+PAGINATION_CONCURRENCY = 10
 
 def get_environment_variables() -> dict:
     """
@@ -34,21 +43,67 @@ def get_environment_variables() -> dict:
         "bucket_name": bucket_name
     }
 
-def get_last_modified(s3: boto3.client, bucket: str, filename: str) -> str | None:
+def load_manifest(s3: boto3.client, bucket: str) -> dict | None:
+    """
+    Loads the manifest of the Data Logger's last published run.
+
+    The manifest lists the outputs of the run (i.e. runs/20240101T120000.123456Z-1a2b3c4d/repositories.json). It is written after all
+    of the run's outputs, so the outputs it lists are always complete and from the same run.
+
+    Args:
+        s3 (boto3.client): A Boto3 S3 client to interact with AWS S3.
+        bucket (str): The name of the S3 bucket.
+
+    Returns:
+        dict | None: The manifest, or None if the Data Logger has not published one.
+    """
+
+    try:
+        response = s3.get_object(Bucket=bucket, Key="manifest.json")
+    except ClientError:
+        return None
+
+    return json.loads(response["Body"].read().decode("utf-8"))
+
+def get_manifest_dataset(manifest: dict | None, dataset: str) -> dict | None:
+    """
+    Gets a dataset's entry from the manifest.
+
+    Args:
+        manifest (dict | None): The manifest, or None if there is no manifest.
+        dataset (str): The name of the dataset (repositories, dependabot or secret_scanning).
+
+    Returns:
+        dict | None: The dataset's entry, or None if it is not in the manifest.
+    """
+
+    if not manifest:
+        return None
+
+    return manifest.get("datasets", {}).get(dataset)
+
+def get_last_modified(s3: boto3.client, bucket: str, filename: str, manifest_dataset: dict | None = None) -> str | None:
     """
     Retrieves the last modified date of a file in an S3 bucket.
 
+    If the dataset is listed in the manifest, the time it was published is used instead, saving a request.
+
     Args:
         bucket (str): The name of the S3 bucket.
         filename (str): The name of the file in the S3 bucket.
+        manifest_dataset (dict | None, optional): The dataset's entry in the manifest. Defaults to None.
 
     Returns:
         str | None: The last modified date in "YYYY-MM-DD @ HH:MM" format, or None if not found.
     """
 
-    response = s3.head_object(Bucket=bucket, Key=filename)
-    
-    last_modified = response['LastModified']
+    if manifest_dataset and manifest_dataset.get("published_at"):
+        last_modified = datetime.strptime(manifest_dataset["published_at"], "%Y-%m-%dT%H:%M:%SZ")
+    else:
+        response = s3.head_object(Bucket=bucket, Key=filename)
+
+        last_modified = response['LastModified']
+
     last_modified = last_modified.replace(tzinfo=timezone.utc).astimezone(tz=None)
 
     if not last_modified:
@@ -56,6 +111,56 @@ def get_last_modified(s3: boto3.client, bucket: str, filename: str) -> str | Non
 
     return last_modified.strftime("%Y-%m-%d @ %H:%M")
 
+def load_dataset(s3: boto3.client, bucket: str, dataset: str, manifest_dataset: dict | None = None) -> pd.DataFrame | None:
+    """
+    Loads one of the Data Logger's datasets from S3 as a flat DataFrame.
+
+    If the dataset is listed in the manifest, the files from that run are loaded. Otherwise, the files at the root
+    of the bucket are loaded.
+
+    The compressed Parquet file (i.e. repositories.parquet) is used if the Data Logger published one, as its columns
+    are already flat and typed. Otherwise, the JSON file (i.e. repositories.json) is loaded and flattened.
+    The JSON file can either be a JSON array or newline delimited JSON (NDJSON).
+
+    Args:
+        s3 (boto3.client): A Boto3 S3 client to interact with AWS S3.
+        bucket (str): The name of the S3 bucket.
+        dataset (str): The name of the dataset (repositories, dependabot or secret_scanning).
+        manifest_dataset (dict | None, optional): The dataset's entry in the manifest. Defaults to None.
+
+    Returns:
+        pd.DataFrame | None: The dataset, or None if it could not be loaded.
+    """
+
+    if manifest_dataset:
+        parquet_key = manifest_dataset["parquet"]["key"] if manifest_dataset.get("parquet") else None
+        json_key = manifest_dataset["key"]
+    else:
+        parquet_key = f"{dataset}.parquet"
+        json_key = f"{dataset}.json"
+
+    if parquet_key:
+        try:
+            response = s3.get_object(Bucket=bucket, Key=parquet_key)
+
+            return pd.read_parquet(io.BytesIO(response["Body"].read()))
+        except ClientError:
+            pass
+
+    try:
+        response = s3.get_object(Bucket=bucket, Key=json_key)
+    except ClientError:
+        return None
+
+    contents = response["Body"].read().decode("utf-8")
+
+    if contents.lstrip().startswith("["):
+        json_data = json.loads(contents)
+    else:
+        json_data = [json.loads(line) for line in contents.splitlines() if line.strip()]
+
+    return pd.json_normalize(json_data)
+
 @st.cache_data(ttl=timedelta(minutes=30))
 def get_ql_interface(_secret_manager, secret_name: str, org: str, client_id: str) -> github_api_toolkit.github_graphql_interface:
     """Retrieves a GraphQL interface for GitHub API using the provided secret manager and organization details.
@@ -95,6 +200,68 @@ def get_rest_interface(_secret_manager, secret_name: str, org: str, client_id: s
 
     return rest
 
+def get_last_page(response: Response) -> int:
+    """Gets the number of the last page from the Link header of a GitHub API response.
+
+    Args:
+        response (Response): The response for the first page.
+
+    Returns:
+        int: The number of the last page (1 if there is only one page).
+    """
+
+    try:
+        return int(parse_qs(urlparse(response.links["last"]["url"]).query)["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return 1
+
+def get_pages(
+    rest: github_api_toolkit.github_interface,
+    url: str,
+    params: dict,
+    max_workers: int = PAGINATION_CONCURRENCY
+) -> Iterator[list]:
+    """Gets every page of a paginated GitHub API endpoint, yielding each page's JSON in page order.
+
+    The first page is reused rather than requested again, and the remaining pages are requested concurrently.
+    Pages which fail to load are reported and skipped.
+
+    Args:
+        rest (github_api_toolkit.github_interface): The REST interface for GitHub API.
+        url (str): The endpoint to request.
+        params (dict): The query parameters (excluding page).
+        max_workers (int, optional): The maximum number of pages to request at once. Defaults to PAGINATION_CONCURRENCY.
+
+    Yields:
+        list: The JSON of each page.
+    """
+
+    response = rest.get(url, params={**params, "page": 1})
+
+    if type(response) is not Response:
+        print(f"Error retrieving {url}: {response}")
+        return
+
+    last_page = get_last_page(response)
+
+    yield response.json()
+
+    if last_page == 1:
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = executor.map(
+            lambda page: rest.get(url, params={**params, "page": page}),
+            range(2, last_page + 1)
+        )
+
+        for page, response in enumerate(responses, start=2):
+            if type(response) is not Response:
+                print(f"Error retrieving {url} on page {page}: {response}")
+                continue
+
+            yield response.json()
+
 @st.cache_data(ttl=timedelta(hours=1))
 def get_github_repository_information(
     _rest: github_api_toolkit.github_interface, 
@@ -144,27 +311,8 @@ def get_github_repository_information(
         archived_status = {}
         repository_list = []
 
-        response = _rest.get(f"/orgs/{org}/repos", params={"per_page": 100})
-
-        if type(response) is not Response:
-            print(f"Error retrieving repositories: {response}")
-            return repo_types, archived_status
-        else:
-            try:
-                last_page = int(response.links["last"]["url"].split("=")[-1])
-            except KeyError:
-                last_page = 1
-
-        for page in range(1, last_page + 1):
-            response = _rest.get(f"/orgs/{org}/repos", params={"per_page": 100, "page": page})
-
-            if type(response) is not Response:
-                print(f"Error retrieving repositories on page {page}: {response}")
-                continue
-
-            repositories = response.json()
-
-            repository_list = repository_list + repositories
+        for repositories in get_pages(_rest, f"/orgs/{org}/repos", {"per_page": 100}):
+            repository_list.extend(repositories)
 
         for repo in repository_list:
             repository_name = repo.get("name")
@@ -51,6 +51,8 @@ data "aws_iam_policy_document" "lambda_s3_policy" {
       "s3:ListAllMyBuckets",  # Allows listing all buckets in the account
       "s3:GetObject",         # Allows reading objects in buckets
       "s3:PutObject",         # Allows writing objects to buckets
+      "s3:DeleteObject",      # Allows removing out of date Parquet outputs
+      "s3:AbortMultipartUpload", # Allows abandoning failed multipart uploads of outputs
       "s3:ListBucket"
     ]
 